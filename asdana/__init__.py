@@ -8,16 +8,33 @@ Main modules:
     cogs: Bot command extensions organized by functionality.
     database: Database models and connection management.
     utils: Utility classes and helpers.
+
+Re-exported names are imported on first use, so importing the package alone
+does not load discord.py or the database layer.
 """
 
+from typing import TYPE_CHECKING
+
+from asdana import core
+from asdana.utils.lazy import lazy_exports
+
 __version__ = "0.1.0"
 __author__ = "Ash Omaraie"
 
-from asdana.core import AsdanaBot, config, get_prefix, setup_logging
+if TYPE_CHECKING:
+    from asdana.core import (
+        AsdanaBot,
+        Config,
+        config,
+        get_config,
+        get_prefix,
+        set_config,
+        setup_logging,
+    )
+
+# Everything asdana.core exports is re-exported from it, loaded on first use
+__all__ = list(core.__all__)
 
-__all__ = [
-    "AsdanaBot",
-    "config",
-    "get_prefix",
-    "setup_logging",
-]
+__getattr__, __dir__ = lazy_exports(
+    __name__, dict.fromkeys(__all__, "asdana.core"), uncached=["config"]
+)
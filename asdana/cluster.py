@@ -0,0 +1,374 @@
+"""
+Cluster entry point for the bot.
+
+A single Python process is bound to one core however many shards it runs.
+This launcher splits the shards into contiguous ranges and runs each range in
+its own worker process through ``asdana.main.main``, so every worker has its
+own event loop, database engine and aiohttp session.
+
+Workers are started one at a time, each waiting for the previous one to be
+ready, which keeps gateway identifies spread out and lets the worker that owns
+shard 0 create the tables first. Workers that exit are restarted with
+exponential backoff. Sending the launcher SIGHUP restarts the workers one by
+one (a rolling restart, e.g. after a deploy); SIGINT or SIGTERM stops them.
+
+Usage:
+    python -m asdana.cluster
+    python -m asdana.cluster --workers 4 --shard-count 16
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from typing import Any, Callable, Optional
+
+import aiohttp
+
+from asdana.core.config import get_config
+from asdana.core.logging_config import LOG_FILE, setup_logging, worker_log_file
+
+logger = logging.getLogger(__name__)
+
+# Default configuration constants
+GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+DEFAULT_READY_TIMEOUT = 300.0  # seconds
+DEFAULT_STOP_TIMEOUT = 30.0  # seconds
+MIN_RESTART_DELAY = 1.0  # seconds
+MAX_RESTART_DELAY = 300.0  # seconds
+STABLE_UPTIME = 60.0  # seconds a worker must run before its backoff resets
+POLL_INTERVAL = 1.0  # seconds
+
+
+def split_shards(shard_count: int, workers: int) -> list[list[int]]:
+    """
+    Splits shard IDs into contiguous, nearly equal ranges.
+    :param shard_count: Total number of shards.
+    :param workers: Number of worker processes; capped at the shard count.
+    :return: The shard IDs of each worker.
+    """
+    workers = max(1, min(workers, shard_count))
+    size, extra = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+async def fetch_recommended_shards(token: str) -> int:
+    """
+    Asks Discord how many shards the bot should run.
+    :param token: The bot token.
+    :return: The recommended shard count.
+    """
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            GATEWAY_BOT_URL, headers={"Authorization": f"Bot {token}"}
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())["shards"]
+
+
+def run_worker(
+    shard_ids: list[int],
+    shard_count: int,
+    ready,
+    metrics_port: Optional[int] = None,
+    log_file: str = LOG_FILE,
+) -> None:
+    """
+    Entry point of a worker process.
+    :param shard_ids: Shards this worker runs.
+    :param shard_count: Total number of shards.
+    :param ready: Event set whenever the worker's bot becomes ready.
+    :param metrics_port: Port of the worker's metrics endpoint, if any.
+    :param log_file: The worker's own log file.
+    """
+    # Imported here so the launcher process does not load the bot and cogs
+    from asdana.main import main as run_bot  # pylint: disable=import-outside-toplevel
+
+    try:
+        asyncio.run(
+            run_bot(
+                shard_count,
+                shard_ids,
+                on_ready=ready.set,
+                metrics_port=metrics_port,
+                log_file=log_file,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+class Worker:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """
+    A worker process and its restart state.
+
+    Attributes:
+        index: Position of the worker in the cluster.
+        shard_ids: Shards the worker runs.
+        process: The current process, once started.
+        ready: Event the current process sets when its bot is ready.
+        started_at: Monotonic time the current process was started.
+        restarts: Times the worker was restarted after exiting.
+        failures: Consecutive exits without running for ``STABLE_UPTIME``.
+        restart_at: Monotonic time a pending restart is due, if any.
+    """
+
+    def __init__(self, index: int, shard_ids: list[int]):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.process: Any = None
+        self.ready: Any = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.failures = 0
+        self.restart_at: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        """
+        A readable name including the shard range.
+        """
+        return f"worker {self.index} (shards {self.shard_ids[0]}-{self.shard_ids[-1]})"
+
+
+class ClusterLauncher:  # pylint: disable=too-many-instance-attributes
+    """
+    Starts, supervises and restarts the worker processes of a cluster.
+
+    Attributes:
+        shard_count: Total number of shards.
+        workers: One record per worker process.
+        ready_timeout: Seconds to wait for a worker to become ready.
+        stop_timeout: Seconds to wait for a worker to shut down cleanly.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        shard_count: int,
+        workers: int,
+        process_factory: Optional[Callable[[Worker], Any]] = None,
+        ready_timeout: float = DEFAULT_READY_TIMEOUT,
+        stop_timeout: float = DEFAULT_STOP_TIMEOUT,
+    ):
+        """
+        :param shard_count: Total number of shards.
+        :param workers: Number of worker processes.
+        :param process_factory: Creates an unstarted process for a worker;
+            defaults to spawning ``run_worker``.
+        :param ready_timeout: Seconds to wait for a worker to become ready.
+        :param stop_timeout: Seconds to wait for a worker to shut down.
+        """
+        self.shard_count = shard_count
+        self.workers = [
+            Worker(index, shard_ids)
+            for index, shard_ids in enumerate(split_shards(shard_count, workers))
+        ]
+        self.ready_timeout = ready_timeout
+        self.stop_timeout = stop_timeout
+        # Spawned workers do not inherit the launcher's state or sockets
+        self._context = multiprocessing.get_context("spawn")
+        self._process_factory = process_factory or self._spawn
+        self._stopping = False
+        self._roll_requested = False
+
+    def _spawn(self, worker: Worker):
+        # Each worker serves its metrics on its own port and logs to its own
+        # file; the launcher keeps the default one
+        base_port = get_config().metrics_port
+        metrics_port = base_port + worker.index if base_port else None
+        return self._context.Process(
+            target=run_worker,
+            args=(
+                worker.shard_ids,
+                self.shard_count,
+                worker.ready,
+                metrics_port,
+                worker_log_file(worker.index),
+            ),
+            name=f"asdana-worker-{worker.index}",
+        )
+
+    def start_worker(self, worker: Worker) -> None:
+        """
+        Starts a new process for a worker.
+        :param worker: The worker.
+        """
+        worker.ready = self._context.Event()
+        worker.process = self._process_factory(worker)
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        logger.info("Started %s as PID %s.", worker.name, worker.process.pid)
+
+    def wait_ready(self, worker: Worker) -> bool:
+        """
+        Waits for a worker's bot to become ready.
+        :param worker: The worker.
+        :return: Whether it became ready before the timeout.
+        """
+        deadline = time.monotonic() + self.ready_timeout
+        while (remaining := deadline - time.monotonic()) > 0 and not self._stopping:
+            if worker.ready.wait(min(POLL_INTERVAL, remaining)):
+                logger.info(
+                    "%s ready after %.1f s.",
+                    worker.name,
+                    time.monotonic() - worker.started_at,
+                )
+                return True
+            if not worker.process.is_alive():
+                break
+        logger.error("%s did not become ready.", worker.name)
+        return False
+
+    def stop_worker(self, worker: Worker) -> None:
+        """
+        Stops a worker, asking it to shut down cleanly before forcing it.
+        :param worker: The worker.
+        """
+        process = worker.process
+        if process is None or not process.is_alive():
+            return
+        logger.info("Stopping %s.", worker.name)
+        # asyncio.run turns SIGINT into a cancellation, so the bot closes
+        os.kill(process.pid, signal.SIGINT)
+        process.join(self.stop_timeout)
+        if process.is_alive():
+            logger.warning("%s did not stop in time; terminating it.", worker.name)
+            process.terminate()
+            process.join(self.stop_timeout)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def start_all(self) -> None:
+        """
+        Starts every worker, one at a time.
+        """
+        for worker in self.workers:
+            if self._stopping:
+                return
+            self.start_worker(worker)
+            self.wait_ready(worker)
+
+    def check_workers(self, now: Optional[float] = None) -> None:
+        """
+        Schedules restarts for workers that exited and performs those that
+        are due. The delay doubles with each consecutive failure and resets
+        once a worker has run for ``STABLE_UPTIME``.
+        :param now: The current monotonic time.
+        """
+        now = time.monotonic() if now is None else now
+        for worker in self.workers:
+            if self._stopping or worker.process is None or worker.process.is_alive():
+                continue
+            if worker.restart_at is None:
+                if now - worker.started_at >= STABLE_UPTIME:
+                    worker.failures = 0
+                delay = min(MIN_RESTART_DELAY * 2**worker.failures, MAX_RESTART_DELAY)
+                worker.failures += 1
+                worker.restart_at = now + delay
+                logger.warning(
+                    "%s exited with code %s; restarting in %.0f s.",
+                    worker.name,
+                    worker.process.exitcode,
+                    delay,
+                )
+            elif now >= worker.restart_at:
+                worker.restart_at = None
+                worker.restarts += 1
+                self.start_worker(worker)
+
+    def rolling_restart(self) -> None:
+        """
+        Restarts the workers one at a time, waiting for each to be ready
+        before moving on. Stops rolling if a worker fails to come back.
+        """
+        logger.info("Rolling restart of %d workers.", len(self.workers))
+        for worker in self.workers:
+            if self._stopping:
+                return
+            self.stop_worker(worker)
+            worker.restart_at = None
+            self.start_worker(worker)
+            if not self.wait_ready(worker):
+                logger.error("Rolling restart stopped at %s.", worker.name)
+                return
+        logger.info("Rolling restart finished.")
+
+    def request_stop(self, *_) -> None:
+        """
+        Asks the supervision loop to stop. Usable as a signal handler.
+        """
+        self._stopping = True
+
+    def request_rolling_restart(self, *_) -> None:
+        """
+        Asks the supervision loop for a rolling restart. Usable as a signal
+        handler.
+        """
+        self._roll_requested = True
+
+    def run(self) -> None:
+        """
+        Starts the cluster and supervises it until asked to stop.
+        """
+        signal.signal(signal.SIGINT, self.request_stop)
+        signal.signal(signal.SIGTERM, self.request_stop)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self.request_rolling_restart)
+
+        logger.info(
+            "Starting %d workers for %d shards.", len(self.workers), self.shard_count
+        )
+        try:
+            self.start_all()
+            while not self._stopping:
+                if self._roll_requested:
+                    self._roll_requested = False
+                    self.rolling_restart()
+                self.check_workers()
+                time.sleep(POLL_INTERVAL)
+        finally:
+            self._stopping = True
+            for worker in self.workers:
+                self.stop_worker(worker)
+            logger.info("Cluster stopped.")
+
+
+def main() -> None:
+    """
+    Parses command line arguments and runs the cluster.
+    """
+    config = get_config()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.cluster_workers or os.cpu_count() or 1,
+        help="Worker processes (default: CLUSTER_WORKERS or the CPU count)",
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        default=config.shard_count,
+        help="Total shards (default: SHARD_COUNT or Discord's recommendation)",
+    )
+    args = parser.parse_args()
+
+    setup_logging(config.log_level)
+    shard_count = args.shard_count or asyncio.run(
+        fetch_recommended_shards(config.bot_token)
+    )
+    ClusterLauncher(shard_count, args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import logging
 from typing import Optional
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 from sqlalchemy import select
 from sqlalchemy.orm import attributes
@@ -58,9 +59,9 @@ class Config(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @commands.group(name="config", aliases=["cfg"])
-    @commands.guild_only()
-    @is_admin()
+    @commands.hybrid_group(name="config", aliases=["cfg"])
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
     async def config(self, ctx: commands.Context):
         """
         Configuration commands for server settings.
@@ -69,12 +70,15 @@ class Config(commands.Cog):
             await ctx.send_help(ctx.command)
 
     @config.command(name="prefix")
+    @commands.guild_only()
+    @is_admin()
     async def set_prefix(self, ctx: commands.Context, prefix: str):
         """
         Set a custom command prefix for this server.
 
         Usage: !config prefix <new_prefix>
         Example: !config prefix ?
+        :param prefix: The new prefix, at most 10 characters.
         """
         if len(prefix) > 10:
             await ctx.send("❌ Prefix must be 10 characters or less.")
@@ -90,6 +94,8 @@ class Config(commands.Cog):
         await ctx.send(f"✅ Command prefix changed from `{old_prefix}` to `{prefix}`")
 
     @config.command(name="show")
+    @commands.guild_only()
+    @is_admin()
     async def show_config(self, ctx: commands.Context):
         """
         Display current server configuration.
@@ -135,6 +141,8 @@ class Config(commands.Cog):
         await ctx.send(embed=embed)
 
     @config.command(name="adminrole")
+    @commands.guild_only()
+    @is_admin()
     async def manage_admin_role(
         self, ctx: commands.Context, action: str, role: Optional[discord.Role] = None
     ):
@@ -143,6 +151,8 @@ class Config(commands.Cog):
 
         Usage: !config adminrole <add|remove> <@role>
         Example: !config adminrole add @Moderators
+        :param action: "add" or "remove".
+        :param role: The role.
         """
         if action.lower() not in ["add", "remove"]:
             await ctx.send("❌ Action must be either 'add' or 'remove'")
@@ -186,12 +196,15 @@ class Config(commands.Cog):
             await ctx.send_help(ctx.command)
 
     @module_config.command(name="enable")
+    @commands.guild_only()
+    @is_admin()
     async def enable_cog(self, ctx: commands.Context, cog_name: str):
         """
         Enable a cog for this server.
 
         Usage: !config cog enable <cog_name>
         Example: !config cog enable random
+        :param cog_name: The cog to enable.
         """
         # Check if cog exists
         cog = self.bot.get_cog(cog_name.title())
@@ -224,12 +237,15 @@ class Config(commands.Cog):
         await ctx.send(f"✅ Enabled cog '{cog_name}' for this server")
 
     @module_config.command(name="disable")
+    @commands.guild_only()
+    @is_admin()
     async def disable_cog(self, ctx: commands.Context, cog_name: str):
         """
         Disable a cog for this server.
 
         Usage: !config cog disable <cog_name>
         Example: !config cog disable random
+        :param cog_name: The cog to disable.
         """
         # Prevent disabling the config cog
         if cog_name.lower() == "config":
@@ -267,6 +283,8 @@ class Config(commands.Cog):
         await ctx.send(f"✅ Disabled cog '{cog_name}' for this server")
 
     @module_config.command(name="list")
+    @commands.guild_only()
+    @is_admin()
     async def list_cogs(self, ctx: commands.Context):
         """
         List all cogs and their status for this server.
@@ -2,8 +2,22 @@
 Development cog for Asdana. Not intended (or most likely useful) for production use.
 """
 
+import asyncio
+import io
+from typing import Optional
+
+import discord
 from discord.ext import commands
 
+from asdana.core.memory import MemoryTracer, object_counts
+from asdana.core.profiler import (
+    DEFAULT_DURATION,
+    MAX_DURATION,
+    SAMPLING,
+    create_profiler,
+)
+from asdana.core.tracing import get_tracer
+
 
 class Dev(commands.Cog):
     """
@@ -12,8 +26,23 @@ class Dev(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self._profiler = None
+        self._profile_timer: Optional[asyncio.Task] = None
+        self._memory = MemoryTracer()
+
+    async def cog_unload(self) -> None:
+        """
+        Stops a running profile without reporting it.
+        """
+        if self._profile_timer is not None:
+            self._profile_timer.cancel()
+        if self._profiler is not None:
+            self._profiler.stop()
+            self._profiler = None
+        if self._memory.running:
+            self._memory.stop()
 
-    @commands.command(name="ginfo")
+    @commands.hybrid_command(name="ginfo")
     async def guild_info(self, context: commands.Context):
         """
         Displays information about the guild the command was run in.
@@ -22,9 +51,351 @@ class Dev(commands.Cog):
         :return: None
         """
         guild = context.guild
+        # Members may not be cached (see MEMBER_CACHE), so look the owner up
+        owner = guild.owner or await guild.fetch_member(guild.owner_id)
         await context.send(
             f"Name: {guild.name}\n"
             f"ID: {guild.id}\n"
-            f"Owner: {guild.owner}"
+            f"Owner: {owner}"
             f"\nMember Count: {guild.member_count}"
         )
+
+    @commands.hybrid_command(name="offload")
+    @commands.is_owner()
+    async def offload_stats(self, context: commands.Context):
+        """
+        Displays queue depth and runtime metrics of the offload executor.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        executor = getattr(self.bot, "executor", None)
+        if executor is None:
+            await context.send("This bot has no offload executor.")
+            return
+
+        lines = []
+        for kind, stats in executor.stats.items():
+            lines.append(
+                f"{kind}: {stats.workers} workers, {stats.pending} pending, "
+                f"queue depth {stats.queue_depth}\n"
+                f"  completed {stats.completed}, failed {stats.failed}, "
+                f"timed out {stats.timed_out}, cancelled {stats.cancelled}\n"
+                f"  mean run {stats.mean_runtime * 1000:.1f} ms, "
+                f"max run {stats.max_runtime * 1000:.1f} ms, "
+                f"mean wait {stats.mean_wait * 1000:.1f} ms"
+            )
+        await context.send("```\n" + "\n".join(lines) + "\n```")
+
+    @commands.hybrid_command(name="sync")
+    @commands.is_owner()
+    async def sync_commands(self, context: commands.Context):
+        """
+        Syncs the slash commands with Discord, even if they did not change.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        sync = getattr(self.bot, "sync_app_commands", None)
+        if sync is None:
+            await context.send("This bot does not sync slash commands.")
+            return
+
+        await context.defer()
+        scopes = await sync(force=True)
+        await context.send(f"Synced slash commands to {', '.join(scopes)}.")
+
+    @commands.hybrid_command(name="cmdstats")
+    @commands.is_owner()
+    async def command_stats(
+        self, context: commands.Context, command: Optional[str] = None
+    ):
+        """
+        Displays latency percentiles of commands and where their time goes.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :param command: Only show this command.
+        :return: None
+        """
+        metrics = getattr(self.bot, "command_metrics", None)
+        if metrics is None:
+            await context.send("This bot does not time commands.")
+            return
+
+        await context.send(f"```\n{metrics.format_report(command)}\n```")
+
+    @commands.hybrid_command(name="queries")
+    @commands.is_owner()
+    async def query_stats(self, context: commands.Context):
+        """
+        Displays SQL statements and round trips per command and event.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        metrics = getattr(self.bot, "query_metrics", None)
+        if metrics is None:
+            await context.send("This bot does not count queries.")
+            return
+
+        await context.send(f"```\n{metrics.format_report()[:1900]}\n```")
+
+    @commands.hybrid_command(name="monitor")
+    @commands.is_owner()
+    async def monitor_stats(self, context: commands.Context):
+        """
+        Displays event loop lag, memory, CPU and garbage collector activity.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        monitor = getattr(self.bot, "monitor", None)
+        if monitor is None:
+            await context.send("This bot has no resource monitor.")
+            return
+
+        await context.send(f"```\n{monitor.format_report()}\n```")
+
+    @commands.hybrid_command(name="stalls")
+    @commands.is_owner()
+    async def stall_report(self, context: commands.Context, reset: bool = False):
+        """
+        Attaches the lines that were running while the event loop was blocked.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :param reset: Forget the samples after reporting them.
+        :return: None
+        """
+        watchdog = getattr(self.bot, "watchdog", None)
+        if watchdog is None:
+            await context.send(
+                "The stall watchdog is off; set WATCHDOG_THRESHOLD_MS to enable it."
+            )
+            return
+
+        report = watchdog.format_report(limit=25)
+        if reset:
+            watchdog.reset()
+        await context.send(
+            f"```\n{report.splitlines()[0]}\n```",
+            file=discord.File(io.BytesIO(report.encode()), filename="stalls.txt"),
+        )
+
+    @commands.hybrid_group(name="profile")
+    @commands.is_owner()
+    async def profile(self, context: commands.Context):
+        """
+        Profiles the bot's CPU use for a limited time.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        if context.invoked_subcommand is None:
+            await context.send_help(context.command)
+
+    @profile.command(name="start")
+    @commands.is_owner()
+    async def profile_start(
+        self,
+        context: commands.Context,
+        mode: str = SAMPLING,
+        seconds: commands.Range[int, 1, MAX_DURATION] = DEFAULT_DURATION,
+    ):
+        """
+        Starts profiling; the result is attached when it ends.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :param mode: "sampling" (low overhead) or "cprofile" (every call).
+        :param seconds: How long to profile before stopping by itself.
+        :return: None
+        """
+        if self._profiler is not None:
+            await context.send("A profile is already running.")
+            return
+
+        try:
+            profiler = create_profiler(mode)
+            profiler.start()
+        except ValueError as e:
+            await context.send(str(e))
+            return
+
+        self._profiler = profiler
+        self._profile_timer = asyncio.create_task(
+            self._finish_profile(context, seconds)
+        )
+        await context.send(f"Profiling ({mode}) for {seconds} s.")
+
+    @profile.command(name="stop")
+    @commands.is_owner()
+    async def profile_stop(self, context: commands.Context):
+        """
+        Stops profiling early and attaches the result.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        if self._profiler is None:
+            await context.send("No profile is running.")
+            return
+
+        self._profile_timer.cancel()
+        await self._finish_profile(context, 0)
+
+    async def _finish_profile(self, context: commands.Context, seconds: float):
+        """
+        Stops the profiler after a delay and sends its result.
+        :param context: Where to send the result.
+        :param seconds: The delay.
+        """
+        await asyncio.sleep(seconds)
+        profiler, self._profiler = self._profiler, None
+        self._profile_timer = None
+        if profiler is None:
+            return
+        profiler.stop()
+        filename, data = profiler.result()
+        await context.send(
+            f"```\n{profiler.summary()[:1900]}\n```",
+            file=discord.File(io.BytesIO(data), filename=filename),
+        )
+
+    @commands.hybrid_group(name="memory")
+    @commands.is_owner()
+    async def memory(self, context: commands.Context):
+        """
+        Traces memory allocations to find what keeps growing.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        if context.invoked_subcommand is None:
+            await context.send_help(context.command)
+
+    @memory.command(name="start")
+    @commands.is_owner()
+    async def memory_start(self, context: commands.Context):
+        """
+        Starts tracing allocations, with the current ones as the baseline.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        if self._memory.running:
+            await context.send("Allocations are already being traced.")
+            return
+
+        await context.defer()
+        await asyncio.to_thread(self._memory.start)
+        await context.send("Tracing allocations; this slows the bot down.")
+
+    @memory.command(name="snapshot")
+    @commands.is_owner()
+    async def memory_snapshot(self, context: commands.Context):
+        """
+        Attaches what grew since the baseline, by module, cog and line.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        if not self._memory.running:
+            await context.send("Allocations are not being traced.")
+            return
+
+        await context.defer()
+        report = await asyncio.to_thread(self._memory.format_report, 50)
+        await context.send(
+            f"```\n{report.splitlines()[0]}\n```",
+            file=discord.File(io.BytesIO(report.encode()), filename="memory.txt"),
+        )
+
+    @memory.command(name="baseline")
+    @commands.is_owner()
+    async def memory_baseline(self, context: commands.Context):
+        """
+        Makes the current allocations the baseline for later snapshots.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        if not self._memory.running:
+            await context.send("Allocations are not being traced.")
+            return
+
+        await context.defer()
+        await asyncio.to_thread(self._memory.reset_baseline)
+        await context.send("Baseline reset.")
+
+    @memory.command(name="stop")
+    @commands.is_owner()
+    async def memory_stop(self, context: commands.Context):
+        """
+        Stops tracing allocations and frees the traces.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        if not self._memory.running:
+            await context.send("Allocations are not being traced.")
+            return
+
+        self._memory.stop()
+        await context.send("Stopped tracing allocations.")
+
+    @memory.command(name="counts")
+    @commands.is_owner()
+    async def memory_counts(self, context: commands.Context):
+        """
+        Counts the entries of the caches and other structures that can grow.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        counts = await object_counts(self.bot)
+        report = "\n".join(f"{name:<20} {count:>10,}" for name, count in counts.items())
+        await context.send(f"```\n{report}\n```")
+
+    @commands.hybrid_command(name="traces")
+    @commands.is_owner()
+    async def traces(
+        self, context: commands.Context, otlp: bool = False, slow_only: bool = False
+    ):
+        """
+        Attaches the kept traces of slow, failed and sampled commands as JSON.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :param otlp: Export in the OTLP/JSON shape for OpenTelemetry tools.
+        :param slow_only: Leave out the randomly sampled traces.
+        :return: None
+        """
+        tracer = get_tracer()
+        kept = tracer.traces(slow_only)
+        lines = [f"{len(kept)} traces kept of {tracer.finished} finished"]
+        for trace in kept[:10]:
+            error = f" - {trace.root.error}" if trace.root.error else ""
+            lines.append(
+                f"{trace.root.duration * 1000:>8.0f} ms  {trace.root.name} "
+                f"({len(trace.spans)} spans){error}"
+            )
+        document = tracer.export(otlp=otlp, slow_only=slow_only)
+        await context.send(
+            "```\n" + "\n".join(lines) + "\n```",
+            file=discord.File(io.BytesIO(document.encode()), filename="traces.json"),
+        )
+
+    @commands.hybrid_command(name="shards")
+    @commands.is_owner()
+    async def shard_stats(self, context: commands.Context):
+        """
+        Displays the latency, event rate and connection counts of each shard.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        metrics = getattr(self.bot, "shard_metrics", None)
+        if metrics is None:
+            await context.send("This bot does not track shards.")
+            return
+
+        report = metrics.format_report(getattr(self.bot, "latencies", []))
+        await context.send(f"```\n{report}\n```")
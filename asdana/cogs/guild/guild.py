@@ -25,7 +25,7 @@ class Guild(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @commands.command(name="menu", aliases=["m"])
+    @commands.hybrid_command(name="menu", aliases=["m"])
     async def example_menu(self, context: commands.Context):
         """
         Creates an example menu
@@ -2,13 +2,38 @@
 Members cog for managing... members. Crazy.
 """
 
+import discord
 from discord.ext import commands
 
+from asdana.core.member_cache import members_required
+
 
 class Members(commands.Cog):
     """
     Provides commands and listeners for managing members.
     """
 
+    # Fetching a guild's member list needs the members intent
+    required_intents = discord.Intents(members=True)
+
     def __init__(self, bot):
         self.bot = bot
+
+    @commands.hybrid_command(name="membercount", aliases=["mc"])
+    @commands.guild_only()
+    @members_required()
+    async def member_count(self, context: commands.Context):
+        """
+        Counts the humans and bots in the guild.
+        The member list is fetched on first use, since members are not cached
+        by default.
+        :param context: The context of the command.
+        :type context: commands.Context
+        :return: None
+        """
+        members = context.guild.members
+        bots = sum(1 for member in members if member.bot)
+        await context.send(
+            f"👥 **{len(members):,}** members "
+            f"(humans: {len(members) - bots:,}, bots: {bots:,})"
+        )
@@ -4,18 +4,19 @@ Provides functionality to create interactive menus with reaction buttons.
 
 import datetime
 import logging
-from typing import Any, Callable, Coroutine, Dict
+from typing import Any, Callable, Coroutine, Dict, Optional
 
 import discord
 from discord.ext import commands
 from sqlalchemy import select
-from sqlalchemy.orm import joinedload
 
 from asdana.cogs.menus.menu_cleanup import run_menu_cleanup_task
 from asdana.cogs.menus.menu_handlers import (
     create_generic_handlers,
     create_paginated_handlers,
 )
+from asdana.core.metrics import MetricFamily
+from asdana.core.shards import owns_shard_zero
 from asdana.database.database import get_session as get_db_session
 from asdana.database.models import Menu, User
 
@@ -58,13 +59,24 @@ class ReactionMenu(commands.Cog):
         ```
     """
 
+    # on_reaction_add only fires for cached messages, which needs message
+    # events; the reactions intent follows from the listener
+    required_intents = discord.Intents(guild_messages=True, dm_messages=True)
+
     def __init__(self, bot):
         self.bot = bot
         self.active_menus = {}
-        self.bot.loop.create_task(self.load_persistent_menus())
-        self.menu_cleanup_task = self.bot.loop.create_task(
-            run_menu_cleanup_task(self.bot, self.active_menus)
-        )
+        self.restored_shards: set[int] = set()
+        # A sharded bot restores each shard's menus as soon as that shard is
+        # ready (see on_shard_ready) instead of waiting for all of them
+        if not isinstance(bot, commands.AutoShardedBot) or bot.is_ready():
+            self.bot.loop.create_task(self.load_persistent_menus())
+        # Expired menus are cleaned up by the process that runs shard 0 only
+        self.menu_cleanup_task = None
+        if owns_shard_zero(bot):
+            self.menu_cleanup_task = self.bot.loop.create_task(
+                run_menu_cleanup_task(self.bot, self.active_menus)
+            )
 
     async def create_menu(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
         self,
@@ -166,6 +178,22 @@ class ReactionMenu(commands.Cog):
 
         return message
 
+    def collect_metrics(self) -> list[MetricFamily]:
+        """
+        Reports how many menus are waiting for reactions.
+        """
+        return [
+            MetricFamily(
+                "asdana_active_menus", "gauge", "Menus waiting for reactions."
+            ).add(len(self.active_menus))
+        ]
+
+    def object_counts(self) -> dict[str, int]:
+        """
+        Counts the menus held in memory, for memory reports.
+        """
+        return {"active menus": len(self.active_menus)}
+
     @commands.Cog.listener()
     async def on_reaction_add(self, reaction: discord.Reaction, user: discord.User):
         """
@@ -231,21 +259,42 @@ class ReactionMenu(commands.Cog):
         except discord.HTTPException:
             logger.warning("Could not remove reaction for message ID %s", message_id)
 
-    async def load_persistent_menus(self):
+    @commands.Cog.listener()
+    async def on_shard_ready(self, shard_id: int):
+        """
+        Restores the menus of a shard's guilds once the shard is ready.
+        Shards that become ready again after reconnecting are skipped.
+        """
+        if shard_id in self.restored_shards:
+            return
+        self.restored_shards.add(shard_id)
+        await self.load_persistent_menus(shard_id)
+
+    async def load_persistent_menus(self, shard_id: Optional[int] = None):
         """
         Load active menus from the database when the bot starts up.
+
+        Args:
+            shard_id: Only restore menus in guilds on this shard. Without it,
+                waits until the bot is ready and restores every menu.
         """
-        await self.bot.wait_until_ready()
-        logger.info("Loading active menus from database...")
+        if shard_id is None:
+            await self.bot.wait_until_ready()
+            logger.info("Loading active menus from database...")
+        else:
+            logger.info("Loading active menus for shard %s from database...", shard_id)
 
         async with get_db_session() as session:
             # Get all non-expired menus
             now = discord.utils.utcnow()
-            query = (
-                select(Menu)
-                .options(joinedload(Menu.author))
-                .where((Menu.expires_at > now) | (Menu.expires_at is None))
+            query = select(Menu).where(
+                (Menu.expires_at > now) | (Menu.expires_at is None)
             )
+            if shard_id is not None:
+                # Discord's routing rule, evaluated in the database
+                query = query.where(
+                    Menu.guild_id.op(">>")(22) % self.bot.shard_count == shard_id
+                )
 
             result = await session.execute(query)
             persistent_menus = result.scalars().all()
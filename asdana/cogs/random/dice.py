@@ -0,0 +1,370 @@
+"""
+Dice notation parser and roller.
+
+Supports expressions such as ``d20``, ``12d6+3``, ``4d6kh3``, ``2d20kl1``,
+``8d6dl2``, ``10d6!`` and ``d%``, combined with ``+`` and ``-``.
+
+Small pools are rolled die by die so every result can be shown. Large pools
+are never materialized: the number of dice landing on each face is drawn from
+a multinomial distribution as a chain of conditional binomials, which costs
+O(min(dice, sides)) time and memory however many dice are rolled. Keep and
+drop modifiers then walk the face counts from the top or the bottom, and
+exploding dice re-roll the count of maximum faces as a new, smaller pool.
+"""
+
+# pylint: disable=too-few-public-methods
+
+import random
+import re
+from collections import Counter
+from typing import Optional
+
+# Limits that keep a single roll cheap enough for the event loop
+MAX_EXPRESSION_LENGTH = 100
+MAX_TERMS = 10
+MAX_DICE = 1_000_000_000
+MAX_SIDES = 10_000
+MAX_EXPLOSION_ROUNDS = 100
+# Pools up to this size are rolled die by die and shown in full
+SHOW_ROLLS_LIMIT = 20
+
+_TERM_PATTERN = re.compile(
+    r"\s*(?P<sign>[+-])?\s*(?:"
+    r"(?P<count>\d*)d(?P<sides>\d+|%)(?P<explode>!)?"
+    r"(?:(?P<keep>kh|kl|dh|dl|k)(?P<keep_count>\d+))?"
+    r"|(?P<constant>\d+))\s*",
+    re.IGNORECASE,
+)
+
+
+class DiceError(ValueError):
+    """
+    Raised for malformed dice expressions or expressions over the limits.
+    """
+
+
+class DiceTerm:
+    """
+    A pool of identical dice with optional modifiers, e.g. ``4d6kh3``.
+
+    Attributes:
+        count: Number of dice rolled.
+        sides: Number of sides on each die.
+        explode: Whether dice showing the maximum face are rolled again.
+        keep: One of ``kh``, ``kl``, ``dh``, ``dl``, or None.
+        keep_count: Number of dice the keep or drop modifier applies to.
+        sign: 1 to add the term, -1 to subtract it.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        count: int,
+        sides: int,
+        explode: bool = False,
+        keep: Optional[str] = None,
+        keep_count: int = 0,
+        sign: int = 1,
+    ):
+        if not 1 <= count <= MAX_DICE:
+            raise DiceError(f"Roll between 1 and {MAX_DICE:,} dice.")
+        if not 1 <= sides <= MAX_SIDES:
+            raise DiceError(f"Dice need between 1 and {MAX_SIDES:,} sides.")
+        if explode and sides < 2:
+            raise DiceError("Only dice with two or more sides can explode.")
+        if explode and keep:
+            raise DiceError("Exploding dice can't be combined with keep or drop.")
+        if keep and not 0 <= keep_count <= count:
+            raise DiceError(f"Can't keep or drop {keep_count} of {count} dice.")
+        self.count = count
+        self.sides = sides
+        self.explode = explode
+        self.keep = keep
+        self.keep_count = keep_count
+        self.sign = sign
+
+    def __str__(self) -> str:
+        text = f"{self.count}d{self.sides}"
+        if self.explode:
+            text += "!"
+        if self.keep:
+            text += f"{self.keep}{self.keep_count}"
+        return text
+
+    def roll(self, rng) -> "TermResult":
+        """
+        Rolls the pool.
+        :param rng: The random number generator to use.
+        :return: The result of the roll.
+        """
+        if self.count <= SHOW_ROLLS_LIMIT:
+            return self._roll_each(rng)
+
+        counts = face_counts(rng, self.count, self.sides)
+        if self.explode:
+            pending = counts[self.sides]
+            for _ in range(MAX_EXPLOSION_ROUNDS):
+                if not pending:
+                    break
+                extra = face_counts(rng, pending, self.sides)
+                counts.update(extra)
+                pending = extra[self.sides]
+        if self.keep:
+            counts = _kept_counts(counts, self.kept_dice, self.keeps_highest)
+        total = sum(face * number for face, number in counts.items())
+        return TermResult(self, total)
+
+    def _roll_each(self, rng) -> "TermResult":
+        rolls = []
+        for _ in range(self.count):
+            value = rng.randint(1, self.sides)
+            if self.explode:
+                last = value
+                for _ in range(MAX_EXPLOSION_ROUNDS):
+                    if last != self.sides:
+                        break
+                    last = rng.randint(1, self.sides)
+                    value += last
+            rolls.append(value)
+
+        kept = [True] * len(rolls)
+        if self.keep:
+            order = sorted(
+                range(len(rolls)), key=rolls.__getitem__, reverse=self.keeps_highest
+            )
+            kept = [False] * len(rolls)
+            for index in order[: self.kept_dice]:
+                kept[index] = True
+        total = sum(roll for roll, keep in zip(rolls, kept) if keep)
+        return TermResult(self, total, rolls, kept)
+
+    @property
+    def kept_dice(self) -> int:
+        """
+        Number of dice that count towards the total.
+        """
+        if self.keep in ("kh", "kl"):
+            return self.keep_count
+        return self.count - self.keep_count
+
+    @property
+    def keeps_highest(self) -> bool:
+        """
+        Whether the kept dice are the highest ones.
+        """
+        return self.keep in ("kh", "dl")
+
+
+class TermResult:
+    """
+    The outcome of rolling one term.
+
+    Attributes:
+        term: The term that was rolled.
+        total: The term's unsigned total.
+        rolls: Individual die results, for pools small enough to show.
+        kept: Whether each die in ``rolls`` counts towards the total.
+    """
+
+    def __init__(
+        self,
+        term: DiceTerm,
+        total: int,
+        rolls: Optional[list[int]] = None,
+        kept: Optional[list[bool]] = None,
+    ):
+        self.term = term
+        self.total = total
+        self.rolls = rolls
+        self.kept = kept
+
+    def __str__(self) -> str:
+        if self.rolls is None:
+            return f"{self.term} ({self.total:,})"
+        shown = ", ".join(
+            str(roll) if keep else f"~~{roll}~~"
+            for roll, keep in zip(self.rolls, self.kept)
+        )
+        return f"{self.term} [{shown}]"
+
+
+class DiceExpression:
+    """
+    A parsed dice expression: dice terms and constants added together.
+
+    Attributes:
+        terms: The dice terms.
+        modifier: Sum of the constant terms.
+        constants: The signed constant terms, in order.
+    """
+
+    def __init__(self, terms: list[DiceTerm], constants: list[int]):
+        self.terms = terms
+        self.constants = constants
+        self.modifier = sum(constants)
+
+    def __str__(self) -> str:
+        return _join_terms(
+            [(term.sign, str(term)) for term in self.terms], self.constants
+        )
+
+    def roll(self, rng=None) -> "RollResult":
+        """
+        Rolls every term of the expression.
+        :param rng: Random number generator; defaults to the ``random`` module.
+        :return: The result of the roll.
+        """
+        rng = rng or random
+        results = [term.roll(rng) for term in self.terms]
+        return RollResult(self, results)
+
+
+class RollResult:
+    """
+    The outcome of rolling a dice expression.
+
+    Attributes:
+        expression: The expression that was rolled.
+        results: One result per dice term.
+        total: The final total.
+    """
+
+    def __init__(self, expression: DiceExpression, results: list[TermResult]):
+        self.expression = expression
+        self.results = results
+        self.total = expression.modifier + sum(
+            result.term.sign * result.total for result in results
+        )
+
+    def __str__(self) -> str:
+        return _join_terms(
+            [(result.term.sign, str(result)) for result in self.results],
+            self.expression.constants,
+        )
+
+
+def _join_terms(parts: list[tuple[int, str]], constants: list[int]) -> str:
+    """
+    Joins signed terms and constants into ``a + b - c`` form.
+    :param parts: (sign, text) pairs for the dice terms.
+    :param constants: The signed constants.
+    :return: The joined text.
+    """
+    parts = parts + [(value, str(abs(value))) for value in constants]
+    text = " ".join(f"{'-' if sign < 0 else '+'} {part}" for sign, part in parts)
+    return text[2:] if text.startswith("+ ") else text
+
+
+def face_counts(rng, count: int, sides: int) -> Counter:
+    """
+    Rolls a pool of dice and returns how many landed on each face.
+
+    Pools with fewer dice than sides are rolled die by die. Larger pools draw
+    the count for each face from a binomial conditioned on the dice left over
+    by the faces before it, which yields an exact multinomial sample in
+    O(sides) steps.
+    :param rng: The random number generator to use.
+    :param count: Number of dice.
+    :param sides: Number of sides on each die.
+    :return: Mapping of face to the number of dice showing it.
+    """
+    if count <= sides:
+        return Counter(rng.randint(1, sides) for _ in range(count))
+
+    counts = Counter()
+    remaining = count
+    for face in range(1, sides):
+        if not remaining:
+            break
+        landed = rng.binomialvariate(remaining, 1 / (sides - face + 1))
+        if landed:
+            counts[face] = landed
+            remaining -= landed
+    if remaining:
+        counts[sides] = remaining
+    return counts
+
+
+def _kept_counts(counts: Counter, kept: int, from_top: bool) -> Counter:
+    """
+    Keeps the highest or lowest dice of a pool given as face counts.
+    :param counts: Mapping of face to the number of dice showing it.
+    :param kept: Number of dice to keep.
+    :param from_top: Keep the highest dice if True, the lowest otherwise.
+    :return: Face counts of the kept dice.
+    """
+    result = Counter()
+    for face in sorted(counts, reverse=from_top):
+        if not kept:
+            break
+        taken = min(counts[face], kept)
+        result[face] = taken
+        kept -= taken
+    return result
+
+
+def parse(expression: str) -> DiceExpression:
+    """
+    Parses a dice expression.
+
+    A bare number ``N`` is read as ``1dN``, matching the original single-die
+    form of the roll command.
+    :param expression: The expression, e.g. ``4d6kh3+2``.
+    :return: The parsed expression.
+    :raises DiceError: If the expression is malformed or over the limits.
+    """
+    expression = expression.strip()
+    if not expression:
+        raise DiceError("Give a dice expression, e.g. `2d6+3`.")
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise DiceError(
+            f"Dice expressions are limited to {MAX_EXPRESSION_LENGTH} characters."
+        )
+    if expression.isdigit():
+        expression = f"d{expression}"
+
+    terms: list[DiceTerm] = []
+    constants: list[int] = []
+    position = 0
+    while position < len(expression):
+        match = _TERM_PATTERN.match(expression, position)
+        if not match or match.end() == position:
+            raise DiceError(
+                f"Couldn't read the dice expression at `{expression[position:]}`."
+            )
+        if position and not match.group("sign"):
+            raise DiceError("Separate terms with `+` or `-`.")
+        position = match.end()
+
+        sign = -1 if match.group("sign") == "-" else 1
+        if match.group("constant") is not None:
+            constants.append(sign * int(match.group("constant")))
+        else:
+            sides = match.group("sides")
+            keep = match.group("keep")
+            terms.append(
+                DiceTerm(
+                    count=int(match.group("count") or 1),
+                    sides=100 if sides == "%" else int(sides),
+                    explode=bool(match.group("explode")),
+                    keep={"k": "kh"}.get(keep.lower(), keep.lower()) if keep else None,
+                    keep_count=int(match.group("keep_count") or 0),
+                    sign=sign,
+                )
+            )
+        if len(terms) + len(constants) > MAX_TERMS:
+            raise DiceError(f"Dice expressions are limited to {MAX_TERMS} terms.")
+
+    if not terms:
+        raise DiceError("Roll at least one die, e.g. `d20`.")
+    return DiceExpression(terms, constants)
+
+
+def roll(expression: str, rng=None) -> RollResult:
+    """
+    Parses and rolls a dice expression.
+    :param expression: The expression, e.g. ``4d6kh3+2``.
+    :param rng: Random number generator; defaults to the ``random`` module.
+    :return: The result of the roll.
+    :raises DiceError: If the expression is malformed or over the limits.
+    """
+    return parse(expression).roll(rng)
@@ -0,0 +1,446 @@
+"""
+Exact probability distributions for dice expressions.
+
+A distribution is stored as integer outcome counts, so every probability is an
+exact fraction. Sums of identical dice are built by repeated squaring of the
+single-die distribution, taking O(log dice) convolutions; each convolution
+packs both coefficient lists into one big integer and multiplies them
+(Kronecker substitution), which hands the work to CPython's Karatsuba
+multiplication. Keep and drop modifiers use a dynamic program over the faces.
+
+Distributions are memoized in a size-bounded LRU cache keyed by
+``(count, sides, keep, keep_count)``, together with the intermediate powers
+and whole expressions, so popular queries are answered from memory.
+"""
+
+import math
+import operator
+import re
+import sys
+from collections import OrderedDict
+from fractions import Fraction
+from typing import Optional
+
+from asdana.cogs.random.dice import DiceError, DiceExpression, DiceTerm, parse
+
+# Default configuration constants
+DEFAULT_CACHE_ENTRIES = 512
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+# Largest distribution built for one query, in bytes of outcome counts
+MAX_DISTRIBUTION_BYTES = 1024 * 1024
+# Upper bound on dynamic-programming steps for keep and drop modifiers
+MAX_KEEP_WORK = 2_000_000
+HISTOGRAM_ROWS = 15
+HISTOGRAM_WIDTH = 20
+
+COMPARISONS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+_QUERY_PATTERN = re.compile(
+    r"^(?P<expression>.+?)\s*(?:(?P<op>>=|<=|==|!=|=|>|<)\s*(?P<value>-?\d+))?\s*$"
+)
+
+
+class Distribution:
+    """
+    Exact distribution of an integer-valued roll.
+
+    Attributes:
+        offset: The smallest possible value.
+        counts: Number of outcomes for each value, starting at ``offset``.
+        total: Total number of outcomes.
+    """
+
+    def __init__(self, offset: int, counts: list[int]):
+        self.offset = offset
+        self.counts = counts
+        self.total = sum(counts)
+
+    @property
+    def minimum(self) -> int:
+        """
+        The smallest possible value.
+        """
+        return self.offset
+
+    @property
+    def maximum(self) -> int:
+        """
+        The largest possible value.
+        """
+        return self.offset + len(self.counts) - 1
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        Approximate memory held by the outcome counts.
+        """
+        return sys.getsizeof(self.counts) + sum(map(sys.getsizeof, self.counts))
+
+    def __add__(self, other: "Distribution") -> "Distribution":
+        """
+        Distribution of the sum of two independent rolls.
+        """
+        return Distribution(
+            self.offset + other.offset, _convolve(self.counts, other.counts)
+        )
+
+    def __neg__(self) -> "Distribution":
+        return Distribution(-self.maximum, self.counts[::-1])
+
+    def shifted(self, amount: int) -> "Distribution":
+        """
+        Distribution of the roll plus a constant.
+        :param amount: The constant to add.
+        :return: The shifted distribution.
+        """
+        return Distribution(self.offset + amount, self.counts)
+
+    def probability(self, op: str, value: int) -> Fraction:
+        """
+        Exact probability that the roll compares to a value.
+        :param op: One of the operators in ``COMPARISONS``.
+        :param value: The value to compare against.
+        :return: The probability as a fraction.
+        """
+        compare = COMPARISONS[op]
+        hits = sum(
+            count
+            for index, count in enumerate(self.counts)
+            if compare(self.offset + index, value)
+        )
+        return Fraction(hits, self.total)
+
+    def mean(self) -> Fraction:
+        """
+        Exact expected value.
+        """
+        weighted = sum(index * count for index, count in enumerate(self.counts))
+        return self.offset + Fraction(weighted, self.total)
+
+    def stdev(self) -> float:
+        """
+        Standard deviation.
+        """
+        mean = self.mean() - self.offset
+        squares = sum(index * index * count for index, count in enumerate(self.counts))
+        return math.sqrt(Fraction(squares, self.total) - mean * mean)
+
+    def mode(self) -> int:
+        """
+        The most likely value (the lowest one on ties).
+        """
+        return self.offset + self.counts.index(max(self.counts))
+
+    def histogram(
+        self, rows: int = HISTOGRAM_ROWS, width: int = HISTOGRAM_WIDTH
+    ) -> str:
+        """
+        Renders the distribution as a text bar chart.
+        Values are grouped into buckets so the chart has at most ``rows`` rows.
+        :param rows: Maximum number of rows.
+        :param width: Width of the longest bar, in characters.
+        :return: The chart, one bucket per line.
+        """
+        bucket = -(-len(self.counts) // rows)
+        groups = []
+        for start in range(0, len(self.counts), bucket):
+            low = self.offset + start
+            high = min(low + bucket - 1, self.maximum)
+            label = str(low) if low == high else f"{low}-{high}"
+            groups.append((label, sum(self.counts[start : start + bucket])))
+        peak = max(count for _, count in groups)
+        label_width = max(len(label) for label, _ in groups)
+
+        lines = []
+        for label, count in groups:
+            blocks = "█" * round(width * count / peak)
+            share = 100 * count / self.total
+            lines.append(f"{label:>{label_width}} {blocks:<{width}} {share:6.2f}%")
+        return "\n".join(lines)
+
+
+class DistributionCache:
+    """
+    LRU cache of distributions bounded by entry count and memory.
+
+    Attributes:
+        max_entries: Maximum number of cached distributions.
+        max_bytes: Maximum approximate memory held by cached distributions.
+        size_bytes: Approximate memory currently held.
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups that missed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key) -> Optional[Distribution]:
+        """
+        Looks up a distribution, marking it as recently used.
+        :param key: The cache key.
+        :return: The distribution, or None if it is not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, distribution: Distribution) -> None:
+        """
+        Caches a distribution, evicting the least recently used ones to make
+        room. Distributions larger than the whole cache are not stored.
+        :param key: The cache key.
+        :param distribution: The distribution to cache.
+        """
+        size = distribution.size_bytes
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.size_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (distribution, size)
+        self.size_bytes += size
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size_bytes -= evicted
+
+    def clear(self) -> None:
+        """
+        Empties the cache.
+        """
+        self._entries.clear()
+        self.size_bytes = 0
+
+
+_default_cache = DistributionCache()
+
+
+def default_cache() -> DistributionCache:
+    """
+    Returns the cache used when no other is given. Each process, including
+    process pool workers, has its own.
+    """
+    return _default_cache
+
+
+def _convolve(left: list[int], right: list[int]) -> list[int]:
+    """
+    Multiplies two polynomials given as coefficient lists.
+
+    Both lists are packed into integers with one fixed-width byte field per
+    coefficient, wide enough that no product coefficient can overflow into
+    its neighbour, and multiplied as integers.
+    :param left: Coefficients of the first polynomial.
+    :param right: Coefficients of the second polynomial.
+    :return: Coefficients of the product.
+    """
+    width = (sum(left) * sum(right)).bit_length() // 8 + 1
+
+    def pack(coefficients: list[int]) -> int:
+        return int.from_bytes(
+            b"".join(value.to_bytes(width, "little") for value in coefficients),
+            "little",
+        )
+
+    packed = pack(left)
+    product = packed * packed if left is right else packed * pack(right)
+    length = len(left) + len(right) - 1
+    raw = product.to_bytes(length * width, "little")
+    return [
+        int.from_bytes(raw[start : start + width], "little")
+        for start in range(0, len(raw), width)
+    ]
+
+
+def _sum_distribution(count: int, sides: int, cache: DistributionCache) -> Distribution:
+    """
+    Distribution of the sum of ``count`` dice, built by repeated squaring.
+    Every intermediate power is cached under its own key.
+    :param count: Number of dice.
+    :param sides: Number of sides on each die.
+    :param cache: The cache to read and fill.
+    :return: The distribution.
+    """
+    key = (count, sides, None, 0)
+    distribution = cache.get(key)
+    if distribution is not None:
+        return distribution
+
+    if count == 1:
+        distribution = Distribution(1, [1] * sides)
+    else:
+        half = _sum_distribution(count // 2, sides, cache)
+        distribution = half + half
+        if count % 2:
+            distribution = distribution + _sum_distribution(1, sides, cache)
+    cache.put(key, distribution)
+    return distribution
+
+
+def _keep_highest(  # pylint: disable=too-many-locals
+    count: int, sides: int, kept: int
+) -> Distribution:
+    """
+    Distribution of the sum of the highest ``kept`` of ``count`` dice.
+
+    Faces are visited from the highest down. For each, the number of dice
+    showing it is chosen, weighted by the ways to pick those dice from the
+    ones not yet placed; the first ``kept`` dice placed are the kept ones.
+    Once enough dice are kept, the remaining dice may show any lower face.
+    :param count: Number of dice.
+    :param sides: Number of sides on each die.
+    :param kept: Number of dice kept.
+    :return: The distribution.
+    """
+    if kept == 0:
+        return Distribution(0, [sides**count])
+
+    result = [0] * (kept * sides + 1)
+    # Dice placed so far (fewer than kept) -> kept sum -> outcomes
+    states: dict[int, dict[int, int]] = {0: {0: 1}}
+    for face in range(sides, 0, -1):
+        next_states: dict[int, dict[int, int]] = {}
+        for placed, sums in states.items():
+            free = count - placed
+            for showing in range(free + 1):
+                ways = math.comb(free, showing)
+                now = placed + showing
+                gained = face * min(showing, kept - placed)
+                if now >= kept:
+                    ways *= (face - 1) ** (count - now)
+                    if not ways:
+                        continue
+                    for total, outcomes in sums.items():
+                        result[total + gained] += outcomes * ways
+                else:
+                    target = next_states.setdefault(now, {})
+                    for total, outcomes in sums.items():
+                        target[total + gained] = (
+                            target.get(total + gained, 0) + outcomes * ways
+                        )
+        states = next_states
+    return Distribution(kept, result[kept:])
+
+
+def _check_limits(term: DiceTerm) -> None:
+    """
+    Rejects terms whose exact distribution would be too costly to build.
+    :param term: The term to check.
+    :raises DiceError: If the term is over the limits.
+    """
+    if term.explode:
+        raise DiceError("Odds can't be worked out exactly for exploding dice.")
+    if term.keep:
+        kept = term.kept_dice
+        if kept * kept * term.count * term.sides**2 > MAX_KEEP_WORK:
+            raise DiceError("That keep or drop pool is too large to work out exactly.")
+        return
+    coefficients = term.count * (term.sides - 1) + 1
+    bits = term.count * term.sides.bit_length()
+    if coefficients * bits // 8 > MAX_DISTRIBUTION_BYTES:
+        raise DiceError("That pool is too large to work out exactly.")
+
+
+def term_distribution(
+    term: DiceTerm, cache: Optional[DistributionCache] = None
+) -> Distribution:
+    """
+    Exact distribution of one dice term, ignoring its sign.
+    :param term: The term.
+    :param cache: The cache to use; defaults to the shared cache.
+    :return: The distribution.
+    :raises DiceError: If the term is over the limits.
+    """
+    cache = _default_cache if cache is None else cache
+    _check_limits(term)
+    if not term.keep:
+        return _sum_distribution(term.count, term.sides, cache)
+
+    kept = term.kept_dice
+    key = (term.count, term.sides, "kh" if term.keeps_highest else "kl", kept)
+    distribution = cache.get(key)
+    if distribution is None:
+        distribution = _keep_highest(term.count, term.sides, kept)
+        if not term.keeps_highest:
+            # Flipping every face v to sides + 1 - v swaps highest and lowest
+            distribution = (-distribution).shifted(kept * (term.sides + 1))
+        cache.put(key, distribution)
+    return distribution
+
+
+def expression_key(expression: DiceExpression) -> tuple:
+    """
+    Returns the cache key of a whole expression's distribution.
+    :param expression: The parsed expression.
+    :return: The key.
+    """
+    return ("expression", str(expression))
+
+
+def expression_distribution(
+    expression: DiceExpression, cache: Optional[DistributionCache] = None
+) -> Distribution:
+    """
+    Exact distribution of a whole dice expression.
+    :param expression: The parsed expression.
+    :param cache: The cache to use; defaults to the shared cache.
+    :return: The distribution.
+    :raises DiceError: If a term is over the limits.
+    """
+    cache = _default_cache if cache is None else cache
+    key = expression_key(expression)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    for term in expression.terms:
+        _check_limits(term)
+    result = Distribution(0, [1])
+    for term in expression.terms:
+        part = term_distribution(term, cache)
+        result = result + (part if term.sign > 0 else -part)
+    result = result.shifted(expression.modifier)
+    cache.put(key, result)
+    return result
+
+
+def parse_query(query: str) -> tuple[DiceExpression, Optional[str], Optional[int]]:
+    """
+    Parses an odds query such as ``8d6 >= 30`` or ``3d20kh1``.
+    :param query: The query.
+    :return: The expression, and the comparison operator and value if given.
+    :raises DiceError: If the query is malformed.
+    """
+    match = _QUERY_PATTERN.match(query)
+    if not match:
+        raise DiceError("Ask about a dice expression, e.g. `8d6 >= 30`.")
+    value = match.group("value")
+    return (
+        parse(match.group("expression")),
+        match.group("op"),
+        None if value is None else int(value),
+    )
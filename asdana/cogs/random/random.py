@@ -2,10 +2,38 @@
 Random cog for managing random-based functionality.
 """
 
+import asyncio
 import random
+import string
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
 
 from discord.ext import commands
 
+from asdana.cogs.random import dice, odds
+from asdana.cogs.random.video_pool import VideoPool
+from asdana.core.config import get_config
+from asdana.core.executor import PROCESS, offload
+from asdana.core.metrics import MetricFamily
+from asdana.utils.youtube_api import YouTubeApiClient, is_playable
+
+# Seconds vroulette waits for a video when the pool is empty
+VIDEO_WAIT_TIMEOUT = 10
+# Results requested per random search
+SEARCH_BATCH_SIZE = 25
+# Odds are also shown as a fraction when its denominator is at most this
+MAX_SHOWN_DENOMINATOR = 10_000
+
+
+def _random_search_query(length: int = 4) -> str:
+    """
+    Builds a random search query, which surfaces an arbitrary set of videos.
+    :param length: Number of characters in the query.
+    :return: The query.
+    """
+    alphabet = string.ascii_lowercase + string.digits
+    return "".join(random.choices(alphabet, k=length))
+
 
 class Random(commands.Cog):
     """
@@ -14,8 +42,67 @@ class Random(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.video_pool = VideoPool(self._fetch_random_videos)
+        self._youtube: Optional[YouTubeApiClient] = None
+
+    async def cog_unload(self) -> None:
+        """
+        Stops the video pool refill task when the cog is removed.
+        """
+        await self.video_pool.stop()
+
+    def collect_metrics(self) -> list[MetricFamily]:
+        """
+        Reports the video pool size and the odds cache hit counts. Whole
+        expressions are looked up here before being sent to a worker, so the
+        counts cover every odds query.
+        """
+        cache = odds.default_cache()
+        return [
+            MetricFamily(
+                "asdana_video_pool_size", "gauge", "Videos ready for vroulette."
+            ).add(len(self.video_pool)),
+            MetricFamily(
+                "asdana_cache_lookups_total", "counter", "Cache lookups by result."
+            )
+            .add(cache.hits, cache="dice_odds", result="hit")
+            .add(cache.misses, cache="dice_odds", result="miss"),
+        ]
+
+    def object_counts(self) -> dict[str, int]:
+        """
+        Counts the pooled videos and cached dice distributions, for memory
+        reports.
+        """
+        return {
+            "video pool": len(self.video_pool),
+            "dice odds cache": len(odds.default_cache()),
+        }
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """
+        Warms up the video pool once the bot is connected.
+        """
+        if get_config().youtube_api_key:
+            self.video_pool.start()
 
-    @commands.command(name="random", aliases=["rand"])
+    async def _fetch_random_videos(self) -> list[str]:
+        """
+        Finds a batch of random videos that can actually be watched.
+        :return: IDs of public, processed and embeddable videos.
+        """
+        if self._youtube is None:
+            self._youtube = YouTubeApiClient(
+                self.bot.web_client, get_config().youtube_api_key
+            )
+        video_ids = await self._youtube.search_videos(
+            _random_search_query(), max_results=SEARCH_BATCH_SIZE
+        )
+        videos = await self._youtube.list_videos(video_ids, part="status")
+        return [video["id"] for video in videos if is_playable(video)]
+
+    @commands.hybrid_command(name="random", aliases=["rand"])
     async def random(
         self, context: commands.Context, floor: int = 1, ceiling: int = 100
     ):
@@ -34,20 +121,99 @@ class Random(commands.Cog):
             f"Your random number is: **{random.randint(floor, ceiling)}**!"
         )
 
-    @commands.command(name="roll", aliases=["dice"])
-    async def roll(self, context: commands.Context, sides: int = 20):
+    @commands.hybrid_command(name="roll", aliases=["dice"])
+    async def roll(self, context: commands.Context, *, expression: str = "d20"):
         """
-        Rolls a die with a given number of sides.
+        Rolls dice written in dice notation, e.g. 12d6+3, 4d6kh3 or 10d6!.
+        A bare number rolls a single die with that many sides.
         :param context: The context of the command.
-        :param sides: The number of sides on the die. Defaults to 20.
+        :param expression: The dice to roll. Defaults to a single d20.
         :return: None
         """
-        await context.send(f"You rolled a **{random.randint(1, sides)}**!")
+        try:
+            result = await offload(self.bot, dice.roll, expression)
+        except dice.DiceError as e:
+            await context.send(f"❌ {e}")
+            return
+        except asyncio.TimeoutError:
+            await context.send("❌ That roll took too long, try fewer dice.")
+            return
+
+        single_die = len(result.results) == 1 and result.results[0].term.count == 1
+        if single_die and not result.expression.constants:
+            await context.send(f"You rolled a **{result.total}**!")
+            return
+        await context.send(f"🎲 {result} = **{result.total:,}**")
 
-    @commands.command(name="vroulette", aliases=["vr"])
+    @commands.hybrid_command(name="odds", aliases=["prob"])
+    async def dice_odds(self, context: commands.Context, *, query: str):
+        """
+        Works out the exact odds of a dice roll, e.g. 8d6 >= 30.
+        Without a comparison, shows the distribution of an expression such as
+        3d20kh1.
+        :param context: The context of the command.
+        :param query: A dice expression, optionally compared to a value.
+        :return: None
+        """
+        # Slash commands must be answered within three seconds
+        await context.defer()
+        try:
+            expression, op, value = odds.parse_query(query)
+            cache = odds.default_cache()
+            key = odds.expression_key(expression)
+            distribution = cache.get(key)
+            if distribution is None:
+                # Big-integer convolutions hold the GIL, so they run in a
+                # process; the result is cached here, where repeats are served
+                distribution = await offload(
+                    self.bot, odds.expression_distribution, expression, kind=PROCESS
+                )
+                cache.put(key, distribution)
+        except dice.DiceError as e:
+            await context.send(f"❌ {e}")
+            return
+        except asyncio.TimeoutError:
+            await context.send("❌ Those odds took too long to work out.")
+            return
+        except BrokenProcessPool:
+            await context.send("❌ Something went wrong working out those odds.")
+            return
+
+        if op is not None:
+            chance = distribution.probability(op, value)
+            text = f"🎲 P({expression} {op} {value}) = **{float(chance):.4%}**"
+            if chance.denominator <= MAX_SHOWN_DENOMINATOR:
+                text += f" ({chance})"
+            elif chance:
+                text += f" (about 1 in {1 / chance:,.1f})"
+            await context.send(text)
+            return
+
+        await context.send(
+            f"🎲 **{expression}**: {distribution.minimum} to {distribution.maximum}, "
+            f"mean {float(distribution.mean()):g}, "
+            f"standard deviation {distribution.stdev():.2f}, "
+            f"most likely {distribution.mode()}\n"
+            f"```\n{distribution.histogram()}\n```"
+        )
+
+    @commands.hybrid_command(name="vroulette", aliases=["vr"])
     async def random_yt_video(self, context: commands.Context):
         """
         Selects a random video from YouTube via the YouTube API.
+        Videos are served from a pool that is refilled in the background.
         :param context: The context of the command.
         :return: None
         """
+        if not get_config().youtube_api_key:
+            await context.send("❌ Video roulette needs a YouTube API key.")
+            return
+
+        await context.defer()
+        video_id = await self.video_pool.get(timeout=VIDEO_WAIT_TIMEOUT)
+        if video_id is None:
+            await context.send("❌ Couldn't find a video right now, try again soon.")
+            return
+        await context.send(
+            f"Your random video is: https://www.youtube.com/watch?v={video_id}"
+        )
@@ -0,0 +1,138 @@
+"""
+Prefetched pool of random videos for the video roulette command.
+
+Finding a random video takes a search and a validation call against the
+YouTube Data API. Rather than paying that latency on every command, a
+background task keeps a bounded pool of already validated videos topped up,
+so commands are answered straight from memory.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from asdana.utils.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Default configuration constants
+DEFAULT_CAPACITY = 25
+DEFAULT_LOW_WATER = 5
+DEFAULT_FETCH_INTERVAL = 10  # seconds between upstream fetches
+ERROR_RETRY_DELAY = 60  # seconds
+
+
+class VideoPool:  # pylint: disable=too-many-instance-attributes
+    """
+    Bounded pool of video IDs refilled in the background.
+
+    Whenever the pool drops below ``low_water`` items, the refill task calls
+    ``fetch`` until the pool holds ``capacity`` items again. Fetches are spaced
+    by a rate limiter so bursts of commands never turn into bursts of API
+    calls; the pool absorbs them instead.
+
+    Attributes:
+        capacity: Maximum number of videos held.
+        low_water: Pool size below which a refill starts.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[list[str]]],
+        capacity: int = DEFAULT_CAPACITY,
+        low_water: int = DEFAULT_LOW_WATER,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        if not 0 <= low_water < capacity:
+            raise ValueError("Low-water mark must be below the pool capacity.")
+        self.capacity = capacity
+        self.low_water = low_water
+        self._fetch = fetch
+        self._rate_limiter = rate_limiter or RateLimiter(
+            1, DEFAULT_FETCH_INTERVAL, burst=2
+        )
+        self._videos: deque[str] = deque()
+        self._needs_refill = asyncio.Event()
+        self._available = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._videos)
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the background refill task is running.
+        """
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Starts the background refill task if it is not already running.
+        """
+        if not self.running:
+            self._task = asyncio.create_task(self._refill_loop())
+        if len(self._videos) < self.low_water:
+            self._needs_refill.set()
+
+    async def stop(self) -> None:
+        """
+        Stops the background refill task.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Takes a video from the pool, waiting for a refill if it is empty.
+        :param timeout: Seconds to wait for a video when the pool is empty.
+        :return: A video ID, or None if none arrived within the timeout.
+        """
+        self.start()
+        try:
+            await asyncio.wait_for(self._wait_available(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        video_id = self._videos.popleft()
+        if len(self._videos) < self.low_water:
+            self._needs_refill.set()
+        return video_id
+
+    async def _wait_available(self) -> None:
+        while not self._videos:
+            self._available.clear()
+            self._needs_refill.set()
+            await self._available.wait()
+
+    async def _refill_loop(self) -> None:
+        """
+        Background task that tops the pool up whenever it runs low.
+        """
+        while True:
+            await self._needs_refill.wait()
+            while len(self._videos) < self.capacity:
+                await self._rate_limiter.acquire()
+                try:
+                    batch = await self._fetch()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.error("Error refilling video pool: %s", e)
+                    await asyncio.sleep(ERROR_RETRY_DELAY)
+                    continue
+
+                for video_id in batch:
+                    if len(self._videos) >= self.capacity:
+                        break
+                    if video_id not in self._videos:
+                        self._videos.append(video_id)
+                if self._videos:
+                    self._available.set()
+                logger.debug("Video pool refilled to %d videos.", len(self._videos))
+            self._needs_refill.clear()
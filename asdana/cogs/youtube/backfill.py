@@ -0,0 +1,208 @@
+"""
+Background backfill of YouTube video titles.
+
+Videos are read in keyset-paginated batches of untitled rows, resolved 50 IDs
+per videos.list call (the API maximum, costing one quota unit per call) and
+written back with a single UPDATE per batch. Progress is implied by the data
+itself: only rows whose title is still NULL are selected, so an interrupted
+run simply resumes where it stopped.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from typing import Callable, Optional
+
+from aiohttp import ClientSession
+from sqlalchemy import case, select, update
+
+from asdana.core.config import get_config
+from asdana.database.database import get_session
+from asdana.database.models import YouTubeVideo
+from asdana.utils.rate_limit import RateLimiter
+from asdana.utils.youtube_api import (
+    DEFAULT_BASE_URL,
+    MAX_IDS_PER_REQUEST,
+    YouTubeApiClient,
+)
+
+logger = logging.getLogger(__name__)
+
+# Default configuration constants
+DEFAULT_BACKFILL_INTERVAL = 3600  # 1 hour
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_REQUESTS_PER_SECOND = 5
+ERROR_RETRY_DELAY = 60  # seconds
+
+# Stored for videos the API no longer returns (deleted or private), so they
+# are not selected again on every run.
+UNAVAILABLE_TITLE = ""
+
+
+class TitleBackfill:
+    """
+    Fills in missing ``YouTubeVideo.title`` values from the YouTube Data API.
+
+    Attributes:
+        client: The YouTube API client, which should carry a rate limiter.
+        batch_size: Untitled rows processed per database round.
+        last_id: Primary key of the last row processed, for keyset pagination.
+    """
+
+    def __init__(
+        self,
+        client: YouTubeApiClient,
+        session_factory: Callable = get_session,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.client = client
+        self.batch_size = batch_size
+        self.last_id = 0
+        self._session_factory = session_factory
+
+    async def _resolve_titles(self, rows: list[tuple[int, str]]) -> dict[int, str]:
+        """
+        Looks up titles for a batch of rows, 50 video IDs per API call.
+        :param rows: (primary key, video ID) pairs.
+        :return: Title for every primary key in the batch.
+        """
+        titles = {}
+        for start in range(0, len(rows), MAX_IDS_PER_REQUEST):
+            chunk = rows[start : start + MAX_IDS_PER_REQUEST]
+            videos = await self.client.list_videos(
+                (video_id for _, video_id in chunk), part="snippet"
+            )
+            found = {video["id"]: video["snippet"]["title"] for video in videos}
+            for key, video_id in chunk:
+                titles[key] = found.get(video_id, UNAVAILABLE_TITLE)
+        return titles
+
+    async def run_batch(self) -> int:
+        """
+        Backfills the next batch of untitled videos after ``last_id``.
+        No database session is held during the API calls, so a slow or
+        rate-limited batch does not keep a pooled connection open.
+        :return: Number of rows updated; 0 once no untitled rows remain.
+        """
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(YouTubeVideo.id, YouTubeVideo.video_id)
+                .where(
+                    YouTubeVideo.id > self.last_id,
+                    YouTubeVideo.title.is_(None),
+                    YouTubeVideo.video_id.is_not(None),
+                )
+                .order_by(YouTubeVideo.id)
+                .limit(self.batch_size)
+            )
+            rows = [tuple(row) for row in result.all()]
+        if not rows:
+            return 0
+
+        titles = await self._resolve_titles(rows)
+        async with self._session_factory() as session:
+            await session.execute(
+                update(YouTubeVideo)
+                .where(YouTubeVideo.id.in_(titles))
+                .values(title=case(titles, value=YouTubeVideo.id))
+            )
+            await session.commit()
+
+        self.last_id = rows[-1][0]
+        logger.debug("Backfilled %d video titles up to ID %d.", len(rows), self.last_id)
+        return len(rows)
+
+    async def run(self, max_batches: Optional[int] = None) -> int:
+        """
+        Backfills batches until no untitled videos remain.
+        :param max_batches: Optional cap on the number of batches.
+        :return: Total number of rows updated.
+        """
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            updated = await self.run_batch()
+            if not updated:
+                break
+            total += updated
+            batches += 1
+        if total:
+            logger.info("Backfilled %d YouTube video titles.", total)
+        return total
+
+
+async def run_title_backfill_task(bot, backfill: TitleBackfill) -> None:
+    """
+    Background task that periodically backfills missing video titles.
+
+    Args:
+        bot: The Discord bot instance.
+        backfill: The backfill job to run.
+    """
+    interval = int(
+        os.getenv("BACKFILL_INTERVAL_TITLES", str(DEFAULT_BACKFILL_INTERVAL))
+    )
+
+    await bot.wait_until_ready()
+
+    while not bot.is_closed():
+        try:
+            logger.info("Running scheduled video title backfill.")
+            backfill.last_id = 0
+            await backfill.run()
+            await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            logger.info("Video title backfill task cancelled.")
+            break
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error during video title backfill: %s", e, exc_info=True)
+            await asyncio.sleep(ERROR_RETRY_DELAY)
+
+
+async def _run(args: argparse.Namespace) -> int:
+    async with ClientSession() as web_client:
+        client = YouTubeApiClient(
+            web_client,
+            get_config().youtube_api_key,
+            base_url=args.base_url,
+            rate_limiter=RateLimiter(args.rate),
+        )
+        backfill = TitleBackfill(client, batch_size=args.batch_size)
+        backfill.last_id = args.start_after
+        return await backfill.run()
+
+
+def main() -> None:
+    """
+    Command line entry point for a one-off backfill.
+    """
+    parser = argparse.ArgumentParser(
+        description="Fill in missing YouTube video titles from the YouTube API."
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_REQUESTS_PER_SECOND,
+        help="Maximum API requests per second",
+    )
+    parser.add_argument(
+        "--start-after", type=int, default=0, help="Resume after this video row ID"
+    )
+    parser.add_argument(
+        "--base-url",
+        default=DEFAULT_BASE_URL,
+        help="YouTube Data API root, e.g. a local stand-in for testing",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=get_config().log_level,
+        format="[%(asctime)s] [%(levelname)-8s] %(message)s",
+    )
+    print(f"Backfilled {asyncio.run(_run(args))} titles.")
+
+
+if __name__ == "__main__":
+    main()
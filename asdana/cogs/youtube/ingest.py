@@ -0,0 +1,371 @@
+"""
+Bulk ingestion of video IDs into the YouTube video catalogue.
+
+Video IDs are streamed from files, standard input or YouTube playlists,
+deduplicated against the existing catalogue with a Bloom filter and written
+with multi-row ``INSERT ... ON CONFLICT DO NOTHING`` statements in large
+batches. IDs the filter may have seen are confirmed against the table in
+one lookup per batch, so a false positive never drops a new video. Memory
+use is bounded by the filter and one batch, regardless of how many IDs are
+fed in.
+
+Usage:
+    python -m asdana.cogs.youtube.ingest ids.txt more_ids.txt
+    cat ids.txt | python -m asdana.cogs.youtube.ingest -
+    python -m asdana.cogs.youtube.ingest --playlist PLxxxxxxxxxxxxxxxx
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+import sys
+import time
+from contextlib import ExitStack
+from typing import AsyncIterator, Callable, Iterable, Optional, TextIO
+
+from aiohttp import ClientSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from asdana.cogs.youtube.sampler import bounds_statement
+from asdana.core.config import get_config
+from asdana.database.database import get_session
+from asdana.database.models import YouTubeVideo
+from asdana.utils.bloom import BloomFilter
+from asdana.utils.rate_limit import RateLimiter
+from asdana.utils.youtube_api import YouTubeApiClient
+
+logger = logging.getLogger(__name__)
+
+# Default configuration constants
+DEFAULT_BATCH_SIZE = 5000
+# PostgreSQL allows at most 32767 bind parameters per statement
+MAX_BATCH_SIZE = 32000
+DEFAULT_ERROR_RATE = 1e-4
+DEFAULT_EXPECTED_NEW = 1_000_000
+PRIME_PAGE_SIZE = 50_000
+READ_CHUNK_BYTES = 1024 * 1024
+REPORT_INTERVAL = 5  # seconds
+
+VIDEO_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{11}")
+VIDEO_URL_PATTERN = re.compile(
+    r"(?:[?&]v=|youtu\.be/|/shorts/|/embed/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])"
+)
+
+
+def parse_video_id(text: str) -> Optional[str]:
+    """
+    Extracts a video ID from a bare ID or a YouTube video URL.
+    :param text: The text to parse.
+    :return: The video ID, or None if the text holds none.
+    """
+    text = text.strip()
+    if VIDEO_ID_PATTERN.fullmatch(text):
+        return text
+    if match := VIDEO_URL_PATTERN.search(text):
+        return match.group(1)
+    return None
+
+
+async def iter_stream(stream: TextIO) -> AsyncIterator[str]:
+    """
+    Yields the lines of a text stream, reading it in chunks off the event loop.
+    :param stream: The stream to read.
+    :return: An async iterator over the lines.
+    """
+    while lines := await asyncio.to_thread(stream.readlines, READ_CHUNK_BYTES):
+        for line in lines:
+            yield line
+
+
+async def iter_playlist(
+    client: YouTubeApiClient, playlist_id: str
+) -> AsyncIterator[str]:
+    """
+    Yields every video ID of a playlist, following its pages.
+    :param client: The YouTube API client.
+    :param playlist_id: The playlist ID.
+    :return: An async iterator over the video IDs.
+    """
+    page_token = None
+    while True:
+        video_ids, page_token = await client.playlist_page(playlist_id, page_token)
+        for video_id in video_ids:
+            yield video_id
+        if not page_token:
+            return
+
+
+async def chain(sources: Iterable[AsyncIterator[str]]) -> AsyncIterator[str]:
+    """
+    Yields the items of several async iterators one after another.
+    :param sources: The iterators to chain.
+    :return: An async iterator over all items.
+    """
+    for source in sources:
+        async for item in source:
+            yield item
+
+
+class IngestStats:
+    """
+    Running counters for an ingestion run.
+
+    Attributes:
+        read: Lines or IDs read from the sources.
+        inserted: Rows actually inserted.
+        duplicates: IDs skipped because they were already stored or
+            repeated in the input.
+        invalid: Lines that held no video ID.
+    """
+
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.started_at = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Seconds since the run started.
+        """
+        return time.monotonic() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """
+        Inserted rows per second.
+        """
+        return self.inserted / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"read={self.read} inserted={self.inserted} "
+            f"duplicates={self.duplicates} invalid={self.invalid} "
+            f"elapsed={self.elapsed:.1f}s rate={self.rate:.0f} rows/s"
+        )
+
+
+class VideoIngestor:
+    """
+    Streams video IDs into ``yt_videos`` in deduplicated batches.
+
+    The Bloom filter is primed with every existing video ID, so IDs it has
+    never seen go straight into the next INSERT. A hit only means the ID may
+    be stored: hits are looked up in the table, one query per batch, and
+    only those actually found are skipped. The unique constraint guards
+    against anything stored in the meantime.
+
+    Attributes:
+        batch_size: Rows per INSERT statement.
+        error_rate: Target false positive rate of the deduplication filter.
+        expected_new: Number of new IDs the filter is sized for on top of the
+            existing catalogue.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable = get_session,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        expected_new: int = DEFAULT_EXPECTED_NEW,
+    ):
+        if not 0 < batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"Batch size must be between 1 and {MAX_BATCH_SIZE}.")
+        self.batch_size = batch_size
+        self.error_rate = error_rate
+        self.expected_new = expected_new
+        self._session_factory = session_factory
+        self.seen: Optional[BloomFilter] = None
+
+    async def prime(self) -> BloomFilter:
+        """
+        Loads every existing video ID into the deduplication filter.
+        Rows are read in keyset-paginated pages to bound memory use.
+        :return: The primed filter.
+        """
+        async with self._session_factory() as session:
+            low, high = (await session.execute(bounds_statement())).one()
+            existing = 0 if low is None else high - low + 1
+            self.seen = BloomFilter(existing + self.expected_new, self.error_rate)
+
+            last_id = 0
+            while True:
+                result = await session.execute(
+                    select(YouTubeVideo.id, YouTubeVideo.video_id)
+                    .where(YouTubeVideo.id > last_id)
+                    .order_by(YouTubeVideo.id)
+                    .limit(PRIME_PAGE_SIZE)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                for _, video_id in rows:
+                    if video_id is not None:
+                        self.seen.add(video_id)
+                last_id = rows[-1][0]
+
+        logger.info(
+            "Primed deduplication filter with %d videos (%.1f MiB).",
+            len(self.seen),
+            self.seen.size_bytes / 2**20,
+        )
+        return self.seen
+
+    async def _stored(self, video_ids: list[str]) -> set[str]:
+        """
+        Looks up which of some video IDs are already in the table.
+        :param video_ids: The video IDs to look up.
+        :return: The stored ones.
+        """
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(YouTubeVideo.video_id).where(
+                    YouTubeVideo.video_id.in_(video_ids)
+                )
+            )
+            return set(result.scalars().all())
+
+    async def _insert(self, batch: list[str]) -> int:
+        """
+        Inserts a batch of video IDs, skipping any that already exist.
+        :param batch: The video IDs to insert.
+        :return: Number of rows inserted.
+        """
+        statement = (
+            insert(YouTubeVideo)
+            .values([{"video_id": video_id} for video_id in batch])
+            .on_conflict_do_nothing(index_elements=[YouTubeVideo.video_id])
+        )
+        async with self._session_factory() as session:
+            result = await session.execute(statement)
+            await session.commit()
+        return result.rowcount
+
+    async def _flush(
+        self, batch: list[str], maybe_stored: list[str], stats: IngestStats
+    ) -> None:
+        """
+        Writes a batch: IDs the filter has not seen, plus those of the
+        filter's hits that turn out not to be stored.
+        :param batch: Video IDs the filter has not seen.
+        :param maybe_stored: Video IDs the filter may have seen.
+        :param stats: Counters to update.
+        """
+        candidates = batch
+        if maybe_stored:
+            stored = await self._stored(maybe_stored)
+            candidates = batch + [
+                video_id for video_id in maybe_stored if video_id not in stored
+            ]
+        unique = list(dict.fromkeys(candidates))
+        inserted = await self._insert(unique) if unique else 0
+        stats.inserted += inserted
+        # Whatever was not inserted was stored, repeated or inserted meanwhile
+        stats.duplicates += len(batch) + len(maybe_stored) - inserted
+
+    async def ingest(self, lines: AsyncIterator[str]) -> IngestStats:
+        """
+        Ingests video IDs or URLs, one per item.
+        :param lines: Async iterator over the input.
+        :return: Counters for the run.
+        """
+        if self.seen is None:
+            await self.prime()
+
+        stats = IngestStats()
+        batch: list[str] = []
+        maybe_stored: list[str] = []
+        reported_at = stats.started_at
+
+        async for line in lines:
+            stats.read += 1
+            video_id = parse_video_id(line)
+            if video_id is None:
+                stats.invalid += 1
+                continue
+            if video_id in self.seen:
+                maybe_stored.append(video_id)
+            else:
+                self.seen.add(video_id)
+                batch.append(video_id)
+
+            if len(batch) + len(maybe_stored) >= self.batch_size:
+                await self._flush(batch, maybe_stored, stats)
+                batch.clear()
+                maybe_stored.clear()
+                if time.monotonic() - reported_at > REPORT_INTERVAL:
+                    logger.info("Ingestion progress: %s", stats)
+                    reported_at = time.monotonic()
+
+        if batch or maybe_stored:
+            await self._flush(batch, maybe_stored, stats)
+
+        logger.info("Ingestion finished: %s", stats)
+        return stats
+
+
+async def _run(args: argparse.Namespace) -> IngestStats:
+    ingestor = VideoIngestor(
+        batch_size=args.batch_size,
+        error_rate=args.error_rate,
+        expected_new=args.expected_new,
+    )
+
+    async with ClientSession() as web_client:
+        client = YouTubeApiClient(
+            web_client, get_config().youtube_api_key, rate_limiter=RateLimiter(5)
+        )
+        with ExitStack() as stack:
+            sources = [
+                iter_stream(
+                    sys.stdin
+                    if path == "-"
+                    else stack.enter_context(open(path, encoding="utf-8"))
+                )
+                for path in args.files
+            ]
+            sources.extend(
+                iter_playlist(client, playlist) for playlist in args.playlist
+            )
+            return await ingestor.ingest(chain(sources))
+
+
+def main() -> None:
+    """
+    Command line entry point for bulk ingestion.
+    """
+    parser = argparse.ArgumentParser(
+        description="Bulk load YouTube video IDs into the yt_videos table."
+    )
+    parser.add_argument(
+        "files", nargs="*", help="Files with one video ID or URL per line; - for stdin"
+    )
+    parser.add_argument(
+        "--playlist", action="append", default=[], help="Playlist ID to ingest"
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE)
+    parser.add_argument(
+        "--expected-new",
+        type=int,
+        default=DEFAULT_EXPECTED_NEW,
+        help="Number of new IDs to size the deduplication filter for",
+    )
+    args = parser.parse_args()
+    if not args.files and not args.playlist:
+        parser.error("Give at least one file, - for stdin, or --playlist.")
+
+    logging.basicConfig(
+        level=get_config().log_level,
+        format="[%(asctime)s] [%(levelname)-8s] %(message)s",
+    )
+    stats = asyncio.run(_run(args))
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Random sampling of videos from the YouTube video table.
+
+Selecting with ``ORDER BY random()`` reads and sorts every row of ``yt_videos``
+on each call, so its cost grows linearly with the catalogue. The sampler here
+instead draws a random primary key between the cached key bounds and resolves
+it with a single index seek, which stays constant-time as the table grows.
+"""
+
+import logging
+import random
+import time
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from asdana.database.models import YouTubeVideo
+
+logger = logging.getLogger(__name__)
+
+# How long cached key bounds are trusted before they are read again
+DEFAULT_BOUNDS_TTL = 300  # seconds
+
+
+def bounds_statement():
+    """
+    Builds the query for the smallest and largest video primary keys.
+    Both aggregates are answered from the primary key index.
+    :return: The select statement.
+    """
+    return select(
+        func.min(YouTubeVideo.id),  # pylint: disable=not-callable
+        func.max(YouTubeVideo.id),  # pylint: disable=not-callable
+    )
+
+
+def pick_statement(key: int):
+    """
+    Builds the query for the first video at or after a given primary key.
+    :param key: The primary key to seek to.
+    :return: The select statement.
+    """
+    return (
+        select(YouTubeVideo.video_id)
+        .where(YouTubeVideo.id >= key, YouTubeVideo.video_id.is_not(None))
+        .order_by(YouTubeVideo.id)
+        .limit(1)
+    )
+
+
+class RandomVideoSampler:
+    """
+    Picks random videos without scanning the whole table.
+
+    A random key is drawn between the minimum and maximum primary keys and the
+    first video at or after it is returned. Keys are assigned sequentially, so
+    the draw is uniform while the key range is dense; rows directly after a gap
+    left by deleted videos are proportionally more likely to be picked.
+
+    Attributes:
+        bounds_ttl: Seconds the cached key bounds are reused before a refresh.
+    """
+
+    def __init__(
+        self,
+        bounds_ttl: float = DEFAULT_BOUNDS_TTL,
+        rng: Optional[random.Random] = None,
+    ):
+        self.bounds_ttl = bounds_ttl
+        self._rng = rng or random.Random()
+        self._bounds: Optional[tuple[int, int]] = None
+        self._refreshed_at = 0.0
+
+    def invalidate(self) -> None:
+        """
+        Forgets the cached key bounds so the next sample reads them again.
+        """
+        self._bounds = None
+
+    async def refresh(self, session) -> Optional[tuple[int, int]]:
+        """
+        Reads the current primary key bounds from the database.
+        :param session: The database session to use.
+        :return: The (min, max) key bounds, or None if the table is empty.
+        """
+        result = await session.execute(bounds_statement())
+        low, high = result.one()
+        self._bounds = None if low is None else (low, high)
+        self._refreshed_at = time.monotonic()
+        logger.debug("Refreshed YouTube video key bounds: %s", self._bounds)
+        return self._bounds
+
+    async def _get_bounds(self, session) -> Optional[tuple[int, int]]:
+        if (
+            self._bounds is None
+            or time.monotonic() - self._refreshed_at > self.bounds_ttl
+        ):
+            return await self.refresh(session)
+        return self._bounds
+
+    async def sample(self, session) -> Optional[str]:
+        """
+        Picks a random video ID.
+        :param session: The database session to use.
+        :return: A random video ID, or None if there are no videos.
+        """
+        bounds = await self._get_bounds(session)
+        if bounds is None:
+            return None
+
+        key = self._rng.randint(*bounds)
+        result = await session.execute(pick_statement(key))
+        video_id = result.scalar()
+        if video_id is not None:
+            return video_id
+
+        # The rows at the top of the cached range were deleted since the last
+        # refresh; re-read the bounds, draw again and wrap around if needed.
+        bounds = await self.refresh(session)
+        if bounds is None:
+            return None
+        for key in (self._rng.randint(*bounds), bounds[0]):
+            result = await session.execute(pick_statement(key))
+            video_id = result.scalar()
+            if video_id is not None:
+                return video_id
+        return None
@@ -0,0 +1,176 @@
+"""
+Per-guild shuffle bags for drawing random videos without repeats.
+
+Each guild walks a seeded pseudo-random permutation of the video primary key
+range. The whole bag is described by a seed, a cursor and the range it covers,
+so tracking it costs a few dozen bytes per guild no matter how large the
+catalogue is, and persisting it is a single small row update per draw.
+"""
+
+# pylint: disable=too-few-public-methods
+
+import logging
+import random
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from asdana.cogs.youtube.sampler import RandomVideoSampler, bounds_statement
+from asdana.database.models import GuildVideoShuffle, YouTubeVideo
+
+logger = logging.getLogger(__name__)
+
+# Deleted videos leave holes in the key range; give up on the bag for a draw
+# after this many holes in a row and fall back to a plain random pick.
+MAX_SKIPPED_KEYS = 16
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(value: int) -> int:
+    """
+    SplitMix64 finalizer, used as the keyed round function of the permutation.
+    :param value: The value to mix.
+    :return: A well-distributed 64-bit integer.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+class FeistelPermutation:
+    """
+    A seeded bijection on ``range(size)`` that is evaluated one index at a time.
+
+    A balanced Feistel network permutes the smallest even-bit power of two that
+    covers ``size``; outputs that land outside the range are fed back through
+    the network ("cycle walking") until they fall inside it. Because the domain
+    is less than four times ``size``, that takes fewer than four passes on
+    average, and no table of the permutation is ever materialized.
+
+    Attributes:
+        size: Number of elements being permuted.
+        seed: Seed selecting the permutation.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, size: int, seed: int):
+        if size < 1:
+            raise ValueError("Permutation size must be positive.")
+        self.size = size
+        self.seed = seed
+        bits = max(2, (size - 1).bit_length())
+        self._half_bits = (bits + 1) // 2
+        self._half_mask = (1 << self._half_bits) - 1
+        self._round_keys = [_mix64(seed + index) for index in range(self.ROUNDS)]
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self._half_bits, value & self._half_mask
+        for key in self._round_keys:
+            left, right = right, left ^ (_mix64(key ^ right) & self._half_mask)
+        return (left << self._half_bits) | right
+
+    def __call__(self, index: int) -> int:
+        """
+        Maps a position in the shuffled order to an element.
+        :param index: Position in ``range(size)``.
+        :return: The element at that position.
+        """
+        if not 0 <= index < self.size:
+            raise IndexError("Permutation index out of range.")
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+
+class ShuffleBagSampler:
+    """
+    Draws videos for a guild without replacement until its bag is exhausted.
+
+    A bag covers the primary key range that existed when it was filled; videos
+    added later join the next bag. Keys freed by deleted videos are skipped.
+    State lives in the ``guild_video_shuffle`` table so bags survive restarts
+    and are shared by every process serving the guild. A draw locks the guild's
+    row until it commits, so concurrent draws never reuse a cursor position.
+
+    Attributes:
+        fallback: Sampler used outside guilds and when a bag is mostly holes.
+    """
+
+    def __init__(
+        self,
+        fallback: Optional[RandomVideoSampler] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.fallback = fallback or RandomVideoSampler()
+        self._rng = rng or random.Random()
+
+    async def _refill(self, session, bag: GuildVideoShuffle) -> bool:
+        """
+        Starts a new shuffled pass over the current key range.
+        :param session: The database session to use.
+        :param bag: The guild's bag to reset.
+        :return: False if there are no videos to shuffle.
+        """
+        result = await session.execute(bounds_statement())
+        low, high = result.one()
+        if low is None:
+            return False
+        bag.seed = self._rng.getrandbits(63)
+        bag.base_id = low
+        bag.pool_size = high - low + 1
+        bag.cursor = 0
+        logger.debug(
+            "Refilled shuffle bag for guild %s with %d keys",
+            bag.guild_id,
+            bag.pool_size,
+        )
+        return True
+
+    async def draw(self, session, guild_id: int) -> Optional[str]:
+        """
+        Draws the next video from a guild's bag, refilling it when exhausted.
+        :param session: The database session to use.
+        :param guild_id: The Discord guild ID.
+        :return: A video ID, or None if there are no videos.
+        """
+        bag = await session.get(GuildVideoShuffle, guild_id, with_for_update=True)
+        if bag is None:
+            # Concurrent first draws all get here; only one of them creates
+            # the row and the others wait for it, then lock it in turn
+            await session.execute(
+                insert(GuildVideoShuffle)
+                .values(guild_id=guild_id, cursor=0, pool_size=0)
+                .on_conflict_do_nothing(index_elements=[GuildVideoShuffle.guild_id])
+            )
+            bag = await session.get(GuildVideoShuffle, guild_id, with_for_update=True)
+
+        video_id = None
+        skipped = 0
+        while video_id is None and skipped < MAX_SKIPPED_KEYS:
+            if bag.cursor >= bag.pool_size and not await self._refill(session, bag):
+                break
+            permutation = FeistelPermutation(bag.pool_size, bag.seed)
+            key = bag.base_id + permutation(bag.cursor)
+            bag.cursor += 1
+            result = await session.execute(
+                select(YouTubeVideo.video_id).where(YouTubeVideo.id == key)
+            )
+            video_id = result.scalar()
+            if video_id is None:
+                skipped += 1
+
+        await session.commit()
+
+        if video_id is None and skipped:
+            logger.debug(
+                "Shuffle bag for guild %s hit %d missing keys, falling back.",
+                guild_id,
+                skipped,
+            )
+            return await self.fallback.sample(session)
+        return video_id
@@ -2,15 +2,25 @@
 Provides commands and listeners for YouTube-based functionality and other utilities.
 """
 
+import asyncio
 import logging
+from typing import Optional
 
 from discord.ext import commands
-from googleapiclient.discovery import build
-from sqlalchemy import func, select
 
-from asdana.core.config import config
+from asdana.cogs.youtube.backfill import (
+    DEFAULT_REQUESTS_PER_SECOND,
+    TitleBackfill,
+    run_title_backfill_task,
+)
+from asdana.cogs.youtube.sampler import RandomVideoSampler
+from asdana.cogs.youtube.shuffle import ShuffleBagSampler
+from asdana.core.config import get_config
+from asdana.core.shards import owns_shard_zero
+from asdana.core.tracing import span
 from asdana.database.database import get_session
-from asdana.database.models import YouTubeVideo
+from asdana.utils.rate_limit import RateLimiter
+from asdana.utils.youtube_api import YouTubeApiClient
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +32,51 @@ class YouTube(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.youtube_api_key = config.youtube_api_key
+        self.youtube_api_key = get_config().youtube_api_key
+        self.video_sampler = RandomVideoSampler()
+        self.shuffle_sampler = ShuffleBagSampler(fallback=self.video_sampler)
+        self.title_backfill_task: Optional[asyncio.Task] = None
+
+    async def cog_unload(self) -> None:
+        """
+        Stops the title backfill task when the cog is removed.
+        """
+        if self.title_backfill_task:
+            self.title_backfill_task.cancel()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """
+        Starts backfilling missing video titles once the bot is connected.
+        Only the process running shard 0 backfills, so sharded deployments do
+        not repeat the work.
+        """
+        if (
+            not self.youtube_api_key
+            or self.title_backfill_task
+            or not owns_shard_zero(self.bot)
+        ):
+            return
+        client = YouTubeApiClient(
+            self.bot.web_client,
+            self.youtube_api_key,
+            rate_limiter=RateLimiter(DEFAULT_REQUESTS_PER_SECOND),
+        )
+        self.title_backfill_task = asyncio.create_task(
+            run_title_backfill_task(self.bot, TitleBackfill(client))
+        )
 
     def __get_youtube_service(self):
         """
         Returns a YouTube service object for interacting with the YouTube API.
         :return: The YouTube service object.
         """
+        # googleapiclient takes a fifth of a second to import and only this
+        # command uses it, so it is loaded on first use
+        from googleapiclient.discovery import (  # pylint: disable=import-outside-toplevel
+            build,
+        )
+
         return build("youtube", "v3", developerKey=self.youtube_api_key)
 
     async def search_youtube(self, query: str):
@@ -38,30 +86,29 @@ class YouTube(commands.Cog):
         :return: The search results.
         """
         logger.info("Querying Youtube with query: %s", query)
-        youtube = self.__get_youtube_service()
-        request = youtube.search().list(  # pylint: disable=no-member
-            part="snippet",
-            maxResults=1,
-            q=query,
-            type="video",
-        )
-        response = request.execute()
+        with span("youtube.search", child_only=True, query=query):
+            youtube = self.__get_youtube_service()
+            request = youtube.search().list(  # pylint: disable=no-member
+                part="snippet",
+                maxResults=1,
+                q=query,
+                type="video",
+            )
+            response = request.execute()
         return response
 
-    async def __get_random_video_id_from_db(self):
+    async def __get_random_video_id_from_db(self, guild_id: Optional[int] = None):
         """
         Gets a random video ID from the YouTube Video ID database.
-        :return: A random video ID.
+        Inside a guild, videos are drawn from the guild's shuffle bag so they
+        do not repeat until every video has been shown.
+        :param guild_id: The guild to draw for, or None outside of guilds.
+        :return: A random video ID, or None if the database has no videos.
         """
-        # Grab a random video ID
-        async for session in get_session():
-            result = await session.execute(
-                select(YouTubeVideo.video_id)
-                .order_by(func.random())  # pylint: disable=not-callable
-                .limit(1)
-            )
-            video_id = result.scalar()
-            return video_id
+        async with get_session() as session:
+            if guild_id is None:
+                return await self.video_sampler.sample(session)
+            return await self.shuffle_sampler.draw(session, guild_id)
 
     def __build_url_from_id(
         self, video_id: str
@@ -73,7 +120,7 @@ class YouTube(commands.Cog):
         """
         return f"https://www.youtube.com/watch?v={video_id}"
 
-    @commands.command(name="randyt", aliases=["ryt"])
+    @commands.hybrid_command(name="randyt", aliases=["ryt"])
     async def random_youtube_video(self, context: commands.Context):
         """
         Selects a random video from YouTube.
@@ -82,8 +129,14 @@ class YouTube(commands.Cog):
         :return: None
         """
         logger.info("Random Youtube video requested by user ID %s", context.author.id)
+        await context.defer()
         # Get a random video ID
-        video_id = await self.__get_random_video_id_from_db()
+        video_id = await self.__get_random_video_id_from_db(
+            context.guild.id if context.guild else None
+        )
+        if video_id is None:
+            await context.send("There are no videos to pick from yet.")
+            return
 
         # Build the URL
         video_url = self.__build_url_from_id(video_id)
@@ -6,17 +6,48 @@ This package contains the core components for running the Asdana Discord bot.
 Modules:
     bot: Main bot class and prefix configuration.
     config: Configuration management from environment variables.
+    executor: Thread and process pools for offloading heavy work.
     logging_config: Logging setup and configuration.
+    startup: Cog startup timing and reporting.
+
+The bot and logging helpers are imported on first use, so importing the
+configuration does not load discord.py. The configuration itself is read from
+the environment on the first ``get_config()`` call; ``config`` is the global
+configuration under its older name, looked up on each access.
 """
 
-from asdana.core.bot import AsdanaBot, get_prefix
-from asdana.core.config import Config, config
-from asdana.core.logging_config import setup_logging
+from typing import TYPE_CHECKING
+
+from asdana.core.config import Config, get_config, set_config
+from asdana.utils.lazy import lazy_exports
+
+# Importing the submodule bound it here as ``config``, shadowing the global
+# configuration that name refers to; __getattr__ serves that instead
+del globals()["config"]
+
+if TYPE_CHECKING:
+    from asdana.core.bot import AsdanaBot, get_prefix
+    from asdana.core.config import config
+    from asdana.core.logging_config import setup_logging
 
 __all__ = [
     "AsdanaBot",
     "Config",
     "config",
+    "get_config",
     "get_prefix",
+    "set_config",
     "setup_logging",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "AsdanaBot": "asdana.core.bot",
+        "config": "asdana.core.config",
+        "get_prefix": "asdana.core.bot",
+        "setup_logging": "asdana.core.logging_config",
+    },
+    # Follows set_config()
+    uncached=["config"],
+)
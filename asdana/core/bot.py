@@ -2,20 +2,45 @@
 The main Asdana bot class and prefix configuration.
 """
 
+import asyncio
 import logging
 import os
-from typing import Optional
+import time
+from typing import Any, Callable, Iterable, Optional
 
 import discord
 from aiohttp import ClientSession
+from discord import app_commands
 from discord.ext import commands
 from typing_extensions import override
 
-from asdana.database.database import get_session
+from asdana.core.command_sync import sync_changed_scopes
+from asdana.core.config import get_config
+from asdana.core.executor import THREAD, OffloadExecutor
+from asdana.core.intents import bot_intents, describe
+from asdana.core.metrics import ERROR, OK, CommandMetrics, start_timer, stop_timer
+from asdana.core.monitor import ResourceMonitor
+from asdana.core.queries import COMMAND, EVENT, QueryMetrics, count_queries
+from asdana.core.tracing import end_span, start_span
+from asdana.core.watchdog import StallWatchdog
+from asdana.core.shards import ShardMetrics
+from asdana.core.startup import (
+    CogTiming,
+    format_startup_report,
+    preimport,
+    process_uptime,
+)
+from asdana.database.database import get_database, get_session
 from asdana.database.models import GuildSettings
 
 logger = logging.getLogger(__name__)
 
+# Command modes: how users invoke commands
+PREFIX = "prefix"  # Message commands only
+HYBRID = "hybrid"  # Message commands and slash commands
+SLASH = "slash"  # Slash commands only; messages are never processed
+COMMAND_MODES = (PREFIX, HYBRID, SLASH)
+
 
 async def get_prefix(bot: commands.Bot, message: discord.Message) -> list[str]:
     """
@@ -52,23 +77,76 @@ async def get_prefix(bot: commands.Bot, message: discord.Message) -> list[str]:
     return commands.when_mentioned_or(*default_prefixes)(bot, message)
 
 
-class AsdanaBot(commands.Bot):
+class AsdanaCommandTree(app_commands.CommandTree):
+    """
+    Command tree that counts the queries of each slash command invocation,
+    from the interaction and command checks on, not just once it runs.
+    """
+
+    @override
+    async def _call(self, interaction: discord.Interaction) -> None:
+        with count_queries() as counter:
+            await super()._call(interaction)
+        # Autocomplete interactions go through here too
+        command = interaction.command
+        is_command = interaction.type is discord.InteractionType.application_command
+        if is_command and command is not None:
+            self.client.query_metrics.record(COMMAND, command.qualified_name, counter)
+
+
+class AsdanaBot(
+    commands.AutoShardedBot
+):  # pylint: disable=too-many-instance-attributes
     """
     The main bot class for Asdana.
 
-    This extends discord.py's Bot class with custom functionality for
-    loading/unloading cogs and managing bot state.
+    This extends discord.py's AutoShardedBot class with custom functionality
+    for loading/unloading cogs and managing bot state. Without ``shard_count``
+    Discord's recommended number of shards is used; ``shard_ids`` limits the
+    process to a subset of them. Cogs are loaded once per process, not per
+    shard.
+
+    The cogs' commands are hybrid commands. ``command_mode`` decides whether
+    they are invoked from messages, registered as slash commands, or both; in
+    slash mode messages are not looked at at all, so ``get_prefix`` never runs
+    and no message intents are needed.
+
+    With ``derive_intents`` the intents passed in are only an upper bound:
+    once the cogs are loaded, the bot requests just the intents they and its
+    command mode need (see ``asdana.core.intents``).
 
     Attributes:
         web_client: Aiohttp client session for making HTTP requests.
         testing_guild_id: Optional guild ID for testing slash commands.
+        command_mode: One of ``COMMAND_MODES``.
+        disabled_cogs: Names of cog packages that are not loaded.
+        derive_intents: Whether to narrow the intents to what the loaded cogs
+            need.
+        executor: Thread and process pools for CPU-heavy command work.
+        cog_timings: Import and setup time of each cog from the last load.
+        cogs_load_time: Seconds from the start of the last cog load, including
+            any preload, until every cog was registered.
+        ready_time: Seconds from process start until the bot was first ready.
+        shard_metrics: Per-shard event rates and connection counters.
+        command_metrics: Latency histograms of every command, split into
+            time spent on the database, outbound HTTP and Discord's API.
+        query_metrics: SQL statements and round trips per command invocation
+            and per listener event, flagging those over ``QUERY_BUDGET``.
+        monitor: Samples event loop lag, process resources and GC pauses
+            while the bot runs.
+        watchdog: Samples the event loop's stack during stalls, or None when
+            ``WATCHDOG_THRESHOLD_MS`` is not set.
     """
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         *args,
         web_client: ClientSession,
         testing_guild_id: Optional[int] = None,
+        executor: Optional[OffloadExecutor] = None,
+        command_mode: str = PREFIX,
+        disabled_cogs: Iterable[str] = (),
+        derive_intents: bool = False,
         **kwargs,
     ):
         """
@@ -77,22 +155,91 @@ class AsdanaBot(commands.Bot):
         Args:
             web_client: Aiohttp client session for HTTP requests.
             testing_guild_id: Optional guild ID for testing.
+            executor: Optional offload executor; built from the configuration
+                if not given.
+            command_mode: "prefix", "hybrid" or "slash".
+            disabled_cogs: Names of cog packages not to load.
+            derive_intents: Whether to narrow ``intents`` to what the loaded
+                cogs need once they are loaded.
             *args: Additional positional arguments for commands.Bot.
             **kwargs: Additional keyword arguments for commands.Bot.
+
+        Raises:
+            ValueError: If the command mode is unknown.
         """
+        if command_mode not in COMMAND_MODES:
+            raise ValueError(
+                f"Unknown command mode {command_mode!r}; "
+                f"expected one of {', '.join(COMMAND_MODES)}."
+            )
+        kwargs.setdefault("tree_cls", AsdanaCommandTree)
         super().__init__(*args, **kwargs)
         self.web_client = web_client
         self.testing_guild_id = testing_guild_id
+        self.command_mode = command_mode
+        self.disabled_cogs = {name.lower() for name in disabled_cogs}
+        self.derive_intents = derive_intents
+        self._member_cache_flags = kwargs.get("member_cache_flags")
+        self._chunk_guilds_at_startup = kwargs.get("chunk_guilds_at_startup", False)
+        self.executor = executor or OffloadExecutor.from_config(get_config())
+        self.cog_timings: list[CogTiming] = []
+        self.cogs_load_time: Optional[float] = None
+        self.ready_time: Optional[float] = None
+        self._preload_task: Optional[asyncio.Task] = None
+        self._preload_started = 0.0
+        self.shard_metrics = ShardMetrics()
+        self.command_metrics = CommandMetrics()
+        self.query_metrics = QueryMetrics(get_config().query_budget)
+        self.monitor = ResourceMonitor(lag_threshold=get_config().loop_lag_threshold)
+        threshold_ms = get_config().watchdog_threshold_ms
+        self.watchdog: Optional[StallWatchdog] = (
+            StallWatchdog(threshold_ms / 1000) if threshold_ms else None
+        )
+        self.before_invoke(self._start_command_timer)
+        self.after_invoke(self._record_command)
 
-    async def load_cogs(self):
+    @property
+    def message_commands(self) -> bool:
         """
-        Dynamically loads all cogs in the cogs directory into the bot.
+        Whether commands are invoked from messages.
+        """
+        return self.command_mode != SLASH
+
+    @property
+    def slash_commands(self) -> bool:
+        """
+        Whether commands are registered as slash commands.
+        """
+        return self.command_mode != PREFIX
+
+    async def offload(self, func: Callable, *args, kind: str = THREAD, **kwargs) -> Any:
+        """
+        Runs blocking or CPU-heavy work off the event loop.
+
+        Args:
+            func: The callable to run; must be picklable for the process pool.
+            *args: Positional arguments for the callable.
+            kind: "thread" or "process".
+            **kwargs: Keyword arguments for the callable, plus an optional
+                ``timeout`` in seconds.
+
+        Returns:
+            The callable's result.
+        """
+        return await self.executor.run(func, *args, kind=kind, **kwargs)
+
+    def discover_cogs(self) -> list[str]:
+        """
+        Finds the cog packages in the cogs directory.
+
+        Returns:
+            Import paths of the cog packages, sorted.
         """
-        logger.info("Attempting to load cogs.")
         cogs_dir = os.path.join(os.path.dirname(__file__), "..", "cogs")
 
         logger.debug("Looking for cogs in: %s", os.path.abspath(cogs_dir))
 
+        module_paths = set()
         for root, _, files in os.walk(cogs_dir):
             logger.debug("Checking directory: %s", root)
             if root == cogs_dir:  # Skip the root cogs directory
@@ -100,26 +247,126 @@ class AsdanaBot(commands.Bot):
             if "__init__.py" in files:
                 # Get just the subdirectory name (e.g., 'guild')
                 cog_name = os.path.basename(root)
+                if cog_name.lower() in self.disabled_cogs:
+                    logger.info("Skipping disabled cog: %s", cog_name)
+                    continue
                 # Create the absolute import path
-                module_path = f"asdana.cogs.{cog_name}"
+                module_paths.add(f"asdana.cogs.{cog_name}")
+        return sorted(module_paths)
 
-                logger.debug("Attempting to load: %s", module_path)
-                try:
-                    await self.load_extension(module_path)
-                    logger.info("✅ Successfully loaded cog: %s", module_path)
-                except (
-                    commands.ExtensionNotFound,
-                    commands.ExtensionFailed,
-                    commands.NoEntryPointError,
-                ) as e:
-                    logger.error(
-                        "❌ Failed to load cog %s: %s: %s",
-                        module_path,
-                        type(e).__name__,
-                        e,
-                    )
+    def start_cog_preload(self) -> None:
+        """
+        Starts importing the cog packages on a worker thread.
+
+        Call this before slow network work such as database setup or login,
+        so the imports overlap it; ``load_cogs`` waits for them to finish.
+        """
+        if self._preload_task is not None:
+            return
+        self._preload_started = time.perf_counter()
+        self.cog_timings = [CogTiming(path) for path in self.discover_cogs()]
+        self._preload_task = asyncio.create_task(
+            asyncio.to_thread(preimport, self.cog_timings)
+        )
+
+    async def load_cogs(self, preload: bool = True):
+        """
+        Dynamically loads all cogs in the cogs directory into the bot.
+
+        Cog packages are imported on a worker thread (see
+        ``start_cog_preload``), then registered one by one in sorted order, so
+        registration stays deterministic. Per-cog timings are kept in
+        ``cog_timings`` and logged as a startup report.
+
+        Args:
+            preload: Whether to import cog packages on a worker thread first.
+        """
+        logger.info("Attempting to load cogs.")
+        if preload:
+            self.start_cog_preload()
+            await self._preload_task
+            started = self._preload_started
+        else:
+            started = time.perf_counter()
+            self.cog_timings = [CogTiming(path) for path in self.discover_cogs()]
+        self._preload_task = None
+
+        for timing in self.cog_timings:
+            logger.debug("Attempting to load: %s", timing.module_path)
+            setup_started = time.perf_counter()
+            try:
+                await self.load_extension(timing.module_path)
+                logger.info("✅ Successfully loaded cog: %s", timing.module_path)
+            except (
+                commands.ExtensionNotFound,
+                commands.ExtensionFailed,
+                commands.NoEntryPointError,
+            ) as e:
+                timing.error = type(e).__name__
+                logger.error(
+                    "❌ Failed to load cog %s: %s: %s",
+                    timing.module_path,
+                    type(e).__name__,
+                    e,
+                )
+            timing.setup_time = time.perf_counter() - setup_started
 
+        self.cogs_load_time = time.perf_counter() - started
         logger.info("Finished cog loading process.")
+        logger.info(
+            "Cog startup report:\n%s",
+            format_startup_report(self.cog_timings, self.cogs_load_time),
+        )
+
+    def required_intents(self) -> discord.Intents:
+        """
+        Works out the intents the loaded cogs and listeners need, within the
+        intents the bot was created with.
+
+        Returns:
+            The intents.
+        """
+        needed = bot_intents(
+            self,
+            message_commands=self.message_commands,
+            member_cache_flags=self._member_cache_flags,
+            chunk_guilds=self._chunk_guilds_at_startup,
+        )
+        needed.value &= self.intents.value
+        return needed
+
+    def apply_required_intents(self) -> None:
+        """
+        Narrows the intents requested from the gateway to ``required_intents``.
+        Must run before the shards identify, e.g. in ``setup_hook``.
+        """
+        requested = self.required_intents()
+        dropped = discord.Intents.none()
+        dropped.value = self.intents.value & ~requested.value
+        # discord.py reads the intents from the connection state when a shard
+        # identifies and offers no public way to change them after creation
+        self._connection._intents = requested  # pylint: disable=protected-access
+        logger.info("Requesting gateway intents: %s", describe(requested))
+        logger.info("Not requesting unused intents: %s", describe(dropped))
+
+    async def sync_app_commands(self, force: bool = False) -> list[str]:
+        """
+        Registers the slash commands with Discord. With a testing guild they
+        are registered there only, where changes show up immediately. Scopes
+        whose commands did not change since their last sync are skipped.
+
+        Args:
+            force: Sync even if the commands did not change.
+
+        Returns:
+            Names of the scopes that were synced.
+        """
+        if self.testing_guild_id is None:
+            return await sync_changed_scopes(self.tree, [None], force=force)
+        self.tree.copy_global_to(guild=discord.Object(self.testing_guild_id))
+        return await sync_changed_scopes(
+            self.tree, [self.testing_guild_id], force=force
+        )
 
     async def unload_cogs(self):
         """
@@ -133,6 +380,147 @@ class AsdanaBot(commands.Bot):
             except commands.ExtensionNotLoaded as e:
                 logger.error("Failed to unload Cog %s: %s", cog, e)
 
+    async def on_ready(self) -> None:
+        """
+        Records how long the bot took to become ready after process start.
+        Reconnects fire this event again; only the first one is recorded.
+        """
+        if self.ready_time is not None:
+            return
+        self.ready_time = process_uptime()
+        logger.info(
+            "Bot ready %.2f s after process start (cogs loaded in %.0f ms).",
+            self.ready_time,
+            (self.cogs_load_time or 0.0) * 1000,
+        )
+
+    async def _start_command_timer(self, context: commands.Context) -> None:
+        # Held in a context variable for the phases, and on the context so
+        # the error hook can tell invoked commands from refused ones
+        context.command_timer = start_timer()
+        context.command_span = start_span(
+            f"command {context.command.qualified_name}",
+            cog=context.command.cog_name or "",
+            guild_id=context.guild.id if context.guild else 0,
+            slash=context.interaction is not None,
+        )
+
+    async def _record_command(self, context: commands.Context) -> None:
+        end_span(
+            getattr(context, "command_span", None),
+            error="command failed" if context.command_failed else None,
+        )
+        timer = stop_timer()
+        if timer is None:
+            return
+        self.command_metrics.record(
+            context.command.qualified_name,
+            context.command.cog_name or "",
+            ERROR if context.command_failed else OK,
+            timer,
+        )
+
+    async def _process_message(self, message: discord.Message) -> None:
+        # Runs the message command a message invokes, if any, counting its
+        # queries from the prefix lookup and checks on, not just once it runs
+        if message.author.bot:
+            return
+        with count_queries() as counter:
+            context = await self.get_context(message)
+            await self.invoke(context)
+        if context.command is not None:
+            self.query_metrics.record(COMMAND, context.command.qualified_name, counter)
+
+    @override
+    async def _run_event(self, coro, event_name: str, *args, **kwargs) -> None:
+        # Every listener runs through here in its own task
+        with count_queries() as counter:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        self.query_metrics.record(EVENT, event_name, counter)
+
+    @override
+    async def on_command_error(
+        self, context: commands.Context, exception: commands.CommandError, /
+    ) -> None:
+        """
+        Counts commands refused before they ran, e.g. by a failed check, then
+        reports the error as usual.
+        """
+        if context.command is not None and not hasattr(context, "command_timer"):
+            self.command_metrics.record_rejection(
+                context.command.qualified_name,
+                context.command.cog_name or "",
+                type(exception).__name__,
+            )
+        await super().on_command_error(context, exception)
+
+    @override
+    async def on_message(self, message: discord.Message, /) -> None:
+        """
+        Processes message commands, unless the bot only takes slash commands.
+        """
+        if self.message_commands:
+            await self._process_message(message)
+
+    @override
+    def dispatch(self, event_name: str, /, *args: Any, **kwargs: Any) -> None:
+        """
+        Counts each event against the shard it arrived on before dispatching
+        it. Raw socket events are skipped; their parsed events are counted.
+        """
+        if not event_name.startswith("socket_"):
+            self.shard_metrics.record_event(event_name, args)
+        super().dispatch(event_name, *args, **kwargs)
+
+    async def on_shard_connect(self, shard_id: int) -> None:
+        """
+        Records a shard connecting to the gateway.
+        """
+        self.shard_metrics.shard_count = self.shard_count
+        self.shard_metrics.record_connect(shard_id)
+        logger.info("Shard %s connected.", shard_id)
+
+    async def on_shard_disconnect(self, shard_id: int) -> None:
+        """
+        Records a shard losing its gateway connection.
+        """
+        self.shard_metrics.record_disconnect(shard_id)
+        logger.warning("Shard %s disconnected.", shard_id)
+
+    async def on_shard_resumed(self, shard_id: int) -> None:
+        """
+        Records a shard resuming its session.
+        """
+        self.shard_metrics.record_resume(shard_id)
+        logger.info("Shard %s resumed.", shard_id)
+
+    async def on_shard_ready(self, shard_id: int) -> None:
+        """
+        Records a shard receiving all of its guilds.
+        """
+        self.shard_metrics.record_ready(shard_id)
+        logger.info("Shard %s ready.", shard_id)
+
+    @override
+    async def close(self) -> None:
+        """
+        Stops the resource monitor and the stall watchdog, writing its
+        report if configured, and shuts down the offload executor and the
+        database engine along with the bot.
+        """
+        await self.monitor.stop()
+        if self.watchdog is not None:
+            await self.watchdog.stop()
+            report = get_config().watchdog_report
+            if report:
+                try:
+                    self.watchdog.dump(report)
+                except OSError:
+                    logger.exception("Could not write the stall report.")
+        await self.executor.shutdown()
+        await get_database().dispose()
+        await super().close()
+
     @override
     async def setup_hook(self) -> None:
         """
@@ -140,4 +528,11 @@ class AsdanaBot(commands.Bot):
 
         This is called automatically by discord.py before the bot connects.
         """
+        self.monitor.start()
+        if self.watchdog is not None:
+            self.watchdog.start()
         await self.load_cogs()
+        if self.slash_commands:
+            await self.sync_app_commands()
+        if self.derive_intents:
+            self.apply_required_intents()
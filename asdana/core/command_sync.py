@@ -0,0 +1,119 @@
+"""
+Application command sync for the Asdana bot.
+
+Syncing the command tree is slow and tightly rate limited, yet the commands
+rarely change between restarts. Each scope (the global commands, or one
+guild's) is synced only when a hash of the payload Discord would receive
+differs from the hash stored after the last sync. The hashes are kept in the
+database, so the workers of a cluster share them and only the first worker to
+start after a change syncs.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Iterable, Optional
+
+import discord
+from discord import app_commands
+from sqlalchemy.exc import SQLAlchemyError
+
+from asdana.database.database import get_session
+from asdana.database.models import CommandSyncState
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+
+
+def scope_name(guild_id: Optional[int]) -> str:
+    """
+    Returns the name a scope's sync state is stored under.
+    :param guild_id: The guild, or None for the global commands.
+    :return: The scope name.
+    """
+    return GLOBAL_SCOPE if guild_id is None else f"guild:{guild_id}"
+
+
+def tree_payload(tree: app_commands.CommandTree, guild_id: Optional[int]) -> list:
+    """
+    Builds the payload a sync of one scope sends to Discord.
+    :param tree: The command tree.
+    :param guild_id: The guild, or None for the global commands.
+    :return: The commands as JSON-serializable dicts, ordered by type and name.
+    """
+    guild = None if guild_id is None else discord.Object(guild_id)
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    return sorted(payload, key=lambda command: (command["type"], command["name"]))
+
+
+def payload_hash(payload: list) -> str:
+    """
+    Hashes a command payload independently of dict ordering.
+    :param payload: The payload from ``tree_payload``.
+    :return: The hex SHA-256 digest.
+    """
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+async def load_hash(scope: str) -> Optional[str]:
+    """
+    Returns the hash stored after a scope's last sync.
+    :param scope: The scope name.
+    :return: The hash, or None if the scope was never synced or the database
+        could not be read.
+    """
+    try:
+        async with get_session() as session:
+            state = await session.get(CommandSyncState, scope)
+            return state.payload_hash if state else None
+    except (OSError, SQLAlchemyError) as e:
+        logger.warning("Could not read the command sync state of %s: %s", scope, e)
+        return None
+
+
+async def store_hash(scope: str, value: str) -> None:
+    """
+    Stores the hash of a scope's synced payload.
+    :param scope: The scope name.
+    :param value: The hash.
+    """
+    try:
+        async with get_session() as session:
+            state = await session.get(CommandSyncState, scope)
+            if state is None:
+                session.add(CommandSyncState(scope=scope, payload_hash=value))
+            else:
+                state.payload_hash = value
+            await session.commit()
+    except (OSError, SQLAlchemyError) as e:
+        logger.warning("Could not store the command sync state of %s: %s", scope, e)
+
+
+async def sync_changed_scopes(
+    tree: app_commands.CommandTree,
+    guild_ids: Iterable[Optional[int]],
+    force: bool = False,
+) -> list[str]:
+    """
+    Syncs the scopes whose commands changed since their last sync.
+    :param tree: The command tree.
+    :param guild_ids: The scopes to check: guild IDs, or None for the global
+        commands.
+    :param force: Sync every scope even if its hash is unchanged.
+    :return: Names of the scopes that were synced.
+    """
+    synced = []
+    for guild_id in guild_ids:
+        scope = scope_name(guild_id)
+        digest = payload_hash(tree_payload(tree, guild_id))
+        if not force and await load_hash(scope) == digest:
+            logger.info("Commands of %s unchanged; skipping sync.", scope)
+            continue
+        guild = None if guild_id is None else discord.Object(guild_id)
+        commands = await tree.sync(guild=guild)
+        await store_hash(scope, digest)
+        synced.append(scope)
+        logger.info("Synced %d commands to %s.", len(commands), scope)
+    return synced
@@ -1,5 +1,10 @@
 """
 Configuration management for the Asdana bot.
+
+The configuration is read from the environment (and a ``.env`` file) the first
+time ``get_config()`` is called rather than when this module is imported, so
+importing cogs has no side effects and tests can install their own
+configuration with ``set_config()``.
 """
 
 import os
@@ -11,12 +16,14 @@ from dotenv import load_dotenv
 class Config:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
     """
     Configuration holder for bot settings loaded from environment variables.
+
+    Only the process environment is read. ``get_config()`` loads the ``.env``
+    file into it first; code constructing a ``Config`` directly must call
+    ``load_dotenv()`` itself if it wants the file's values.
     """
 
     def __init__(self):
         """Initialize configuration from environment variables."""
-        load_dotenv()
-
         # Bot configuration
         self.bot_token: Optional[str] = os.getenv("BOT_TOKEN")
         self.bot_description: Optional[str] = os.getenv("BOT_DESCRIPTION")
@@ -25,6 +32,69 @@ class Config:  # pylint: disable=too-many-instance-attributes,too-few-public-met
             int(testing_guild_id_env) if testing_guild_id_env is not None else None
         )
 
+        # Sharding configuration; without a count Discord's recommendation is used
+        shard_count_env = os.getenv("SHARD_COUNT")
+        self.shard_count: Optional[int] = (
+            int(shard_count_env) if shard_count_env else None
+        )
+        self.shard_ids: Optional[list[int]] = _parse_shard_ids(os.getenv("SHARD_IDS"))
+        cluster_workers_env = os.getenv("CLUSTER_WORKERS")
+        self.cluster_workers: Optional[int] = (
+            int(cluster_workers_env) if cluster_workers_env else None
+        )
+
+        # How commands are invoked: "prefix", "hybrid" or "slash"
+        self.command_mode: str = os.getenv("COMMAND_MODE", "prefix").lower()
+
+        # Member cache configuration (see asdana.core.member_cache)
+        self.member_cache: str = os.getenv("MEMBER_CACHE", "none")
+        self.chunk_guilds_at_startup: bool = os.getenv(
+            "CHUNK_GUILDS_AT_STARTUP", "false"
+        ).lower() in ("1", "true", "yes")
+
+        # Cog packages not to load, e.g. "youtube,random"; the gateway intents
+        # only they need are then not requested
+        self.disabled_cogs: list[str] = [
+            name.strip().lower()
+            for name in os.getenv("DISABLED_COGS", "").split(",")
+            if name.strip()
+        ]
+
+        # Metrics and health endpoint; disabled without a port. Cluster workers
+        # listen on consecutive ports starting at this one. Only served on
+        # loopback unless METRICS_HOST opens it up, e.g. to 0.0.0.0
+        metrics_port_env = os.getenv("METRICS_PORT")
+        self.metrics_port: Optional[int] = (
+            int(metrics_port_env) if metrics_port_env else None
+        )
+        self.metrics_host: str = os.getenv("METRICS_HOST", "127.0.0.1")
+
+        # Event loop lag, in seconds, that is logged as a warning
+        self.loop_lag_threshold: float = float(os.getenv("LOOP_LAG_THRESHOLD", "0.25"))
+
+        # Stall watchdog: samples the event loop's stack whenever it has not
+        # run for this many milliseconds; disabled when unset. The report is
+        # written to WATCHDOG_REPORT, if set, when the bot closes
+        watchdog_env = os.getenv("WATCHDOG_THRESHOLD_MS")
+        self.watchdog_threshold_ms: Optional[float] = (
+            float(watchdog_env) if watchdog_env else None
+        )
+        self.watchdog_report: Optional[str] = os.getenv("WATCHDOG_REPORT") or None
+
+        # Tracing: traces slower than this many seconds, or failed, are
+        # always kept, and this fraction of the others
+        self.trace_slow_threshold: float = float(
+            os.getenv("TRACE_SLOW_THRESHOLD", "1.0")
+        )
+        self.trace_sample_rate: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+        # Bearer token the metrics server's /traces endpoint requires; the
+        # endpoint is not served without one
+        self.traces_token: Optional[str] = os.getenv("TRACES_TOKEN") or None
+
+        # SQL statements a command or event may run before it is logged as
+        # over budget
+        self.query_budget: int = int(os.getenv("QUERY_BUDGET", "5"))
+
         # Logging configuration
         self.log_level: str = os.getenv("LOG_LEVEL", "INFO")
 
@@ -38,6 +108,13 @@ class Config:  # pylint: disable=too-many-instance-attributes,too-few-public-met
         # API keys
         self.youtube_api_key: Optional[str] = os.getenv("YT_API_KEY")
 
+        # Offload executor configuration
+        self.offload_thread_workers: int = int(os.getenv("OFFLOAD_THREAD_WORKERS", "4"))
+        self.offload_process_workers: int = int(
+            os.getenv("OFFLOAD_PROCESS_WORKERS", "2")
+        )
+        self.offload_timeout: float = float(os.getenv("OFFLOAD_TIMEOUT", "30"))
+
     @property
     def database_url(self) -> str:
         """
@@ -52,5 +129,59 @@ class Config:  # pylint: disable=too-many-instance-attributes,too-few-public-met
         )
 
 
-# Global configuration instance
-config = Config()
+def _parse_shard_ids(value: Optional[str]) -> Optional[list[int]]:
+    """
+    Parses a list of shard IDs such as ``0,1,4-7``. Empty entries, e.g. from
+    a trailing comma, are skipped.
+    :param value: Comma-separated IDs and inclusive ranges.
+    :return: The sorted shard IDs, or None if none were given.
+    :raises ValueError: If an entry is neither an ID nor a range.
+    """
+    shard_ids = set()
+    for part in (value or "").split(","):
+        if not part.strip():
+            continue
+        first, _, last = part.strip().partition("-")
+        try:
+            shard_ids.update(range(int(first), int(last or first) + 1))
+        except ValueError:
+            raise ValueError(
+                f"Invalid shard ID {part.strip()!r} in SHARD_IDS; "
+                "expected IDs and ranges such as 0,1,4-7."
+            ) from None
+    return sorted(shard_ids) or None
+
+
+_config: Optional[Config] = None  # pylint: disable=invalid-name
+
+
+def get_config() -> Config:
+    """
+    Returns the global configuration, loading it on first use.
+    :return: The configuration.
+    """
+    global _config  # pylint: disable=global-statement
+    if _config is None:
+        load_dotenv()
+        _config = Config()
+    return _config
+
+
+def set_config(new_config: Optional[Config]) -> Optional[Config]:
+    """
+    Replaces the global configuration. Passing None makes the next
+    ``get_config()`` call load it from the environment again.
+    :param new_config: The configuration to use.
+    :return: The configuration that was replaced, if any.
+    """
+    global _config  # pylint: disable=global-statement
+    previous, _config = _config, new_config
+    return previous
+
+
+def __getattr__(name: str):
+    # The module-level ``config`` name is kept for compatibility; it is the
+    # global configuration, created when something first asks for it
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,294 @@
+"""
+Managed thread and process pools for moving heavy work off the event loop.
+
+Everything in the cogs shares one asyncio loop, so CPU-heavy work run inline
+delays gateway heartbeats for every guild. ``OffloadExecutor`` owns a thread
+pool and a process pool, runs callables on them with per-task timeouts and
+cancellation, and keeps queue-depth and runtime metrics for each pool.
+
+Threads suit work that releases the GIL or yields it regularly; work that
+holds the GIL for long stretches (e.g. huge integer multiplications) belongs
+in the process pool. Process pool callables and their arguments must be
+picklable, and each worker process keeps its own module state.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pool kinds
+THREAD = "thread"
+PROCESS = "process"
+
+# Default configuration constants
+DEFAULT_THREAD_WORKERS = 4
+DEFAULT_PROCESS_WORKERS = 2
+DEFAULT_TIMEOUT = 30.0  # seconds
+
+
+def _timed_call(func: Callable, args: tuple, kwargs: dict) -> tuple[float, float, Any]:
+    """
+    Runs a callable in a worker and measures when it started and how long it
+    took. Wall-clock time is used so process workers report comparable times.
+    :param func: The callable.
+    :param args: Positional arguments.
+    :param kwargs: Keyword arguments.
+    :return: (start time, runtime in seconds, result).
+    """
+    started = time.time()
+    result = func(*args, **kwargs)
+    return started, time.time() - started, result
+
+
+class PoolStats:  # pylint: disable=too-many-instance-attributes
+    """
+    Counters for one worker pool.
+
+    Attributes:
+        workers: Number of workers in the pool.
+        pending: Tasks submitted and not yet finished (queued or running).
+        completed: Tasks that returned a result.
+        failed: Tasks that raised an exception.
+        timed_out: Tasks whose caller stopped waiting after the timeout.
+        cancelled: Tasks cancelled before they finished.
+        total_runtime: Seconds spent running finished tasks.
+        max_runtime: Longest runtime of a single task, in seconds.
+        total_wait: Seconds finished tasks spent queued before starting.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.total_runtime = 0.0
+        self.max_runtime = 0.0
+        self.total_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Tasks waiting for a free worker.
+        """
+        return max(0, self.pending - self.workers)
+
+    @property
+    def mean_runtime(self) -> float:
+        """
+        Average runtime of tasks that returned a result, in seconds.
+        """
+        return self.total_runtime / self.completed if self.completed else 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        """
+        Average time tasks that returned a result spent queued, in seconds.
+        """
+        return self.total_wait / self.completed if self.completed else 0.0
+
+
+class OffloadExecutor:
+    """
+    Runs blocking callables on managed thread and process pools.
+
+    Pools are created on first use, so a bot that never offloads to processes
+    never spawns any. A timeout or cancellation stops the caller from waiting
+    and cancels tasks that have not started yet; a task that is already
+    running cannot be interrupted and finishes in the background.
+
+    Attributes:
+        thread_workers: Size of the thread pool.
+        process_workers: Size of the process pool; 0 runs process tasks on
+            the thread pool instead.
+        default_timeout: Seconds to wait for a task unless told otherwise.
+        stats: Counters for each pool kind.
+    """
+
+    def __init__(
+        self,
+        thread_workers: int = DEFAULT_THREAD_WORKERS,
+        process_workers: int = DEFAULT_PROCESS_WORKERS,
+        default_timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ):
+        if thread_workers < 1:
+            raise ValueError("The offload thread pool needs at least one worker.")
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.default_timeout = default_timeout
+        self.stats = {
+            THREAD: PoolStats(thread_workers),
+            PROCESS: PoolStats(process_workers),
+        }
+        self._pools: dict[str, Executor] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, config) -> "OffloadExecutor":
+        """
+        Creates an executor sized from the bot configuration.
+        :param config: The bot configuration.
+        :return: The executor.
+        """
+        return cls(
+            thread_workers=config.offload_thread_workers,
+            process_workers=config.offload_process_workers,
+            default_timeout=config.offload_timeout,
+        )
+
+    def _pool(self, kind: str) -> Executor:
+        """
+        Returns the pool for a kind of task, creating it on first use.
+        :param kind: ``THREAD`` or ``PROCESS``.
+        :return: The pool.
+        """
+        if self._closed:
+            raise RuntimeError("The offload executor has been shut down.")
+        if kind not in self.stats:
+            raise ValueError(f"Unknown offload pool kind: {kind}")
+
+        pool = self._pools.get(kind)
+        if pool is None:
+            if kind == PROCESS:
+                # Spawned workers do not inherit the event loop or sockets
+                pool = ProcessPoolExecutor(
+                    self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                pool = ThreadPoolExecutor(
+                    self.thread_workers, thread_name_prefix="asdana-offload"
+                )
+            self._pools[kind] = pool
+            logger.info("Started offload %s pool.", kind)
+        return pool
+
+    def _finished(self, stats: PoolStats, submitted: float, future: Future) -> None:
+        """
+        Records the outcome of a task once its worker is done with it.
+        Runs on whichever thread completes the future.
+        """
+        with self._lock:
+            stats.pending -= 1
+            if future.cancelled():
+                stats.cancelled += 1
+            elif future.exception() is not None:
+                stats.failed += 1
+            else:
+                started, runtime, _ = future.result()
+                stats.completed += 1
+                stats.total_runtime += runtime
+                stats.max_runtime = max(stats.max_runtime, runtime)
+                stats.total_wait += max(0.0, started - submitted)
+
+    async def run(
+        self,
+        func: Callable,
+        *args,
+        kind: str = THREAD,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Runs a callable on a worker pool and waits for its result.
+        :param func: The callable; must be picklable for the process pool.
+        :param args: Positional arguments for the callable.
+        :param kind: ``THREAD`` or ``PROCESS``.
+        :param timeout: Seconds to wait; defaults to ``default_timeout``.
+        :param kwargs: Keyword arguments for the callable.
+        :return: The callable's result.
+        :raises asyncio.TimeoutError: If the task did not finish in time.
+        :raises BrokenExecutor: If the pool broke; it is replaced for later
+            tasks.
+        """
+        if kind == PROCESS and not self.process_workers:
+            kind = THREAD
+        pool = self._pool(kind)
+        stats = self.stats[kind]
+        with self._lock:
+            stats.pending += 1
+        submitted = time.time()
+        try:
+            future = pool.submit(_timed_call, func, args, kwargs)
+        except BrokenExecutor:
+            with self._lock:
+                stats.pending -= 1
+                stats.failed += 1
+            self._discard(kind, pool)
+            raise
+        future.add_done_callback(lambda done: self._finished(stats, submitted, done))
+
+        timeout = self.default_timeout if timeout is None else timeout
+        try:
+            _, _, result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                stats.timed_out += 1
+            logger.warning(
+                "Offloaded %s timed out after %.1fs.",
+                getattr(func, "__qualname__", func),
+                timeout,
+            )
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BrokenExecutor:
+            self._discard(kind, pool)
+            raise
+        return result
+
+    def _discard(self, kind: str, pool: Executor) -> None:
+        """
+        Drops a pool that broke, e.g. because a worker process died, so the
+        next task starts a new one.
+        :param kind: ``THREAD`` or ``PROCESS``.
+        :param pool: The broken pool.
+        """
+        if self._pools.get(kind) is pool:
+            del self._pools[kind]
+            pool.shutdown(wait=False, cancel_futures=True)
+            logger.warning("Offload %s pool broke; it is restarted on next use.", kind)
+
+    async def shutdown(self) -> None:
+        """
+        Shuts the pools down, cancelling queued tasks. Running tasks are left
+        to finish without being waited for.
+        """
+        self._closed = True
+        for kind, pool in self._pools.items():
+            pool.shutdown(wait=False, cancel_futures=True)
+            logger.info("Stopped offload %s pool.", kind)
+        self._pools.clear()
+
+
+async def offload(bot, func: Callable, *args, kind: str = THREAD, **kwargs) -> Any:
+    """
+    Runs a callable through the bot's offload executor. Bots without one, such
+    as the plain bots used in tests, run it inline.
+    :param bot: The bot.
+    :param func: The callable.
+    :param args: Positional arguments for the callable.
+    :param kind: ``THREAD`` or ``PROCESS``.
+    :param kwargs: Keyword arguments for the callable.
+    :return: The callable's result.
+    """
+    executor: Optional[OffloadExecutor] = getattr(bot, "executor", None)
+    if executor is None:
+        return func(*args, **kwargs)
+    return await executor.run(func, *args, kind=kind, **kwargs)
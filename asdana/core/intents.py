@@ -0,0 +1,150 @@
+"""
+Gateway intents derived from the loaded cogs.
+
+Discord only sends the events whose intents were requested when a shard
+identifies, and every event received costs CPU to parse. Instead of a fixed
+intent set, each cog declares what it needs: intents for the events its
+listeners handle are inferred from the listener names, and anything else
+(e.g. the members intent for on-demand chunking, or message events needed
+to keep reacted-to messages cached) is declared in a ``required_intents``
+class attribute. The bot requests the union of those, plus what its command
+mode and member cache need, and nothing more.
+"""
+
+from typing import Iterable, Optional
+
+import discord
+from discord.ext import commands
+
+# Needed for the guild and channel cache everything else relies on
+BASE_INTENTS = discord.Intents(guilds=True)
+
+# Intents needed for message (prefix) commands
+MESSAGE_COMMAND_INTENTS = discord.Intents(
+    guild_messages=True, dm_messages=True, message_content=True
+)
+
+_MESSAGES = discord.Intents(guild_messages=True, dm_messages=True)
+_REACTIONS = discord.Intents(guild_reactions=True, dm_reactions=True)
+_TYPING = discord.Intents(guild_typing=True, dm_typing=True)
+_MEMBERS = discord.Intents(members=True)
+_MODERATION = discord.Intents(moderation=True)
+_VOICE_STATES = discord.Intents(voice_states=True)
+
+# Intents each listener event needs, keyed by event name without ``on_``
+EVENT_INTENTS = {
+    "message": _MESSAGES,
+    "message_edit": _MESSAGES,
+    "message_delete": _MESSAGES,
+    "bulk_message_delete": _MESSAGES,
+    "raw_message_edit": _MESSAGES,
+    "raw_message_delete": _MESSAGES,
+    "raw_bulk_message_delete": _MESSAGES,
+    "reaction_add": _REACTIONS,
+    "reaction_remove": _REACTIONS,
+    "reaction_clear": _REACTIONS,
+    "reaction_clear_emoji": _REACTIONS,
+    "raw_reaction_add": _REACTIONS,
+    "raw_reaction_remove": _REACTIONS,
+    "raw_reaction_clear": _REACTIONS,
+    "raw_reaction_clear_emoji": _REACTIONS,
+    "typing": _TYPING,
+    "raw_typing": _TYPING,
+    "member_join": _MEMBERS,
+    "member_remove": _MEMBERS,
+    "member_update": _MEMBERS,
+    "raw_member_remove": _MEMBERS,
+    "user_update": _MEMBERS,
+    "member_ban": _MODERATION,
+    "member_unban": _MODERATION,
+    "audit_log_entry_create": _MODERATION,
+    "presence_update": discord.Intents(presences=True),
+    "voice_state_update": _VOICE_STATES,
+    "guild_emojis_update": discord.Intents(emojis_and_stickers=True),
+    "guild_stickers_update": discord.Intents(emojis_and_stickers=True),
+    "invite_create": discord.Intents(invites=True),
+    "invite_delete": discord.Intents(invites=True),
+    "webhooks_update": discord.Intents(webhooks=True),
+    "integration_create": discord.Intents(integrations=True),
+    "integration_update": discord.Intents(integrations=True),
+    "guild_integrations_update": discord.Intents(integrations=True),
+    "scheduled_event_create": discord.Intents(guild_scheduled_events=True),
+    "scheduled_event_update": discord.Intents(guild_scheduled_events=True),
+    "scheduled_event_delete": discord.Intents(guild_scheduled_events=True),
+}
+
+
+def combine(intents: Iterable[discord.Intents]) -> discord.Intents:
+    """
+    Returns the union of several intent sets.
+    :param intents: The intent sets.
+    :return: A new intent set with every intent that is enabled in any of them.
+    """
+    combined = discord.Intents.none()
+    for item in intents:
+        combined.value |= item.value
+    return combined
+
+
+def event_intents(events: Iterable[str]) -> discord.Intents:
+    """
+    Returns the intents needed to receive some events.
+    :param events: Event names, with or without the ``on_`` prefix.
+    :return: The intents.
+    """
+    return combine(
+        EVENT_INTENTS.get(event.removeprefix("on_"), discord.Intents.none())
+        for event in events
+    )
+
+
+def cog_intents(cog: commands.Cog) -> discord.Intents:
+    """
+    Returns the intents a cog needs: those it declares in
+    ``required_intents`` plus those its listeners imply.
+    :param cog: The cog.
+    :return: The intents.
+    """
+    declared = getattr(cog, "required_intents", discord.Intents.none())
+    listeners = (name for name, _ in cog.get_listeners())
+    return combine([declared, event_intents(listeners)])
+
+
+def bot_intents(
+    bot: commands.Bot,
+    message_commands: bool = True,
+    member_cache_flags: Optional[discord.MemberCacheFlags] = None,
+    chunk_guilds: bool = False,
+) -> discord.Intents:
+    """
+    Returns the intents a bot needs for its loaded cogs and listeners.
+    :param bot: The bot, with its cogs loaded.
+    :param message_commands: Whether commands are invoked from messages.
+    :param member_cache_flags: The member cache policy; caching joined
+        members needs the members intent, and caching members in voice
+        channels needs the voice states intent.
+    :param chunk_guilds: Whether guilds are chunked at startup, which needs
+        the members intent.
+    :return: The intents.
+    """
+    # extra_events holds the listeners of every cog as well as the bot's own;
+    # removing a cog leaves its events behind with no listeners
+    listened = (event for event, listeners in bot.extra_events.items() if listeners)
+    parts = [BASE_INTENTS, event_intents(listened)]
+    parts.extend(cog_intents(cog) for cog in bot.cogs.values())
+    if message_commands and bot.all_commands:
+        parts.append(MESSAGE_COMMAND_INTENTS)
+    if chunk_guilds or (member_cache_flags is not None and member_cache_flags.joined):
+        parts.append(_MEMBERS)
+    if member_cache_flags is not None and member_cache_flags.voice:
+        parts.append(_VOICE_STATES)
+    return combine(parts)
+
+
+def describe(intents: discord.Intents) -> str:
+    """
+    Lists the enabled intents by name.
+    :param intents: The intents.
+    :return: Comma-separated intent names, or "none".
+    """
+    return ", ".join(name for name, enabled in intents if enabled) or "none"
@@ -4,22 +4,43 @@ Logging configuration for the Asdana bot.
 
 import logging
 import logging.handlers
+import os
 
 import discord.utils
 
+# Default configuration constants
+LOG_FILE = "discord.log"
 
-def setup_logging(log_level: str = "INFO") -> None:
+
+def worker_log_file(index: int) -> str:
+    """
+    Returns the log file of a cluster worker. Rotating file handlers are not
+    safe to share between processes, so each worker writes its own file.
+
+    Args:
+        index: Position of the worker in the cluster.
+
+    Returns:
+        The file name, e.g. "discord.worker-0.log".
+    """
+    base, extension = os.path.splitext(LOG_FILE)
+    return f"{base}.worker-{index}{extension}"
+
+
+def setup_logging(log_level: str = "INFO", filename: str = LOG_FILE) -> None:
     """
     Configures logging for the Discord bot.
 
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL).
+        filename: File to write the log to, rotated at 32 MB. Only one
+            process may write to a file.
     """
     discord_logger = logging.getLogger("discord")
     discord_logger.setLevel(log_level)
 
     handler = logging.handlers.RotatingFileHandler(
-        filename="discord.log",
+        filename=filename,
         encoding="utf-8",
         maxBytes=32 * 1024 * 1024,  # 32 MB
         backupCount=5,
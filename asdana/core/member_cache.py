@@ -0,0 +1,89 @@
+"""
+Member cache policy for the Asdana bot.
+
+With the members intent discord.py would cache every member of every guild and
+request all of them at startup, which costs gigabytes of memory and delays
+ready on large guilds, while most commands never look at the member list. The
+policy set in the configuration decides which members are kept; commands that
+do need a guild's full member list fetch it on first use with
+``members_required``.
+"""
+
+import asyncio
+import logging
+
+import discord
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+# Default configuration constants
+CHUNK_TIMEOUT = 60  # seconds a command waits for a guild's member list
+
+# Member cache policies, from most to least memory
+MEMBER_CACHE_POLICIES = {
+    # Every member the bot sees, as discord.py does by default
+    "all": discord.MemberCacheFlags.all,
+    # Members from guild payloads, chunks and join events
+    "joined": lambda: discord.MemberCacheFlags(joined=True, voice=False),
+    # Only members connected to voice channels
+    "voice": lambda: discord.MemberCacheFlags(joined=False, voice=True),
+    # Only the bot's own member in each guild
+    "none": discord.MemberCacheFlags.none,
+}
+
+
+def member_cache_flags(policy: str) -> discord.MemberCacheFlags:
+    """
+    Returns the member cache flags for a policy.
+    :param policy: One of ``MEMBER_CACHE_POLICIES``.
+    :return: The cache flags.
+    :raises ValueError: If the policy is unknown.
+    """
+    try:
+        return MEMBER_CACHE_POLICIES[policy.lower()]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown member cache policy {policy!r}; "
+            f"expected one of {', '.join(MEMBER_CACHE_POLICIES)}."
+        ) from None
+
+
+async def ensure_chunked(guild: discord.Guild, timeout: float = CHUNK_TIMEOUT) -> None:
+    """
+    Fetches and caches a guild's full member list if it is not cached yet.
+    The members stay cached afterwards regardless of the cache policy.
+    :param guild: The guild.
+    :param timeout: Seconds to wait for the member list.
+    :raises asyncio.TimeoutError: If the member list took longer than that.
+    """
+    if guild.chunked:
+        return
+    logger.debug("Chunking guild %s on demand.", guild.id)
+    await asyncio.wait_for(guild.chunk(cache=True), timeout)
+
+
+def members_required():
+    """
+    Command decorator that makes sure the guild's member list is cached
+    before the command runs. Slash commands are deferred first, since
+    chunking a large guild can take longer than the three seconds they have
+    to respond; if the member list does not arrive in time, the user is
+    told and the command does not run.
+    """
+
+    async def predicate(context: commands.Context) -> bool:
+        guild = context.guild
+        if guild is None or guild.chunked:
+            return True
+        interaction = context.interaction
+        if interaction is not None and not interaction.response.is_done():
+            await context.defer()
+        try:
+            await ensure_chunked(guild)
+        except asyncio.TimeoutError:
+            await context.send("❌ The member list took too long to load, try again.")
+            return False
+        return True
+
+    return commands.check(predicate)
@@ -0,0 +1,268 @@
+"""
+Memory attribution for the Asdana bot.
+
+``MemoryTracer`` wraps ``tracemalloc``: tracing starts on demand with a
+baseline snapshot, and later snapshots are compared against it, so what grew
+since the baseline can be told apart from what was allocated at startup.
+Growth is grouped by the ``asdana.*`` module whose code made the allocation,
+directly or through a library, and by cog. Allocations made without any of
+the bot's code on the stack, e.g. discord.py filling its caches from gateway
+events, are grouped by the library that made them.
+
+Tracing slows every allocation down and keeps a traceback for each, so it is
+off unless started; nothing is traced or hooked before then.
+
+``object_counts`` counts the entries of the structures most likely to grow:
+discord.py's caches, SQLAlchemy sessions and their identity maps, and
+whatever each cog reports from an ``object_counts()`` method. Finding the
+sessions means walking the whole heap. The walk runs on a worker thread and
+gives up the GIL every few thousand objects, but it holds the GIL while it
+lists each garbage collector generation, so the event loop still pauses for
+a moment that grows with the heap.
+"""
+
+import gc
+import os
+import time
+import tracemalloc
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from asdana.core.executor import offload
+
+# Default configuration constants
+DEFAULT_FRAMES = 25  # frames kept per traced allocation
+SCAN_CHUNK = 10_000  # objects checked between releases of the GIL
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Allocations made by tracemalloc and the import system are not the bot's
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def module_name(filename: str) -> Optional[str]:
+    """
+    Returns the ``asdana`` module a source file belongs to.
+    :param filename: The source file's path.
+    :return: The dotted module name, or None outside the package.
+    """
+    if not filename.startswith(PACKAGE_DIR + os.sep):
+        return None
+    relative = os.path.relpath(filename, os.path.dirname(PACKAGE_DIR))
+    return os.path.splitext(relative)[0].replace(os.sep, ".")
+
+
+def library_name(filename: str) -> str:
+    """
+    Returns the top-level package a source file outside the bot belongs to.
+    :param filename: The source file's path.
+    :return: The package name, e.g. "discord", or "stdlib"/"other".
+    """
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1].split(os.sep, 1)[0]
+    if filename.startswith(os.path.dirname(os.__file__)):
+        return "stdlib"
+    return "other"
+
+
+def cog_name(module: str) -> str:
+    """
+    Returns the cog a module belongs to.
+    :param module: A dotted ``asdana`` module name.
+    :return: The cog package's name, or "core" for everything else.
+    """
+    parts = module.split(".")
+    if len(parts) > 2 and parts[1] == "cogs":
+        return parts[2]
+    return "core"
+
+
+def _owner(traceback: tracemalloc.Traceback) -> tuple[Optional[str], str]:
+    """
+    Works out who made an allocation.
+    :return: (the innermost ``asdana`` module on the stack, or None; the
+        library of the innermost frame).
+    """
+    # Frames are ordered from the oldest to the most recent call
+    for frame in reversed(traceback):
+        module = module_name(frame.filename)
+        if module is not None:
+            return module, library_name(traceback[-1].filename)
+    return None, library_name(traceback[-1].filename)
+
+
+def group_sizes(snapshot: tracemalloc.Snapshot) -> dict[str, list[int]]:
+    """
+    Sums the traced memory of a snapshot per ``asdana`` module, or per
+    library for allocations made without the bot's code on the stack.
+    :param snapshot: The snapshot.
+    :return: [bytes, blocks] by module or library name.
+    """
+    groups: dict[str, list[int]] = {}
+    for statistic in snapshot.statistics("traceback"):
+        module, library = _owner(statistic.traceback)
+        totals = groups.setdefault(module or library, [0, 0])
+        totals[0] += statistic.size
+        totals[1] += statistic.count
+    return groups
+
+
+def _format_size(size: int) -> str:
+    return (
+        f"{size / 1024:+,.1f} KiB" if abs(size) < 2**20 else f"{size / 2**20:+,.1f} MiB"
+    )
+
+
+class MemoryTracer:
+    """
+    Traces allocations from a baseline and reports what grew since.
+
+    Attributes:
+        frames: Frames kept per traced allocation.
+        baseline: The snapshot later snapshots are compared against.
+    """
+
+    def __init__(self, frames: int = DEFAULT_FRAMES):
+        self.frames = frames
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether allocations are being traced.
+        """
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        """
+        Starts tracing and takes the baseline.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.reset_baseline()
+
+    def stop(self) -> None:
+        """
+        Stops tracing and frees the traces.
+        """
+        self.baseline = None
+        tracemalloc.stop()
+
+    def snapshot(self) -> tracemalloc.Snapshot:
+        """
+        Takes a snapshot of the traced allocations.
+        :return: The snapshot, without tracemalloc's own allocations.
+        """
+        gc.collect()
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def reset_baseline(self) -> None:
+        """
+        Makes the current allocations the new baseline.
+        """
+        self.baseline = self.snapshot()
+
+    def format_report(self, limit: int = 15) -> str:
+        """
+        Compares a new snapshot with the baseline.
+        :param limit: Entries per section.
+        :return: Growth by module, by cog and by allocating line.
+        """
+        current = self.snapshot()
+        before = group_sizes(self.baseline)
+        after = group_sizes(current)
+        growth = {
+            name: (
+                after.get(name, [0, 0])[0] - before.get(name, [0, 0])[0],
+                after.get(name, [0, 0])[1] - before.get(name, [0, 0])[1],
+            )
+            for name in before.keys() | after.keys()
+        }
+        traced, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"traced {traced / 2**20:.1f} MiB (peak {peak / 2**20:.1f} MiB), "
+            f"{_format_size(sum(size for size, _ in growth.values()))} "
+            "since the baseline",
+            "",
+            "by module:",
+        ]
+        ranked = sorted(growth.items(), key=lambda item: -abs(item[1][0]))
+        lines.extend(
+            f"{_format_size(size):>14} {blocks:>+9,} blocks  {name}"
+            for name, (size, blocks) in ranked[:limit]
+            if size
+        )
+
+        cogs: dict[str, int] = {}
+        for name, (size, _) in growth.items():
+            if name.startswith("asdana."):
+                cogs[cog_name(name)] = cogs.get(cog_name(name), 0) + size
+        lines.append("")
+        lines.append("by cog:")
+        lines.extend(
+            f"{_format_size(size):>14}  {name}"
+            for name, size in sorted(cogs.items(), key=lambda item: -abs(item[1]))
+        )
+
+        lines.append("")
+        lines.append("by line:")
+        for difference in current.compare_to(self.baseline, "lineno")[:limit]:
+            frame = difference.traceback[-1]
+            lines.append(
+                f"{_format_size(difference.size_diff):>14} "
+                f"{difference.count_diff:>+9,} blocks  "
+                f"{frame.filename}:{frame.lineno}"
+            )
+        return "\n".join(lines)
+
+
+def session_counts() -> tuple[int, int]:
+    """
+    Counts the live SQLAlchemy sessions and the objects in their identity
+    maps. Walks every object the garbage collector tracks, one generation at
+    a time and in chunks of ``SCAN_CHUNK``, releasing the GIL between chunks
+    so a caller on a worker thread only briefly holds up the event loop.
+    Objects that move between generations during the walk may be missed, so
+    the counts are approximate.
+    :return: The number of sessions and of objects in their identity maps.
+    """
+    sessions = {}
+    for generation in range(3):
+        tracked = gc.get_objects(generation)
+        for start in range(0, len(tracked), SCAN_CHUNK):
+            for item in tracked[start : start + SCAN_CHUNK]:
+                if isinstance(item, Session):
+                    sessions[id(item)] = item
+            time.sleep(0)  # Releases the GIL
+        del tracked
+    return len(sessions), sum(
+        len(session.identity_map) for session in sessions.values()
+    )
+
+
+async def object_counts(bot) -> dict[str, int]:
+    """
+    Counts the entries of the bot's largest in-memory structures.
+    :param bot: The bot.
+    :return: Entries by structure name.
+    """
+    counts = {
+        "guilds": len(bot.guilds),
+        "members": sum(len(guild.members) for guild in bot.guilds),
+        "users": len(bot.users),
+        "messages": len(bot.cached_messages),
+    }
+    counts["db sessions"], counts["db identity map"] = await offload(
+        bot, session_counts
+    )
+    for cog in bot.cogs.values():
+        cog_counts = getattr(cog, "object_counts", None)
+        if cog_counts is not None:
+            counts.update(cog_counts())
+    return counts
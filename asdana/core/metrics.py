@@ -0,0 +1,392 @@
+"""
+Command latency metrics for the Asdana bot.
+
+Every command invocation gets a ``CommandTimer`` held in a context variable,
+so code running on the command's behalf can charge time to it without being
+handed the timer: the database engine charges query time, and aiohttp trace
+hooks charge outbound HTTP and Discord REST time. When the command finishes,
+its total latency and the time spent in each phase are added to histograms
+tagged by command, cog and outcome.
+
+Histograms use fixed, Prometheus-style buckets, so memory stays constant
+however many commands run; percentiles are interpolated within a bucket.
+``MetricFamily`` formats metrics in the Prometheus text exposition format for
+the metrics endpoint (see ``asdana.core.metrics_server``).
+"""
+
+import bisect
+import math
+import time
+from contextvars import ContextVar
+from typing import Iterable, Iterator, Optional
+
+import aiohttp
+from yarl import URL
+
+from asdana.core.tracing import end_span, start_span
+
+# Phases a command's time is split into; "other" is whatever is left, mostly
+# the command's own code and waiting for the event loop
+DB = "db"
+HTTP = "http"
+DISCORD = "discord"
+OTHER = "other"
+PHASES = (DB, HTTP, DISCORD, OTHER)
+
+# Command outcomes
+OK = "ok"
+ERROR = "error"
+
+# Upper bounds of the latency buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+_current_timer: ContextVar[Optional["CommandTimer"]] = ContextVar(
+    "command_timer", default=None
+)
+
+
+class Histogram:
+    """
+    Counts observations in fixed buckets.
+
+    Attributes:
+        bounds: Upper bound of each bucket; a last, unbounded bucket follows.
+        counts: Observations in each bucket (not cumulative).
+        count: Total number of observations.
+        total: Sum of all observations.
+        maximum: Largest observation.
+    """
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Adds an observation.
+        :param value: The observed value.
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def mean(self) -> float:
+        """
+        The mean observation, or 0 without observations.
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimates a percentile by interpolating within its bucket.
+        :param fraction: The percentile as a fraction, e.g. 0.99.
+        :return: The estimate, or 0 without observations.
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.maximum
+                upper = min(upper, self.maximum)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.maximum
+
+    def cumulative(self) -> Iterator[tuple[float, int]]:
+        """
+        Yields (upper bound, observations at or below it), ending with an
+        infinite bound, as in the Prometheus exposition format.
+        """
+        seen = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            seen += count
+            yield bound, seen
+
+
+class CommandTimer:
+    """
+    Measures one command invocation.
+
+    Attributes:
+        started: ``time.perf_counter()`` when the command started.
+        phases: Seconds charged to each phase so far.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+
+    def elapsed(self) -> float:
+        """
+        Seconds since the command started.
+        """
+        return time.perf_counter() - self.started
+
+    def finish(self) -> tuple[float, dict[str, float]]:
+        """
+        Works out the command's latency and fills in the "other" phase.
+        :return: (total seconds, seconds per phase).
+        """
+        total = self.elapsed()
+        # Phases can overlap when a command runs work concurrently
+        charged = sum(
+            seconds for phase, seconds in self.phases.items() if phase != OTHER
+        )
+        self.phases[OTHER] = max(0.0, total - charged)
+        return total, self.phases
+
+
+def start_timer() -> CommandTimer:
+    """
+    Starts timing a command in the current task.
+    :return: The timer.
+    """
+    timer = CommandTimer()
+    _current_timer.set(timer)
+    return timer
+
+
+def stop_timer() -> Optional[CommandTimer]:
+    """
+    Stops charging time to the current task's command timer.
+    :return: The timer, if one was running.
+    """
+    timer = _current_timer.get()
+    _current_timer.set(None)
+    return timer
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    """
+    Charges time to a phase of the command running in the current task, if
+    any.
+    :param phase: The phase.
+    :param seconds: The time spent.
+    """
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.phases[phase] += seconds
+
+
+def _redact(url: URL) -> str:
+    """
+    Formats a URL without its query string, which can hold API keys, and
+    without long path segments, e.g. interaction tokens.
+    """
+    path = "/".join(
+        "{token}" if len(segment) > 40 else segment for segment in url.path.split("/")
+    )
+    return str(url.with_path(path, encoded=True).with_query(None))
+
+
+def trace_config(phase: str) -> aiohttp.TraceConfig:
+    """
+    Builds aiohttp trace hooks that charge request time to a phase and open
+    a span for each request made within a trace.
+    :param phase: The phase, e.g. ``HTTP`` or ``DISCORD``.
+    :return: The trace config, for a ``ClientSession``'s ``trace_configs``.
+    """
+
+    async def on_request_start(_session, context, params):
+        context.started = time.perf_counter()
+        context.span = start_span(
+            f"{phase} {params.method}",
+            child_only=True,
+            activate=False,
+            **{"http.method": params.method, "http.url": _redact(params.url)},
+        )
+
+    async def on_request_end(_session, context, params):
+        record_phase(phase, time.perf_counter() - context.started)
+        if context.span is not None:
+            context.span.attributes["http.status_code"] = params.response.status
+        end_span(context.span)
+
+    async def on_request_exception(_session, context, params):
+        record_phase(phase, time.perf_counter() - context.started)
+        end_span(context.span, error=repr(params.exception))
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_request_start)
+    config.on_request_end.append(on_request_end)
+    config.on_request_exception.append(on_request_exception)
+    return config
+
+
+class CommandMetrics:
+    """
+    Latency histograms for every command.
+
+    Attributes:
+        latencies: Total latency by (command, cog, outcome).
+        phases: Time per phase by (command, phase).
+        rejections: Invocations stopped before running, e.g. by a failed
+            check or a cooldown, by (command, cog, error type).
+    """
+
+    def __init__(self):
+        self.latencies: dict[tuple[str, str, str], Histogram] = {}
+        self.phases: dict[tuple[str, str], Histogram] = {}
+        self.rejections: dict[tuple[str, str, str], int] = {}
+
+    def record(self, command: str, cog: str, outcome: str, timer: CommandTimer) -> None:
+        """
+        Records a finished invocation.
+        :param command: The command's qualified name.
+        :param cog: The command's cog, or "" if it has none.
+        :param outcome: ``OK`` or ``ERROR``.
+        :param timer: The invocation's timer.
+        """
+        total, phases = timer.finish()
+        key = (command, cog, outcome)
+        if key not in self.latencies:
+            self.latencies[key] = Histogram()
+        self.latencies[key].observe(total)
+        for phase, seconds in phases.items():
+            if (command, phase) not in self.phases:
+                self.phases[command, phase] = Histogram()
+            self.phases[command, phase].observe(seconds)
+
+    def record_rejection(self, command: str, cog: str, error: str) -> None:
+        """
+        Records an invocation that was stopped before it ran.
+        :param command: The command's qualified name.
+        :param cog: The command's cog, or "" if it has none.
+        :param error: Name of the error that stopped it.
+        """
+        key = (command, cog, error)
+        self.rejections[key] = self.rejections.get(key, 0) + 1
+
+    def format_report(self, command: Optional[str] = None) -> str:
+        """
+        Formats latency percentiles and the mean time per phase as a table.
+        :param command: Only report this command.
+        :return: The report.
+        """
+        lines = [
+            f"{'command':<20} {'outcome':<7} {'count':>6} {'p50':>8} {'p90':>8} "
+            f"{'p99':>8} {'max':>8}  " + " ".join(f"{phase:>7}" for phase in PHASES)
+        ]
+        for (name, _cog, outcome), histogram in sorted(self.latencies.items()):
+            if command is not None and name != command:
+                continue
+            percentiles = " ".join(
+                f"{histogram.percentile(fraction) * 1000:>6.0f}ms"
+                for fraction in (0.5, 0.9, 0.99)
+            )
+            phases = " ".join(
+                f"{self.phases[name, phase].mean() * 1000:>5.0f}ms" for phase in PHASES
+            )
+            lines.append(
+                f"{name:<20} {outcome:<7} {histogram.count:>6} {percentiles} "
+                f"{histogram.maximum * 1000:>6.0f}ms  {phases}"
+            )
+        for (name, _cog, error), count in sorted(self.rejections.items()):
+            if command is None or name == command:
+                lines.append(f"{name:<20} {'refused':<7} {count:>6}  {error}")
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+class MetricFamily:
+    """
+    One metric and its samples, as exposed to Prometheus.
+
+    Attributes:
+        name: The metric name.
+        kind: "gauge", "counter" or "histogram".
+        help: A one-line description.
+        samples: (sample name, labels, value) triples.
+    """
+
+    def __init__(self, name: str, kind: str, help_text: str):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.samples: list[tuple[str, dict, float]] = []
+
+    def add(self, value: float, **labels) -> "MetricFamily":
+        """
+        Adds a sample.
+        :param value: The value.
+        :param labels: The sample's labels.
+        :return: The family, so calls can be chained.
+        """
+        self.samples.append((self.name, labels, value))
+        return self
+
+    def add_histogram(self, histogram, **labels) -> "MetricFamily":
+        """
+        Adds the bucket, sum and count samples of a histogram.
+        :param histogram: An ``asdana.core.metrics.Histogram``.
+        :param labels: The histogram's labels.
+        :return: The family, so calls can be chained.
+        """
+        for bound, count in histogram.cumulative():
+            self.samples.append(
+                (f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, count)
+            )
+        self.samples.append((f"{self.name}_sum", labels, histogram.total))
+        self.samples.append((f"{self.name}_count", labels, histogram.count))
+        return self
+
+    def render(self) -> str:
+        """
+        Formats the family in the text exposition format.
+        """
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(
+            f"{name}{_format_labels(labels)} {_format_value(value)}"
+            for name, labels, value in self.samples
+        )
+        return "\n".join(lines)
+
+
+def render(families: Iterable[MetricFamily]) -> str:
+    """
+    Formats metric families in the text exposition format.
+    :param families: The families.
+    :return: The exposition, ending with a newline.
+    """
+    return "\n".join(family.render() for family in families) + "\n"
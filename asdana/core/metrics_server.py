@@ -0,0 +1,308 @@
+"""
+Metrics and health endpoints for the Asdana bot.
+
+An optional aiohttp server, started next to the bot, serves:
+
+- ``/metrics``: gauges, counters and histograms in the Prometheus text
+  exposition format, collected from the bot when scraped;
+- ``/healthz``: 200 while the process and its event loop are responsive;
+- ``/readyz``: 200 once every shard of the process is connected and ready,
+  503 otherwise, so an orchestrator only routes to or waits for ready bots;
+- ``/traces``: the kept traces as JSON, in the OTLP/JSON shape with
+  ``?format=otlp`` (see ``asdana.core.tracing``). Traces hold command names,
+  guild IDs and SQL statements, so this is only served when a token is set,
+  and only to requests that send it as a bearer token.
+
+Cogs can add their own metrics by defining ``collect_metrics()``, returning
+a list of ``MetricFamily``.
+"""
+
+import hmac
+import logging
+import math
+from typing import Optional
+
+import psutil
+from aiohttp import web
+
+from asdana.core.metrics import PHASES, MetricFamily, render
+from asdana.core.tracing import get_tracer
+from asdana.database.database import get_database
+
+logger = logging.getLogger(__name__)
+
+# Default configuration constants
+DEFAULT_HOST = "127.0.0.1"  # loopback; scrapers on other hosts need it opened
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _gateway_metrics(bot) -> list[MetricFamily]:
+    latency = MetricFamily(
+        "asdana_gateway_latency_seconds", "gauge", "Heartbeat latency per shard."
+    )
+    for shard_id, seconds in getattr(bot, "latencies", []):
+        if not math.isinf(seconds):
+            latency.add(seconds, shard=shard_id)
+
+    events = MetricFamily(
+        "asdana_gateway_events_total", "counter", "Events dispatched per shard."
+    )
+    rate = MetricFamily(
+        "asdana_gateway_event_rate", "gauge", "Events per second per shard."
+    )
+    connects = MetricFamily(
+        "asdana_gateway_connects_total", "counter", "Gateway connections per shard."
+    )
+    disconnects = MetricFamily(
+        "asdana_gateway_disconnects_total", "counter", "Lost connections per shard."
+    )
+    resumes = MetricFamily(
+        "asdana_gateway_resumes_total", "counter", "Resumed sessions per shard."
+    )
+    ready = MetricFamily(
+        "asdana_shard_ready", "gauge", "Whether each shard is connected and ready."
+    )
+    for shard_id, stats in sorted(bot.shard_metrics.stats.items()):
+        events.add(stats.events, shard=shard_id)
+        rate.add(stats.event_rate(), shard=shard_id)
+        connects.add(stats.connects, shard=shard_id)
+        disconnects.add(stats.disconnects, shard=shard_id)
+        resumes.add(stats.resumes, shard=shard_id)
+        ready.add(int(stats.ready), shard=shard_id)
+    return [latency, events, rate, connects, disconnects, resumes, ready]
+
+
+def _command_metrics(bot) -> list[MetricFamily]:
+    metrics = bot.command_metrics
+    duration = MetricFamily(
+        "asdana_command_duration_seconds", "histogram", "Command latency."
+    )
+    for (command, cog, outcome), histogram in sorted(metrics.latencies.items()):
+        duration.add_histogram(histogram, command=command, cog=cog, outcome=outcome)
+
+    phases = MetricFamily(
+        "asdana_command_phase_seconds",
+        "histogram",
+        f"Command time per phase ({', '.join(PHASES)}).",
+    )
+    for (command, phase), histogram in sorted(metrics.phases.items()):
+        phases.add_histogram(histogram, command=command, phase=phase)
+
+    refused = MetricFamily(
+        "asdana_command_refusals_total",
+        "counter",
+        "Commands refused before running, by error.",
+    )
+    for (command, cog, error), count in sorted(metrics.rejections.items()):
+        refused.add(count, command=command, cog=cog, error=error)
+    return [duration, phases, refused]
+
+
+def _query_metrics(bot) -> list[MetricFamily]:
+    metrics = getattr(bot, "query_metrics", None)
+    if metrics is None:
+        return []
+    statements = MetricFamily(
+        "asdana_db_statements_per_invocation",
+        "histogram",
+        "SQL statements per command invocation or listener event.",
+    )
+    round_trips = MetricFamily(
+        "asdana_db_round_trips_per_invocation",
+        "histogram",
+        "Database round trips per command invocation or listener event.",
+    )
+    over_budget = MetricFamily(
+        "asdana_db_query_budget_exceeded_total",
+        "counter",
+        "Invocations that ran more statements than the query budget.",
+    )
+    for (kind, name), histogram in sorted(metrics.statements.items()):
+        statements.add_histogram(histogram, kind=kind, name=name)
+        round_trips.add_histogram(metrics.round_trips[kind, name], kind=kind, name=name)
+        over_budget.add(metrics.over_budget.get((kind, name), 0), kind=kind, name=name)
+    return [statements, round_trips, over_budget]
+
+
+def _database_metrics() -> list[MetricFamily]:
+    pool = MetricFamily(
+        "asdana_db_pool_connections", "gauge", "Database pool connections by state."
+    )
+    status = get_database().pool_status()
+    for state, count in (status or {}).items():
+        pool.add(count, state=state)
+    return [pool]
+
+
+def _cache_metrics(bot) -> list[MetricFamily]:
+    cached = MetricFamily(
+        "asdana_discord_cache_items", "gauge", "Objects in discord.py's caches."
+    )
+    cached.add(len(bot.guilds), cache="guilds")
+    cached.add(len(bot.users), cache="users")
+    cached.add(len(bot.cached_messages), cache="messages")
+    return [cached]
+
+
+def _monitor_metrics(bot) -> list[MetricFamily]:
+    monitor = getattr(bot, "monitor", None)
+    if monitor is None:
+        return []
+    families = [
+        MetricFamily(
+            "asdana_event_loop_lag_seconds", "histogram", "Event loop lag."
+        ).add_histogram(monitor.lag)
+    ]
+    pauses = MetricFamily(
+        "asdana_gc_pause_seconds", "histogram", "Garbage collector pauses."
+    )
+    for generation, histogram in enumerate(monitor.gc_pauses):
+        pauses.add_histogram(histogram, generation=generation)
+    families.append(pauses)
+    if monitor.resources:
+        last = monitor.resources[-1]
+        families.append(
+            MetricFamily("process_threads", "gauge", "Threads in the process.").add(
+                last.threads
+            )
+        )
+        if last.open_fds is not None:
+            families.append(
+                MetricFamily("process_open_fds", "gauge", "Open file descriptors.").add(
+                    last.open_fds
+                )
+            )
+    return families
+
+
+def _process_metrics(process: psutil.Process) -> list[MetricFamily]:
+    with process.oneshot():
+        memory = process.memory_info()
+        cpu = process.cpu_times()
+    return [
+        MetricFamily(
+            "process_resident_memory_bytes", "gauge", "Resident memory size."
+        ).add(memory.rss),
+        MetricFamily(
+            "process_cpu_seconds_total", "counter", "User and system CPU time."
+        ).add(cpu.user + cpu.system),
+    ]
+
+
+def collect(bot, process: Optional[psutil.Process] = None) -> list[MetricFamily]:
+    """
+    Collects every metric of the bot and its process.
+    :param bot: The bot.
+    :param process: The process to report on; defaults to this one.
+    :return: The metric families.
+    """
+    families = [
+        *_gateway_metrics(bot),
+        *_command_metrics(bot),
+        *_query_metrics(bot),
+        *_database_metrics(),
+        *_cache_metrics(bot),
+        *_monitor_metrics(bot),
+        *_process_metrics(process or psutil.Process()),
+    ]
+    for cog in bot.cogs.values():
+        collect_metrics = getattr(cog, "collect_metrics", None)
+        if collect_metrics is not None:
+            families.extend(collect_metrics())
+    return families
+
+
+class MetricsServer:
+    """
+    Serves the metrics and health endpoints of a bot.
+
+    Attributes:
+        bot: The bot.
+        host: Address to listen on.
+        port: Port to listen on.
+        traces_token: Bearer token ``/traces`` requires; not served without.
+    """
+
+    def __init__(
+        self,
+        bot,
+        port: int,
+        host: str = DEFAULT_HOST,
+        traces_token: Optional[str] = None,
+    ):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.traces_token = traces_token
+        self._process = psutil.Process()
+        self._runner: Optional[web.AppRunner] = None
+
+    def build_app(self) -> web.Application:
+        """
+        Builds the web application with the endpoints' routes.
+        """
+        app = web.Application()
+        app.router.add_get("/metrics", self.metrics)
+        app.router.add_get("/healthz", self.healthz)
+        app.router.add_get("/readyz", self.readyz)
+        if self.traces_token:
+            app.router.add_get("/traces", self.traces)
+        return app
+
+    async def metrics(self, _request: web.Request) -> web.Response:
+        """
+        Serves the metrics in the Prometheus text format.
+        """
+        body = render(collect(self.bot, self._process))
+        return web.Response(body=body.encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def healthz(self, _request: web.Request) -> web.Response:
+        """
+        Answers while the event loop runs and the bot is not closed.
+        """
+        if self.bot.is_closed():
+            return web.Response(status=503, text="closed\n")
+        return web.Response(text="ok\n")
+
+    async def readyz(self, _request: web.Request) -> web.Response:
+        """
+        Answers once every shard of the process is ready.
+        """
+        if self.bot.is_closed() or not self.bot.is_ready():
+            return web.Response(status=503, text="not ready\n")
+        return web.Response(text="ready\n")
+
+    async def traces(self, request: web.Request) -> web.Response:
+        """
+        Serves the kept traces as JSON to requests with the bearer token.
+        """
+        sent = request.headers.get("Authorization", "").encode()
+        expected = f"Bearer {self.traces_token}".encode()
+        if not hmac.compare_digest(sent, expected):
+            return web.Response(
+                status=401,
+                text="unauthorized\n",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        document = get_tracer().export(
+            otlp=request.query.get("format") == "otlp",
+            slow_only="slow" in request.query,
+        )
+        return web.Response(text=document, content_type="application/json")
+
+    async def start(self) -> None:
+        """
+        Starts listening.
+        """
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info("Serving metrics on http://%s:%d/metrics.", self.host, self.port)
+
+    async def stop(self) -> None:
+        """
+        Stops listening.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,215 @@
+"""
+Event loop and process resource monitor for the Asdana bot.
+
+Missed gateway heartbeats and slow replies usually come from something
+blocking the event loop. ``ResourceMonitor`` runs a task that sleeps for a
+fixed interval and measures how late it wakes up: that delay is the loop lag
+every other coroutine saw at the same time. Alongside it, the process's memory,
+CPU, open file descriptors and threads are sampled with psutil, and garbage
+collector pauses are timed through ``gc.callbacks``, since a long collection
+is a common cause of lag.
+"""
+
+import asyncio
+import gc
+import logging
+import time
+from collections import deque
+from contextlib import suppress
+from typing import Optional
+
+import psutil
+
+from asdana.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Default configuration constants
+DEFAULT_INTERVAL = 0.5  # seconds between loop lag samples
+DEFAULT_LAG_THRESHOLD = 0.25  # seconds of lag that are logged as a warning
+DEFAULT_RESOURCE_INTERVAL = 10.0  # seconds between resource samples
+DEFAULT_HISTORY = 120  # samples kept for recent percentiles
+
+
+class ResourceSample:  # pylint: disable=too-few-public-methods
+    """
+    One reading of the process's resources.
+
+    Attributes:
+        time: When it was taken, as a Unix timestamp.
+        rss: Resident memory in bytes.
+        cpu_percent: CPU use since the previous sample, in percent of a core.
+        open_fds: Open file descriptors, or None where not supported.
+        threads: Number of threads.
+    """
+
+    def __init__(self, process: psutil.Process):
+        with process.oneshot():
+            self.time = time.time()
+            self.rss = process.memory_info().rss
+            self.cpu_percent = process.cpu_percent(None)
+            self.open_fds = process.num_fds() if hasattr(process, "num_fds") else None
+            self.threads = process.num_threads()
+
+
+class ResourceMonitor:  # pylint: disable=too-many-instance-attributes
+    """
+    Samples event loop lag, process resources and garbage collector pauses.
+
+    Attributes:
+        interval: Seconds between loop lag samples.
+        lag_threshold: Lag in seconds above which a warning is logged.
+        resource_interval: Seconds between resource samples.
+        lag: Histogram of every lag sample.
+        recent_lag: The most recent lag samples, in seconds.
+        resources: The most recent resource samples.
+        gc_pauses: Histogram of collection pauses per generation.
+        warnings: Number of lag warnings logged.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        lag_threshold: float = DEFAULT_LAG_THRESHOLD,
+        resource_interval: float = DEFAULT_RESOURCE_INTERVAL,
+        history: int = DEFAULT_HISTORY,
+    ):
+        self.interval = interval
+        self.lag_threshold = lag_threshold
+        self.resource_interval = resource_interval
+        self.lag = Histogram()
+        self.recent_lag: deque[float] = deque(maxlen=history)
+        self.resources: deque[ResourceSample] = deque(maxlen=history)
+        self.gc_pauses = [Histogram() for _ in range(3)]
+        self.warnings = 0
+        self._process = psutil.Process()
+        self._task: Optional[asyncio.Task] = None
+        self._gc_started: Optional[float] = None
+        self._gc_pause_since_tick = 0.0
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the sampling task is running.
+        """
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Starts sampling. Must be called from the event loop.
+        """
+        if self.running:
+            return
+        gc.callbacks.append(self._on_gc)
+        self.sample_resources()  # Primes the CPU percentage
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops sampling.
+        """
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    def _on_gc(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            pause = time.perf_counter() - self._gc_started
+            self._gc_started = None
+            self.gc_pauses[info["generation"]].observe(pause)
+            self._gc_pause_since_tick += pause
+
+    def sample_resources(self) -> ResourceSample:
+        """
+        Takes a resource sample and keeps it.
+        :return: The sample.
+        """
+        sample = ResourceSample(self._process)
+        self.resources.append(sample)
+        return sample
+
+    def record_lag(self, lag: float) -> None:
+        """
+        Records a loop lag sample, warning if it is above the threshold.
+        :param lag: The lag in seconds.
+        """
+        self.lag.observe(lag)
+        self.recent_lag.append(lag)
+        gc_pause, self._gc_pause_since_tick = self._gc_pause_since_tick, 0.0
+        if lag < self.lag_threshold:
+            return
+        self.warnings += 1
+        last = self.resources[-1] if self.resources else None
+        logger.warning(
+            "Event loop lagged %.0f ms (threshold %.0f ms); %d tasks, "
+            "%.0f ms in GC since the last sample, RSS %.1f MB, CPU %.0f%%.",
+            lag * 1000,
+            self.lag_threshold * 1000,
+            len(asyncio.all_tasks()),
+            gc_pause * 1000,
+            last.rss / 2**20 if last else 0.0,
+            last.cpu_percent if last else 0.0,
+        )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_resources = loop.time() + self.resource_interval
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self.record_lag(max(0.0, now - expected))
+            if now >= next_resources:
+                self.sample_resources()
+                next_resources = now + self.resource_interval
+
+    def recent_lag_percentile(self, fraction: float) -> float:
+        """
+        A percentile of the recent lag samples, in seconds.
+        :param fraction: The percentile as a fraction, e.g. 0.99.
+        """
+        if not self.recent_lag:
+            return 0.0
+        ordered = sorted(self.recent_lag)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def format_report(self) -> str:
+        """
+        Summarizes loop lag, resources and GC activity.
+        :return: The report.
+        """
+        window = len(self.recent_lag) * self.interval
+        lines = [
+            f"loop lag (last {window:.0f} s): "
+            f"p50 {self.recent_lag_percentile(0.5) * 1000:.1f} ms, "
+            f"p99 {self.recent_lag_percentile(0.99) * 1000:.1f} ms, "
+            f"max {max(self.recent_lag, default=0.0) * 1000:.1f} ms",
+            f"loop lag (all time): max {self.lag.maximum * 1000:.1f} ms over "
+            f"{self.lag.count} samples, {self.warnings} above "
+            f"{self.lag_threshold * 1000:.0f} ms",
+        ]
+        if self.resources:
+            last = self.resources[-1]
+            peak = max(sample.rss for sample in self.resources)
+            lines.append(
+                f"memory: {last.rss / 2**20:.1f} MB RSS "
+                f"(peak {peak / 2**20:.1f} MB), CPU {last.cpu_percent:.0f}%, "
+                f"{last.threads} threads, "
+                f"{'-' if last.open_fds is None else last.open_fds} open files"
+            )
+        counts = gc.get_count()
+        for generation, pauses in enumerate(self.gc_pauses):
+            lines.append(
+                f"gc gen {generation}: {pauses.count} collections, "
+                f"mean {pauses.mean() * 1000:.2f} ms, "
+                f"max {pauses.maximum * 1000:.2f} ms, "
+                f"{counts[generation]} pending"
+            )
+        return "\n".join(lines)
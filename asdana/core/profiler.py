@@ -0,0 +1,195 @@
+"""
+On-demand CPU profiling of the running bot.
+
+Two profilers can be started from the ``Dev`` cog for a limited time:
+
+- ``sampling`` samples the event loop thread's stack from a helper thread at
+  a fixed interval. The bot's code runs untouched, so the overhead stays low
+  enough for production load. The result is in the collapsed stack format
+  (one ``frame;frame;frame count`` line per stack) that ``flamegraph.pl``,
+  speedscope and similar tools read.
+- ``cprofile`` records every function call on the event loop thread with
+  ``cProfile``. It is exact but slows the bot down noticeably. The result is
+  a pstats file for ``python -m pstats``, snakeviz or ``gprof2dot``.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+from collections import Counter
+from typing import Optional
+
+from asdana.core.watchdog import Frame, thread_stack
+
+# Default configuration constants
+DEFAULT_DURATION = 30  # seconds a profile runs unless stopped earlier
+MAX_DURATION = 300  # longest profile that can be requested, in seconds
+DEFAULT_SAMPLE_INTERVAL = 0.01  # seconds between stack samples
+DEFAULT_STACK_DEPTH = 64  # innermost frames kept per sample
+
+SAMPLING = "sampling"
+CPROFILE = "cprofile"
+
+
+def _collapsed_frame(frame: Frame) -> str:
+    filename, lineno, function = frame
+    # Semicolons separate frames in the collapsed format
+    return f"{function} ({filename}:{lineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    Counts the stacks of the event loop thread, sampled from a helper thread.
+
+    Attributes:
+        interval: Seconds between samples.
+        stacks: Samples per stack, outermost frame first.
+    """
+
+    mode = SAMPLING
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        stack_depth: int = DEFAULT_STACK_DEPTH,
+    ):
+        self.interval = interval
+        self.stack_depth = stack_depth
+        self.stacks: Counter[tuple[Frame, ...]] = Counter()
+        self._target: Optional[int] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the profiler is sampling.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Starts sampling the calling thread, i.e. the event loop's.
+        """
+        self._target = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._sample, name="asdana-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops sampling.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            stack = thread_stack(self._target, self.stack_depth)
+            if stack:
+                self.stacks[stack] += 1
+
+    def summary(self, limit: int = 10) -> str:
+        """
+        Lists the functions that were running in most samples.
+        :param limit: Number of functions.
+        :return: The summary.
+        """
+        total = sum(self.stacks.values())
+        own: Counter[Frame] = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+        lines = [f"{total} samples every {self.interval * 1000:.0f} ms"]
+        lines.extend(
+            f"{count / total:>6.1%}  {_collapsed_frame(frame)}"
+            for frame, count in own.most_common(limit)
+        )
+        return "\n".join(lines)
+
+    def result(self) -> tuple[str, bytes]:
+        """
+        Formats the samples as collapsed stacks.
+        :return: (file name, file contents).
+        """
+        lines = (
+            ";".join(_collapsed_frame(frame) for frame in stack) + f" {count}"
+            for stack, count in self.stacks.most_common()
+        )
+        return "profile.collapsed.txt", "\n".join(lines).encode() + b"\n"
+
+
+class CProfileProfiler:
+    """
+    Records every call on the event loop thread with cProfile.
+    """
+
+    mode = CPROFILE
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the profiler is recording.
+        """
+        return self._running
+
+    def start(self) -> None:
+        """
+        Starts recording calls on the calling thread, i.e. the event loop's.
+        :raises ValueError: If another profiler is already active.
+        """
+        self._profile.enable()
+        self._running = True
+
+    def stop(self) -> None:
+        """
+        Stops recording.
+        """
+        self._profile.disable()
+        self._running = False
+
+    def summary(self, limit: int = 10) -> str:
+        """
+        Lists the functions with the most cumulative time.
+        :param limit: Number of functions.
+        :return: The summary.
+        """
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        return stream.getvalue().strip()
+
+    def result(self) -> tuple[str, bytes]:
+        """
+        Formats the calls as a pstats file, as ``Stats.dump_stats`` writes it.
+        :return: (file name, file contents).
+        """
+        self._profile.create_stats()
+        return "profile.pstats", marshal.dumps(self._profile.stats)
+
+
+PROFILERS = {SAMPLING: SamplingProfiler, CPROFILE: CProfileProfiler}
+
+
+def create_profiler(mode: str):
+    """
+    Creates a profiler.
+    :param mode: ``sampling`` or ``cprofile``.
+    :return: The profiler, not yet started.
+    :raises ValueError: If the mode is unknown.
+    """
+    if mode not in PROFILERS:
+        raise ValueError(
+            f"Unknown profiling mode {mode!r}; expected one of "
+            f"{', '.join(PROFILERS)}."
+        )
+    return PROFILERS[mode]()
@@ -0,0 +1,188 @@
+"""
+Query counting for the Asdana bot.
+
+Each command invocation and each listener event counts the SQL statements it
+runs and the database round trips they take (statements plus transaction
+control: BEGIN, COMMIT and ROLLBACK). The database engine reports every
+statement to the counters active in the current context, the same way it
+charges query time to the running command's timer. Counts above the budget
+are logged with the statements that were run, so N+1 patterns show up as
+soon as they ship; ``assert_query_budget`` holds tests to a budget too.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from asdana.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Default configuration constants
+DEFAULT_BUDGET = 5  # statements per command or event before it is flagged
+MAX_RECORDED_STATEMENTS = 20  # statements kept per counter for reports
+
+# Upper bounds of the statement count buckets
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Kinds of work that are counted
+COMMAND = "command"
+EVENT = "event"
+
+_active_counters: ContextVar[tuple["QueryCounter", ...]] = ContextVar(
+    "query_counters", default=()
+)
+
+
+class QueryCounter:  # pylint: disable=too-few-public-methods
+    """
+    Counts the statements run while it is active.
+
+    Attributes:
+        statements: SQL statements run.
+        round_trips: Statements plus transaction control commands.
+        recorded: The first statements run, for reports.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.round_trips = 0
+        self.recorded: list[str] = []
+
+    def format_statements(self) -> str:
+        """
+        Lists the recorded statements, one per line.
+        """
+        lines = [f"  {statement}" for statement in self.recorded]
+        if self.statements > len(self.recorded):
+            lines.append(f"  ... and {self.statements - len(self.recorded)} more")
+        return "\n".join(lines)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Context manager that counts the statements run within it, including in
+    tasks it creates. Counters nest: an outer counter also counts what an
+    inner one does.
+    :return: The counter.
+    """
+    counter = QueryCounter()
+    token = _active_counters.set(_active_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active_counters.reset(token)
+
+
+def record_statement(statement: str) -> None:
+    """
+    Counts a statement for every active counter.
+    :param statement: The SQL statement.
+    """
+    for counter in _active_counters.get():
+        counter.statements += 1
+        counter.round_trips += 1
+        if len(counter.recorded) < MAX_RECORDED_STATEMENTS:
+            counter.recorded.append(" ".join(statement.split()))
+
+
+def record_round_trip() -> None:
+    """
+    Counts a transaction control round trip for every active counter.
+    """
+    for counter in _active_counters.get():
+        counter.round_trips += 1
+
+
+@contextmanager
+def assert_query_budget(
+    statements: int, round_trips: Optional[int] = None
+) -> Iterator[QueryCounter]:
+    """
+    Context manager for tests that fails if the code within it runs more
+    statements or round trips than allowed.
+    :param statements: Most statements allowed.
+    :param round_trips: Most round trips allowed; not checked without it.
+    :return: The counter.
+    :raises AssertionError: If the budget was exceeded.
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.statements > statements:
+        raise AssertionError(
+            f"Ran {counter.statements} statements, over the budget of "
+            f"{statements}:\n{counter.format_statements()}"
+        )
+    if round_trips is not None and counter.round_trips > round_trips:
+        raise AssertionError(
+            f"Took {counter.round_trips} round trips, over the budget of "
+            f"{round_trips}:\n{counter.format_statements()}"
+        )
+
+
+class QueryMetrics:
+    """
+    Statement counts of every command and listener event.
+
+    Attributes:
+        budget: Statements per invocation above which it is flagged.
+        statements: Statements per invocation by (kind, name).
+        round_trips: Round trips per invocation by (kind, name).
+        over_budget: Invocations over the budget by (kind, name).
+    """
+
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        self.budget = budget
+        self.statements: dict[tuple[str, str], Histogram] = {}
+        self.round_trips: dict[tuple[str, str], Histogram] = {}
+        self.over_budget: dict[tuple[str, str], int] = {}
+
+    def record(self, kind: str, name: str, counter: QueryCounter) -> None:
+        """
+        Records the counts of a finished invocation, logging it if it went
+        over the budget.
+        :param kind: ``COMMAND`` or ``EVENT``.
+        :param name: The command's qualified name or the event's name.
+        :param counter: The invocation's counter.
+        """
+        key = (kind, name)
+        if key not in self.statements:
+            self.statements[key] = Histogram(COUNT_BUCKETS)
+            self.round_trips[key] = Histogram(COUNT_BUCKETS)
+        self.statements[key].observe(counter.statements)
+        self.round_trips[key].observe(counter.round_trips)
+        if counter.statements > self.budget:
+            self.over_budget[key] = self.over_budget.get(key, 0) + 1
+            logger.warning(
+                "The %s %s ran %d statements in %d round trips, over the budget "
+                "of %d:\n%s",
+                kind,
+                name,
+                counter.statements,
+                counter.round_trips,
+                self.budget,
+                counter.format_statements(),
+            )
+
+    def format_report(self) -> str:
+        """
+        Lists the mean and most statements and round trips per invocation.
+        :return: The report.
+        """
+        lines = [
+            f"{'kind':<8} {'name':<24} {'count':>6} {'stmts':>6} {'max':>4} "
+            f"{'trips':>6} {'max':>4} {'over':>5}"
+        ]
+        for key, histogram in sorted(
+            self.statements.items(), key=lambda item: -item[1].mean()
+        ):
+            trips = self.round_trips[key]
+            lines.append(
+                f"{key[0]:<8} {key[1]:<24} {histogram.count:>6} "
+                f"{histogram.mean():>6.1f} {histogram.maximum:>4.0f} "
+                f"{trips.mean():>6.1f} {trips.maximum:>4.0f} "
+                f"{self.over_budget.get(key, 0):>5}"
+            )
+        return "\n".join(lines)
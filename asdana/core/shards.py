@@ -0,0 +1,216 @@
+"""
+Shard bookkeeping for the Asdana bot.
+
+Discord routes every guild to shard ``(guild_id >> 22) % shard_count`` and
+direct messages to shard 0. ``ShardMetrics`` uses the same rule to attribute
+dispatched events to shards and keeps per-shard event rates and connection
+counters next to the latencies discord.py already tracks, so a hot or
+flapping shard can be told apart from a slow one.
+"""
+
+import time
+from typing import Optional
+
+import discord
+
+# Default configuration constants
+DEFAULT_RATE_WINDOW = 60.0  # seconds
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """
+    Returns the shard Discord routes a guild's events to.
+    :param guild_id: The guild ID.
+    :param shard_count: Total number of shards.
+    :return: The shard ID.
+    """
+    return (guild_id >> 22) % shard_count
+
+
+def event_guild_id(args: tuple) -> Optional[int]:
+    """
+    Finds the guild an event belongs to from its first argument.
+    :param args: The arguments the event was dispatched with.
+    :return: The guild ID, or None for events outside guilds.
+    """
+    if not args:
+        return None
+    subject = args[0]
+    if isinstance(subject, discord.Guild):
+        return subject.id
+    guild_id = getattr(subject, "guild_id", None)
+    if guild_id is None:
+        guild_id = getattr(getattr(subject, "guild", None), "id", None)
+    return guild_id if isinstance(guild_id, int) else None
+
+
+def owns_shard_zero(bot) -> bool:
+    """
+    Whether this process runs shard 0. Work that must happen once across all
+    processes, such as database maintenance, runs only there.
+    :param bot: The bot.
+    :return: True if shard 0 is among the bot's shards.
+    """
+    shard_ids = getattr(bot, "shard_ids", None)
+    return shard_ids is None or 0 in shard_ids
+
+
+class ShardStats:  # pylint: disable=too-many-instance-attributes
+    """
+    Counters for one shard.
+
+    Attributes:
+        shard_id: The shard ID.
+        events: Events dispatched for the shard since startup.
+        connects: Times the shard connected to the gateway.
+        disconnects: Times the shard lost its connection.
+        resumes: Times the shard resumed a session.
+        ready: Whether the shard has received its guilds.
+        last_connected: When the shard last connected, as a Unix timestamp.
+    """
+
+    def __init__(self, shard_id: int):
+        self.shard_id = shard_id
+        self.events = 0
+        self.connects = 0
+        self.disconnects = 0
+        self.resumes = 0
+        self.ready = False
+        self.last_connected: Optional[float] = None
+        self._window_started = time.monotonic()
+        self._window_events = 0
+        self._last_rate: Optional[float] = None
+
+    def record_event(self, window: float) -> None:
+        """
+        Counts one event, closing the rate window once it has elapsed.
+        :param window: Length of a rate window in seconds.
+        """
+        now = time.monotonic()
+        elapsed = now - self._window_started
+        if elapsed >= window:
+            self._last_rate = self._window_events / elapsed
+            self._window_started = now
+            self._window_events = 0
+        self.events += 1
+        self._window_events += 1
+
+    def event_rate(self) -> float:
+        """
+        Events per second over the last full window, or over the current one
+        until a window has completed.
+        """
+        if self._last_rate is not None:
+            return self._last_rate
+        elapsed = time.monotonic() - self._window_started
+        return self._window_events / elapsed if elapsed > 0 else 0.0
+
+
+class ShardMetrics:
+    """
+    Per-shard event rates and connection counters.
+
+    Attributes:
+        window: Length of the window event rates are measured over, in seconds.
+        shard_count: Total number of shards, once known.
+        stats: Counters for each shard seen so far.
+    """
+
+    def __init__(self, window: float = DEFAULT_RATE_WINDOW):
+        self.window = window
+        self.shard_count: Optional[int] = None
+        self.stats: dict[int, ShardStats] = {}
+
+    def shard(self, shard_id: int) -> ShardStats:
+        """
+        Returns the counters for a shard, creating them on first use.
+        :param shard_id: The shard ID.
+        :return: The shard's counters.
+        """
+        stats = self.stats.get(shard_id)
+        if stats is None:
+            stats = self.stats[shard_id] = ShardStats(shard_id)
+        return stats
+
+    def shard_for_event(self, event_name: str, args: tuple) -> int:
+        """
+        Works out which shard an event arrived on.
+        :param event_name: The event name, without the ``on_`` prefix.
+        :param args: The arguments the event was dispatched with.
+        :return: The shard ID.
+        """
+        if event_name.startswith("shard_") and args and isinstance(args[0], int):
+            return args[0]
+        guild_id = event_guild_id(args)
+        if guild_id is None or not self.shard_count:
+            return 0
+        return shard_for_guild(guild_id, self.shard_count)
+
+    def record_event(self, event_name: str, args: tuple) -> None:
+        """
+        Counts a dispatched event against its shard.
+        :param event_name: The event name, without the ``on_`` prefix.
+        :param args: The arguments the event was dispatched with.
+        """
+        self.shard(self.shard_for_event(event_name, args)).record_event(self.window)
+
+    def record_connect(self, shard_id: int) -> None:
+        """
+        Records a shard connecting to the gateway.
+        :param shard_id: The shard ID.
+        """
+        stats = self.shard(shard_id)
+        stats.connects += 1
+        stats.last_connected = time.time()
+
+    def record_disconnect(self, shard_id: int) -> None:
+        """
+        Records a shard losing its gateway connection.
+        :param shard_id: The shard ID.
+        """
+        stats = self.shard(shard_id)
+        stats.disconnects += 1
+        stats.ready = False
+
+    def record_resume(self, shard_id: int) -> None:
+        """
+        Records a shard resuming its session.
+        :param shard_id: The shard ID.
+        """
+        stats = self.shard(shard_id)
+        stats.resumes += 1
+        stats.ready = True
+
+    def record_ready(self, shard_id: int) -> None:
+        """
+        Records a shard receiving all of its guilds.
+        :param shard_id: The shard ID.
+        """
+        self.shard(shard_id).ready = True
+
+    def format_report(self, latencies: list[tuple[int, float]]) -> str:
+        """
+        Formats the counters and latencies of every shard as a table.
+        :param latencies: (shard ID, heartbeat latency in seconds) pairs.
+        :return: The report.
+        """
+        latency_of = dict(latencies)
+        lines = [
+            f"{'shard':>5} {'latency':>10} {'events/s':>9} {'events':>9} "
+            f"{'conn':>5} {'disc':>5} {'resume':>6}  status"
+        ]
+        for shard_id in sorted(set(latency_of) | set(self.stats)):
+            stats = self.shard(shard_id)
+            latency = latency_of.get(shard_id)
+            # discord.py reports inf until the first heartbeat is acknowledged
+            shown = (
+                f"{latency * 1000:>7.0f} ms"
+                if latency is not None and latency != float("inf")
+                else f"{'-':>10}"
+            )
+            lines.append(
+                f"{shard_id:>5} {shown} {stats.event_rate():>9.1f} {stats.events:>9} "
+                f"{stats.connects:>5} {stats.disconnects:>5} {stats.resumes:>6}  "
+                f"{'ready' if stats.ready else 'not ready'}"
+            )
+        return "\n".join(lines)
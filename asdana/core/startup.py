@@ -0,0 +1,101 @@
+"""
+Startup timing for the Asdana bot.
+
+Cog packages are imported ahead of registration on a worker thread, started
+before the bot sets up its database and logs in, so slow imports (e.g.
+``googleapiclient``) overlap that network I/O instead of following it.
+Imports run one after another on that single thread: they are CPU-bound and
+hold the GIL, so spreading them over several threads only adds contention.
+Registration itself happens afterwards on the event loop in a fixed order. The time spent
+importing and setting up each cog, and the time from process start until the
+bot is ready, are collected here and logged as a startup report.
+"""
+
+import importlib
+import logging
+import time
+from typing import Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Cogs whose import and setup together take longer than this are flagged
+SLOW_COG_THRESHOLD = 1.0  # seconds
+
+
+class CogTiming:  # pylint: disable=too-few-public-methods
+    """
+    Time spent loading one cog.
+
+    Attributes:
+        module_path: Import path of the cog package.
+        import_time: Seconds spent pre-importing the package.
+        setup_time: Seconds spent registering it with the bot.
+        error: Why the cog failed to load, if it did.
+    """
+
+    def __init__(self, module_path: str):
+        self.module_path = module_path
+        self.import_time = 0.0
+        self.setup_time = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def total(self) -> float:
+        """
+        Seconds spent importing and setting up the cog.
+        """
+        return self.import_time + self.setup_time
+
+
+def preimport(timings: list[CogTiming]) -> None:
+    """
+    Imports cog packages in order and records how long each took.
+    Meant to run on a worker thread. Failures are only logged here; loading
+    the extension afterwards reports them properly.
+    :param timings: Timing records of the cogs to import; ``import_time`` is
+        filled in on each.
+    """
+    for timing in timings:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(timing.module_path)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.debug("Pre-import of %s failed: %s", timing.module_path, e)
+        timing.import_time = time.perf_counter() - started
+
+
+def process_uptime() -> float:
+    """
+    Seconds since the current process started.
+    """
+    return time.time() - psutil.Process().create_time()
+
+
+def format_startup_report(
+    timings: list[CogTiming], cogs_time: float, ready_time: Optional[float] = None
+) -> str:
+    """
+    Formats per-cog timings as a table, slowest first.
+    :param timings: Timing records of every cog.
+    :param cogs_time: Wall-clock seconds spent loading all cogs.
+    :param ready_time: Seconds from process start until the bot was ready.
+    :return: The report.
+    """
+    lines = [f"{'cog':<28} {'import':>9} {'setup':>9}  status"]
+    for timing in sorted(timings, key=lambda item: item.total, reverse=True):
+        if timing.error:
+            status = f"failed: {timing.error}"
+        elif timing.total > SLOW_COG_THRESHOLD:
+            status = "slow"
+        else:
+            status = "ok"
+        lines.append(
+            f"{timing.module_path:<28} {timing.import_time * 1000:>6.0f} ms "
+            f"{timing.setup_time * 1000:>6.0f} ms  {status}"
+        )
+    lines.append(f"Loaded {len(timings)} cogs in {cogs_time * 1000:.0f} ms.")
+    if ready_time is not None:
+        lines.append(f"Ready {ready_time:.2f} s after process start.")
+    return "\n".join(lines)
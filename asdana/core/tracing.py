@@ -0,0 +1,355 @@
+"""
+In-process tracing for the Asdana bot.
+
+Histograms show how slow commands are overall; a trace shows where one slow
+invocation spent its time. Each command invocation opens a root span, and
+the layers below open child spans for the work done on its behalf: database
+sessions and SQL statements, YouTube API calls, outbound HTTP requests and
+Discord REST calls. The current span is held in a context variable, so it
+follows the command into awaited coroutines and tasks it creates without
+being passed around. Those layers only open spans inside a trace; work done
+outside a command is not traced.
+
+Finished traces are tail-sampled: whether a trace is kept is decided when it
+ends, so every slow or failed trace is kept and only a small random sample
+of the others. Both are held in bounded ring buffers, and can be exported as
+JSON, either in a plain shape or in the OTLP/JSON shape that OpenTelemetry
+tools import, without running a collector.
+"""
+
+import json
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Iterator, Optional
+
+from asdana.core.config import get_config
+
+# Default configuration constants
+DEFAULT_CAPACITY = 100  # traces kept in each ring buffer
+DEFAULT_SLOW_THRESHOLD = 1.0  # seconds after which a trace is always kept
+DEFAULT_SAMPLE_RATE = 0.01  # fraction of the other traces kept
+DEFAULT_MAX_SPANS = 500  # spans kept per trace
+
+SERVICE_NAME = "asdana"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("span", default=None)
+
+
+class Trace:  # pylint: disable=too-few-public-methods
+    """
+    The spans of one command invocation.
+
+    Attributes:
+        trace_id: 16 random bytes, as 32 hex digits.
+        spans: The finished spans, in the order they finished.
+        dropped: Spans not kept because the trace had too many.
+    """
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: list[Span] = []
+        self.dropped = 0
+
+    @property
+    def root(self) -> Optional["Span"]:
+        """
+        The span the trace started with, once it has finished.
+        """
+        return next((item for item in self.spans if item.parent_id is None), None)
+
+    def to_dict(self) -> dict:
+        """
+        The trace in a plain JSON shape, with span times in milliseconds
+        since the trace started.
+        """
+        root = self.root
+        started = root.start_ns if root else min(item.start_ns for item in self.spans)
+        return {
+            "trace_id": self.trace_id,
+            "name": root.name if root else None,
+            "duration_ms": root.duration * 1000 if root else None,
+            "error": root.error if root else None,
+            "dropped_spans": self.dropped,
+            "spans": [item.to_dict(started) for item in self.spans],
+        }
+
+
+class Span:  # pylint: disable=too-many-instance-attributes
+    """
+    A timed operation within a trace.
+
+    Attributes:
+        name: What the operation was, e.g. "command random" or "db.query".
+        trace: The trace it belongs to.
+        span_id: 8 random bytes, as 16 hex digits.
+        parent_id: The parent span's ID, or None for the root span.
+        attributes: Details of the operation.
+        start_ns: Start time in nanoseconds since the epoch.
+        end_ns: End time in nanoseconds since the epoch, once finished.
+        error: Description of the error the operation failed with, if any.
+    """
+
+    def __init__(
+        self, name: str, trace: Trace, parent: Optional["Span"], attributes: dict
+    ):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._token: Optional[Token] = None
+
+    @property
+    def duration(self) -> float:
+        """
+        Seconds the span took, or has taken so far.
+        """
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_dict(self, trace_start_ns: int) -> dict:
+        """
+        The span in a plain JSON shape.
+        :param trace_start_ns: When the trace started, for relative times.
+        """
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": (self.start_ns - trace_start_ns) / 1e6,
+            "duration_ms": self.duration * 1000,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> dict:
+        """
+        The span in the OTLP/JSON shape.
+        """
+        data = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1 if self.parent_id is None else 3,  # Internal or client
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": (
+                {"code": 2, "message": self.error} if self.error else {"code": 1}
+            ),
+        }
+        if self.parent_id is not None:
+            data["parentSpanId"] = self.parent_id
+        return data
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Tracer:
+    """
+    Opens spans and keeps a tail sample of the finished traces.
+
+    Attributes:
+        slow_threshold: Seconds after which a trace is always kept.
+        sample_rate: Fraction of the faster, successful traces kept.
+        max_spans: Spans kept per trace.
+        slow: The most recent slow or failed traces.
+        sampled: The most recent sampled other traces.
+        finished: Number of traces finished, kept or not.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = DEFAULT_SLOW_THRESHOLD,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        capacity: int = DEFAULT_CAPACITY,
+        max_spans: int = DEFAULT_MAX_SPANS,
+    ):
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+        self.max_spans = max_spans
+        self.slow: deque[Trace] = deque(maxlen=capacity)
+        self.sampled: deque[Trace] = deque(maxlen=capacity)
+        self.finished = 0
+
+    def start_span(
+        self, name: str, child_only: bool = False, activate: bool = True, **attributes
+    ) -> Optional[Span]:
+        """
+        Opens a span, as a child of the current span if there is one.
+        :param name: What the operation is.
+        :param child_only: Only open the span inside an existing trace.
+        :param activate: Make it the current span, so spans opened while it
+            runs become its children. Leaf operations need not.
+        :param attributes: Details of the operation.
+        :return: The span, or None if ``child_only`` and there is no trace.
+        """
+        parent = _current_span.get()
+        if parent is None and child_only:
+            return None
+        trace = parent.trace if parent is not None else Trace()
+        opened = Span(name, trace, parent, attributes)
+        if activate:
+            # pylint: disable-next=protected-access
+            opened._token = _current_span.set(opened)
+        return opened
+
+    def end_span(self, ended: Optional[Span], error: Optional[str] = None) -> None:
+        """
+        Finishes a span; finishing a root span finishes its trace.
+        :param ended: The span, or None, which is ignored.
+        :param error: Description of the error the operation failed with.
+        """
+        if ended is None or ended.end_ns is not None:
+            return
+        ended.end_ns = time.time_ns()
+        ended.error = error
+        token, ended._token = ended._token, None  # pylint: disable=protected-access
+        if token is not None:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Ended in another context than it started in; leave it be
+                pass
+        trace = ended.trace
+        # The root span is kept even past the limit, as reports start from it
+        if len(trace.spans) < self.max_spans or ended.parent_id is None:
+            trace.spans.append(ended)
+        else:
+            trace.dropped += 1
+        if ended.parent_id is None:
+            self._finish_trace(trace, ended)
+
+    def _finish_trace(self, trace: Trace, root: Span) -> None:
+        self.finished += 1
+        if root.error or root.duration >= self.slow_threshold:
+            self.slow.append(trace)
+        elif random.random() < self.sample_rate:
+            self.sampled.append(trace)
+
+    @contextmanager
+    def span(self, name: str, child_only: bool = False, **attributes) -> Iterator:
+        """
+        Context manager that wraps a block in a span, recording the error
+        it raises, if any.
+        :param name: What the operation is.
+        :param child_only: Only open the span inside an existing trace.
+        :param attributes: Details of the operation.
+        :return: The span, or None.
+        """
+        opened = self.start_span(name, child_only, **attributes)
+        try:
+            yield opened
+        except BaseException as e:
+            self.end_span(opened, error=f"{type(e).__name__}: {e}")
+            raise
+        self.end_span(opened)
+
+    def traces(self, slow_only: bool = False) -> list[Trace]:
+        """
+        The kept traces, slowest first.
+        :param slow_only: Leave out the randomly sampled traces.
+        """
+        kept = list(self.slow) if slow_only else [*self.slow, *self.sampled]
+        return sorted(
+            kept, key=lambda trace: -(trace.root.duration if trace.root else 0)
+        )
+
+    def export(self, otlp: bool = False, slow_only: bool = False) -> str:
+        """
+        Exports the kept traces as JSON.
+        :param otlp: Use the OTLP/JSON shape (an ``ExportTraceServiceRequest``).
+        :param slow_only: Leave out the randomly sampled traces.
+        :return: The JSON document.
+        """
+        traces = self.traces(slow_only)
+        if not otlp:
+            return json.dumps([trace.to_dict() for trace in traces], default=str)
+        return json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                _otlp_attribute("service.name", SERVICE_NAME)
+                            ]
+                        },
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": __name__},
+                                "spans": [
+                                    item.to_otlp()
+                                    for trace in traces
+                                    for item in trace.spans
+                                ],
+                            }
+                        ],
+                    }
+                ]
+            }
+        )
+
+
+_tracer: Optional[Tracer] = None  # pylint: disable=invalid-name
+
+
+def get_tracer() -> Tracer:
+    """
+    Returns the global tracer, creating it from the configuration on first
+    use.
+    :return: The tracer.
+    """
+    global _tracer  # pylint: disable=global-statement
+    if _tracer is None:
+        config = get_config()
+        _tracer = Tracer(config.trace_slow_threshold, config.trace_sample_rate)
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    """
+    Replaces the global tracer. Passing None makes the next ``get_tracer()``
+    call create one from the configuration again.
+    :param tracer: The tracer to use.
+    :return: The tracer that was replaced, if any.
+    """
+    global _tracer  # pylint: disable=global-statement
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+def start_span(
+    name: str, child_only: bool = False, activate: bool = True, **attributes
+):
+    """
+    Opens a span on the global tracer; see ``Tracer.start_span``.
+    """
+    return get_tracer().start_span(name, child_only, activate, **attributes)
+
+
+def end_span(ended: Optional[Span], error: Optional[str] = None) -> None:
+    """
+    Finishes a span on the global tracer; see ``Tracer.end_span``.
+    """
+    get_tracer().end_span(ended, error)
+
+
+def span(name: str, child_only: bool = False, **attributes):
+    """
+    Wraps a block in a span on the global tracer; see ``Tracer.span``.
+    """
+    return get_tracer().span(name, child_only, **attributes)
@@ -0,0 +1,241 @@
+"""
+Blocking call detector for the Asdana bot.
+
+The resource monitor shows that the event loop stalled, not what stalled it.
+``StallWatchdog`` keeps a coroutine ticking on the loop and a helper thread
+that checks the tick: whenever the loop has not ticked for longer than the
+threshold, the helper thread samples the loop thread's stack with
+``sys._current_frames()``. Every sample lands in the code that was running
+while the loop was blocked, e.g. a synchronous HTTP request or a file write,
+so counting samples per line points at the worst offenders. Sampling only
+happens during stalls, so the watchdog costs almost nothing otherwise.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import suppress
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Default configuration constants
+DEFAULT_SAMPLE_INTERVAL = 0.01  # seconds between stack samples during a stall
+DEFAULT_STACK_DEPTH = 30  # innermost frames kept per sample
+DEFAULT_MAX_STACKS = 1000  # distinct stacks counted before the rarest are dropped
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A stack frame as (file, line, function)
+Frame = tuple[str, int, str]
+
+
+def _short_path(filename: str) -> str:
+    """
+    Shortens a source path to the part after the project or site-packages.
+    """
+    for marker in ("site-packages" + os.sep, os.path.dirname(PACKAGE_DIR) + os.sep):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    return filename
+
+
+def thread_stack(thread_id: int, depth: int = DEFAULT_STACK_DEPTH) -> tuple[Frame, ...]:
+    """
+    Samples the stack a thread is running, outermost frame first.
+    :param thread_id: The thread's identifier.
+    :param depth: Innermost frames to keep.
+    :return: The frames, or an empty tuple if the thread is gone.
+    """
+    frame = sys._current_frames().get(thread_id)  # pylint: disable=protected-access
+    if frame is None:
+        return ()
+    return tuple(
+        (_short_path(entry.filename), entry.lineno, entry.name)
+        for entry in traceback.extract_stack(frame, limit=depth)
+    )
+
+
+def _format_frame(frame: Frame) -> str:
+    filename, lineno, function = frame
+    return f"{filename}:{lineno} in {function}"
+
+
+class StallWatchdog:  # pylint: disable=too-many-instance-attributes
+    """
+    Samples the event loop thread's stack while the loop is blocked.
+
+    Attributes:
+        threshold: Seconds without a tick after which the loop counts as
+            stalled.
+        sample_interval: Seconds between stack samples during a stall.
+        stalls: Number of stalls seen.
+        samples: Number of stacks sampled.
+        offenders: Samples per innermost frame, i.e. the line that was
+            running.
+        call_sites: Samples per innermost frame in the bot's own code, i.e.
+            where the blocking call was made.
+        stacks: Samples per stack. Once it holds more than ``max_stacks``
+            stacks, it is trimmed to the most common half.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+        stack_depth: int = DEFAULT_STACK_DEPTH,
+        max_stacks: int = DEFAULT_MAX_STACKS,
+    ):
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.stack_depth = stack_depth
+        self.max_stacks = max_stacks
+        self.stalls = 0
+        self.samples = 0
+        self.offenders: Counter[Frame] = Counter()
+        self.call_sites: Counter[Frame] = Counter()
+        self.stacks: Counter[tuple[Frame, ...]] = Counter()
+        self._lock = threading.Lock()
+        self._last_tick = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the watchdog is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Starts watching the current event loop. Must be called from the loop.
+        """
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._thread = threading.Thread(
+            target=self._watch, name="asdana-watchdog", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            "Sampling the event loop's stack during stalls over %.0f ms.",
+            self.threshold * 1000,
+        )
+
+    async def stop(self) -> None:
+        """
+        Stops watching.
+        """
+        self._stopped.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            await asyncio.to_thread(thread.join)
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def _tick(self) -> None:
+        while True:
+            self._last_tick = time.monotonic()
+            await asyncio.sleep(self.threshold / 4)
+
+    def _watch(self) -> None:
+        stalled = False
+        while not self._stopped.wait(self.sample_interval):
+            if time.monotonic() - self._last_tick < self.threshold:
+                stalled = False
+                continue
+            if not stalled:
+                stalled = True
+                with self._lock:
+                    self.stalls += 1
+            self.sample()
+
+    def sample(self) -> None:
+        """
+        Samples the loop thread's stack and counts it.
+        """
+        stack = thread_stack(self._loop_thread, self.stack_depth)
+        if not stack:
+            return
+        call_site = next(
+            (entry for entry in reversed(stack) if entry[0].startswith("asdana")),
+            None,
+        )
+        with self._lock:
+            self.samples += 1
+            self.offenders[stack[-1]] += 1
+            if call_site is not None:
+                self.call_sites[call_site] += 1
+            self.stacks[stack] += 1
+            if len(self.stacks) > self.max_stacks:
+                # Trimming to half keeps the cost of trimming rare
+                self.stacks = Counter(
+                    dict(self.stacks.most_common(self.max_stacks // 2))
+                )
+
+    def reset(self) -> None:
+        """
+        Forgets every sample taken so far.
+        """
+        with self._lock:
+            self.stalls = 0
+            self.samples = 0
+            self.offenders.clear()
+            self.call_sites.clear()
+            self.stacks.clear()
+
+    def format_report(self, limit: int = 10) -> str:
+        """
+        Lists the lines that were running most often during stalls.
+        :param limit: Entries per section.
+        :return: The report.
+        """
+        with self._lock:
+            offenders = self.offenders.most_common(limit)
+            call_sites = self.call_sites.most_common(limit)
+            stacks = self.stacks.most_common(1)
+            lines = [
+                f"{self.stalls} stalls over {self.threshold * 1000:.0f} ms, "
+                f"{self.samples} samples (~{self.samples * self.sample_interval:.1f}"
+                " s blocked)"
+            ]
+        if not offenders:
+            return lines[0]
+        lines.append("")
+        lines.append("running during stalls:")
+        lines.extend(
+            f"{count:>6}  {_format_frame(frame)}" for frame, count in offenders
+        )
+        if call_sites:
+            lines.append("")
+            lines.append("called from the bot's code:")
+            lines.extend(
+                f"{count:>6}  {_format_frame(frame)}" for frame, count in call_sites
+            )
+        stack, count = stacks[0]
+        lines.append("")
+        lines.append(f"most sampled stack ({count} samples):")
+        lines.extend(f"  {_format_frame(frame)}" for frame in stack)
+        return "\n".join(lines)
+
+    def dump(self, path: str, limit: int = 50) -> None:
+        """
+        Writes the report to a file.
+        :param path: The file to write.
+        :param limit: Entries per section.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.format_report(limit) + "\n")
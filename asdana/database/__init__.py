@@ -7,16 +7,48 @@ PostgreSQL database using SQLAlchemy with asyncpg.
 Modules:
     database: Database connection and session management.
     models: SQLAlchemy ORM models for database tables.
+
+Re-exported names are imported on first use, so importing the package alone
+does not load SQLAlchemy.
 """
 
-from asdana.database.database import create_tables, get_session
-from asdana.database.models import Base, Menu, User, YouTubeVideo
+from typing import TYPE_CHECKING
+
+from asdana.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from asdana.database.database import (
+        Database,
+        create_tables,
+        get_database,
+        get_session,
+        set_database,
+    )
+    from asdana.database.models import Base, Menu, User, YouTubeVideo
 
 __all__ = [
     "Base",
+    "Database",
     "Menu",
     "User",
     "YouTubeVideo",
     "create_tables",
+    "get_database",
     "get_session",
+    "set_database",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "Base": "asdana.database.models",
+        "Menu": "asdana.database.models",
+        "User": "asdana.database.models",
+        "YouTubeVideo": "asdana.database.models",
+        "Database": "asdana.database.database",
+        "create_tables": "asdana.database.database",
+        "get_database": "asdana.database.database",
+        "get_session": "asdana.database.database",
+        "set_database": "asdana.database.database",
+    },
+)
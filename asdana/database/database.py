@@ -1,22 +1,211 @@
 """
 Contains database configuration and session management.
+
+The async engine and session factory are created the first time a session is
+requested or the tables are created, not when this module is imported. Each
+``Database`` owns its own engine, so several independently configured
+databases can exist in one process, and the global one used by
+``get_session()`` can be swapped with ``set_database()`` (e.g. for a local
+test database).
 """
 
+import logging
+import time
 from contextlib import asynccontextmanager
+from typing import Any, Optional
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
-from asdana.core.config import config
+from asdana.core.config import get_config
+from asdana.core.metrics import DB, record_phase
+from asdana.core.queries import record_round_trip, record_statement
+from asdana.core.tracing import end_span, span, start_span
 from asdana.database.models import Base
 
-# Get database URL from configuration
-DATABASE_URL = config.database_url
+logger = logging.getLogger(__name__)
+
+# Default configuration constants
+DEFAULT_ENGINE_OPTIONS = {"echo": True}
+
+
+def _query_started(conn, _cursor, statement, *_):
+    record_statement(statement)
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+    conn.info.setdefault("query_spans", []).append(
+        start_span("db.query", child_only=True, activate=False, statement=statement)
+    )
+
+
+def _query_finished(conn, *_):
+    # Charged to the command that ran the query, if any
+    record_phase(DB, time.perf_counter() - conn.info["query_started"].pop())
+    end_span(conn.info["query_spans"].pop())
+
+
+def _query_failed(context):
+    started = context.connection.info.get("query_started")
+    if started:
+        record_phase(DB, time.perf_counter() - started.pop())
+        end_span(
+            context.connection.info["query_spans"].pop(),
+            error=repr(context.original_exception),
+        )
+
+
+def _transaction_control(*_):
+    record_round_trip()
+
+
+def _instrument(engine: AsyncEngine) -> None:
+    """
+    Charges the time each query takes to the running command's DB phase,
+    traces each query run within a trace, and counts statements and round
+    trips for the running command or event.
+    :param engine: The engine.
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", _query_started)
+    event.listen(engine.sync_engine, "after_cursor_execute", _query_finished)
+    event.listen(engine.sync_engine, "handle_error", _query_failed)
+    for name in ("begin", "commit", "rollback"):
+        event.listen(engine.sync_engine, name, _transaction_control)
+
+
+class Database:
+    """
+    A lazily created async engine and the session factory bound to it.
+
+    Attributes:
+        engine_options: Keyword arguments passed to ``create_async_engine``.
+    """
 
-# Create an async engine
-engine = create_async_engine(DATABASE_URL, echo=True)
+    def __init__(self, url: Optional[str] = None, **engine_options: Any):
+        """
+        :param url: Database URL; defaults to the one in the configuration,
+            read when the engine is created.
+        :param engine_options: Options for ``create_async_engine``, merged over
+            ``DEFAULT_ENGINE_OPTIONS``.
+        """
+        self._url = url
+        self.engine_options = {**DEFAULT_ENGINE_OPTIONS, **engine_options}
+        self._engine: Optional[AsyncEngine] = None
+        self._sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
 
-# Create a configured "Session" class
-AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+    @property
+    def url(self) -> str:
+        """
+        The database URL.
+        """
+        return self._url or get_config().database_url
+
+    @property
+    def initialized(self) -> bool:
+        """
+        Whether the engine has been created.
+        """
+        return self._engine is not None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """
+        The async engine, created on first use.
+        """
+        if self._engine is None:
+            self._engine = create_async_engine(self.url, **self.engine_options)
+            _instrument(self._engine)
+            logger.debug("Created database engine for %s.", self._engine.url)
+        return self._engine
+
+    @property
+    def sessionmaker(self) -> async_sessionmaker[AsyncSession]:
+        """
+        The session factory bound to the engine, created on first use.
+        """
+        if self._sessionmaker is None:
+            self._sessionmaker = async_sessionmaker(
+                bind=self.engine, expire_on_commit=False
+            )
+        return self._sessionmaker
+
+    def pool_status(self) -> Optional[dict[str, int]]:
+        """
+        Counts the connections in the engine's pool.
+        :return: Idle, checked out and overflow connections and the pool size,
+            or None before the engine exists or if its pool does not keep
+            connections.
+        """
+        if self._engine is None:
+            return None
+        pool = self._engine.sync_engine.pool
+        if not hasattr(pool, "checkedout"):
+            return None
+        return {
+            "idle": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(0, pool.overflow()),
+            "size": pool.size(),
+        }
+
+    @asynccontextmanager
+    async def session(self):
+        """
+        Context manager to get a session on this database.
+        :return: Asynchronous database session.
+        """
+        async with self.sessionmaker() as session:
+            yield session
+
+    async def create_tables(self) -> None:
+        """
+        Create the tables in the database.
+        :return: None
+        """
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, checkfirst=True)
+
+    async def dispose(self) -> None:
+        """
+        Closes the engine's connections. The engine is created again if the
+        database is used afterwards.
+        :return: None
+        """
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._sessionmaker = None
+
+
+_database: Optional[Database] = None  # pylint: disable=invalid-name
+
+
+def get_database() -> Database:
+    """
+    Returns the global database, creating it from the configuration on first
+    use. Creating it does not connect; the engine is built on first session.
+    :return: The database.
+    """
+    global _database  # pylint: disable=global-statement
+    if _database is None:
+        _database = Database()
+    return _database
+
+
+def set_database(database: Optional[Database]) -> Optional[Database]:
+    """
+    Replaces the global database used by ``get_session()``. The replaced
+    database is not disposed. Passing None makes the next ``get_database()``
+    call create one from the configuration again.
+    :param database: The database to use.
+    :return: The database that was replaced, if any.
+    """
+    global _database  # pylint: disable=global-statement
+    previous, _database = _database, database
+    return previous
 
 
 @asynccontextmanager
@@ -25,11 +214,9 @@ async def get_session():
     Context manager to get a database session.
     :return: Asynchronous database session.
     """
-    async with AsyncSessionLocal() as session:
-        try:
+    with span("db.session", child_only=True):
+        async with get_database().session() as session:
             yield session
-        finally:
-            pass  # Session will be closed by the AsyncSessionLocal context manager
 
 
 async def create_tables():
@@ -37,5 +224,4 @@ async def create_tables():
     Create the tables in the database.
     :return: None
     """
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all, checkfirst=True)
+    await get_database().create_tables()
@@ -34,6 +34,30 @@ class YouTubeVideo(Base):
     title = Column(String, nullable=True)
 
 
+class GuildVideoShuffle(Base):
+    """
+    Represents a guild's shuffle bag of YouTube videos.
+
+    The bag is a seeded permutation over a range of ``yt_videos`` primary keys,
+    walked by a cursor, so its state stays a fixed handful of integers.
+
+    Attributes:
+        guild_id (int): Discord guild/server ID (primary key).
+        seed (int): Seed of the permutation for the current pass.
+        base_id (int): First video primary key covered by the current pass.
+        pool_size (int): Number of primary keys covered by the current pass.
+        cursor (int): Number of keys already drawn in the current pass.
+    """
+
+    __tablename__ = "guild_video_shuffle"
+
+    guild_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    seed = Column(BigInteger, nullable=False, default=0)
+    base_id = Column(Integer, nullable=False, default=0)
+    pool_size = Column(Integer, nullable=False, default=0)
+    cursor = Column(Integer, nullable=False, default=0)
+
+
 class User(Base):
     """
     Represents a Discord user in the database.
@@ -340,3 +364,24 @@ class CogSettings(Base):
 
         # Default to enabled if no setting exists
         return cog_setting.enabled if cog_setting else True
+
+
+class CommandSyncState(Base):
+    """
+    Records the application commands last synced to Discord for one scope.
+
+    Attributes:
+        scope (str): "global", or "guild:<id>" for a guild's commands.
+        payload_hash (str): SHA-256 of the command payload that was synced.
+        synced_at (datetime): When the scope was last synced.
+    """
+
+    __tablename__ = "command_sync_state"
+
+    scope = Column(String(32), primary_key=True)
+    payload_hash = Column(String(64), nullable=False)
+    synced_at = Column(
+        DateTime(timezone=True),
+        default=discord.utils.utcnow,
+        onupdate=discord.utils.utcnow,
+    )
@@ -5,43 +5,97 @@ This module initializes and runs the Asdana Discord bot.
 """
 
 import asyncio
+from typing import Callable, Optional
 
 import discord
 from aiohttp import ClientSession
 
-from asdana.core.bot import AsdanaBot, get_prefix
-from asdana.core.config import config
-from asdana.core.logging_config import setup_logging
+from asdana.core.bot import SLASH, AsdanaBot, get_prefix
+from asdana.core.config import get_config
+from asdana.core.logging_config import LOG_FILE, setup_logging
+from asdana.core.member_cache import member_cache_flags
+from asdana.core.metrics import DISCORD, HTTP, trace_config
+from asdana.core.metrics_server import MetricsServer
 from asdana.database.database import create_tables
 
 
-async def main():
+async def main(
+    shard_count: Optional[int] = None,
+    shard_ids: Optional[list[int]] = None,
+    on_ready: Optional[Callable[[], None]] = None,
+    metrics_port: Optional[int] = None,
+    log_file: str = LOG_FILE,
+):
     """
     Main entry point for the bot.
 
     Sets up logging, initializes the bot with configuration,
     creates database tables, and starts the bot.
+
+    Args:
+        shard_count: Total number of shards; defaults to the configuration.
+        shard_ids: Shards to run in this process; defaults to the
+            configuration.
+        on_ready: Called whenever the bot becomes ready, e.g. to notify a
+            cluster launcher.
+        metrics_port: Port of the metrics and health endpoint; defaults to
+            the configuration. Without one, the endpoint is not served.
+        log_file: File to write the log to; each process needs its own.
     """
-    # Setup logging
-    setup_logging(config.log_level)
+    # Load configuration and setup logging
+    config = get_config()
+    setup_logging(config.log_level, log_file)
 
     # Create aiohttp session for web requests
-    async with ClientSession() as web_client:
-        # Configure Discord intents
+    # Request time is charged to the command that made the request
+    async with ClientSession(trace_configs=[trace_config(HTTP)]) as web_client:
+        # Configure Discord intents; these are the most the bot may request,
+        # narrowed to what the loaded cogs need once they are loaded
         intents = discord.Intents.default()
         intents.members = True
-        intents.message_content = True
+        intents.message_content = config.command_mode != SLASH
 
         # Initialize and run the bot
         async with AsdanaBot(
             web_client=web_client,
             testing_guild_id=config.testing_guild_id,
+            command_mode=config.command_mode,
+            disabled_cogs=config.disabled_cogs,
+            derive_intents=True,
+            shard_count=shard_count or config.shard_count,
+            shard_ids=shard_ids or config.shard_ids,
             description=config.bot_description,
             intents=intents,
+            member_cache_flags=member_cache_flags(config.member_cache),
+            chunk_guilds_at_startup=config.chunk_guilds_at_startup,
+            http_trace=trace_config(DISCORD),
             command_prefix=get_prefix,
         ) as bot:
-            await create_tables()
-            await bot.start(config.bot_token)
+            if on_ready is not None:
+
+                async def notify_ready():
+                    on_ready()
+
+                bot.add_listener(notify_ready, "on_ready")
+
+            # Served from the start, so probes see the bot come up
+            metrics_port = metrics_port or config.metrics_port
+            server = None
+            if metrics_port:
+                server = MetricsServer(
+                    bot, metrics_port, config.metrics_host, config.traces_token
+                )
+                await server.start()
+
+            try:
+                # Import cogs on a worker thread while the database engine is
+                # created and the tables are set up
+                bot.start_cog_preload()
+                await create_tables()
+                await bot.start(config.bot_token)
+            finally:
+                if server is not None:
+                    await server.stop()
 
 
 if __name__ == "__main__":
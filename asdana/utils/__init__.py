@@ -4,9 +4,31 @@ Utility modules for Asdana bot.
 This package contains utility classes and factories for common functionality.
 
 Modules:
+    lazy: Lazy package re-exports.
     menu_factory: Factory for creating reaction-based interactive menus.
+    rate_limit: Token bucket for spacing out upstream API calls.
+    youtube_api: Asynchronous YouTube Data API client.
+
+Re-exported names are imported on first use.
 """
 
-from asdana.utils.menu_factory import MenuFactory
+from typing import TYPE_CHECKING
+
+from asdana.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from asdana.utils.menu_factory import MenuFactory
+    from asdana.utils.rate_limit import RateLimiter
+    from asdana.utils.youtube_api import YouTubeApiClient, YouTubeApiError
+
+__all__ = ["MenuFactory", "RateLimiter", "YouTubeApiClient", "YouTubeApiError"]
 
-__all__ = ["MenuFactory"]
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "MenuFactory": "asdana.utils.menu_factory",
+        "RateLimiter": "asdana.utils.rate_limit",
+        "YouTubeApiClient": "asdana.utils.youtube_api",
+        "YouTubeApiError": "asdana.utils.youtube_api",
+    },
+)
@@ -0,0 +1,72 @@
+"""
+Space-efficient probabilistic set membership.
+"""
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Bloom filter over strings with a fixed memory footprint.
+
+    Membership tests never give false negatives; they give false positives
+    at roughly ``error_rate`` once ``capacity`` items have been added. The bit
+    array is sized up front, so memory use does not grow with the input.
+
+    Attributes:
+        capacity: Number of items the filter is sized for.
+        error_rate: Target false positive rate at capacity.
+        num_bits: Size of the bit array.
+        num_hashes: Number of bit positions set per item.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 1e-4):
+        if capacity < 1:
+            raise ValueError("Capacity must be positive.")
+        if not 0 < error_rate < 1:
+            raise ValueError("Error rate must be between 0 and 1.")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def __len__(self) -> int:
+        """
+        Number of items added, counting repeated adds of the same item.
+        """
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        Memory used by the bit array.
+        """
+        return len(self._bits)
+
+    def _positions(self, item: str):
+        # Kirsch-Mitzenmacher double hashing from one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.num_hashes):
+            yield (first + index * second) % self.num_bits
+
+    def add(self, item: str) -> None:
+        """
+        Adds an item to the filter.
+        :param item: The item to add.
+        """
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
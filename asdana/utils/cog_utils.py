@@ -38,18 +38,11 @@ def cog_enabled():
                     session, ctx.guild.id, cog_name.lower()
                 )
                 if not is_enabled:
-                    # Try to get the prefix for this context
-                    prefix = "!"
-                    if hasattr(ctx, "bot") and hasattr(ctx.bot, "command_prefix"):
-                        if callable(ctx.bot.command_prefix):
-                            # command_prefix can return a string or a list
-                            result = await ctx.bot.command_prefix(ctx.bot, ctx.message)
-                            if isinstance(result, (list, tuple)):
-                                prefix = result[0]
-                            else:
-                                prefix = result
-                        else:
-                            prefix = ctx.bot.command_prefix
+                    # The prefix the command was invoked with; looking the
+                    # guild's prefix up again would cost another query
+                    prefix = "/" if ctx.interaction is not None else "!"
+                    if ctx.interaction is None and ctx.prefix:
+                        prefix = ctx.clean_prefix
                     await ctx.send(
                         f"❌ The '{cog_name}' cog is disabled for this server. "
                         f"Ask an admin to enable it with "
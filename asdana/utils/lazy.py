@@ -0,0 +1,47 @@
+"""
+Lazy package re-exports.
+
+Package ``__init__`` modules re-export their most used names for
+convenience, but importing every submodule eagerly would pull in discord.py,
+SQLAlchemy and friends for anyone importing the package at all. Module-level
+``__getattr__`` (PEP 562) defers each import until the name is first used.
+"""
+
+import importlib
+import sys
+from typing import Callable, Iterable
+
+
+def lazy_exports(
+    package: str, exports: dict[str, str], uncached: Iterable[str] = ()
+) -> tuple[Callable[[str], object], Callable[[], list[str]]]:
+    """
+    Builds module ``__getattr__`` and ``__dir__`` functions that import
+    re-exported names on first access.
+
+    Usage::
+
+        __getattr__, __dir__ = lazy_exports(__name__, {"Name": "package.module"})
+
+    :param package: Name of the package doing the re-exporting.
+    :param exports: Mapping of exported name to the module defining it.
+    :param uncached: Exported names looked up again on every access, for
+        values the defining module can replace.
+    :return: The ``__getattr__`` and ``__dir__`` functions.
+    """
+    uncached = frozenset(uncached)
+
+    def __getattr__(name: str) -> object:
+        module_path = exports.get(name)
+        if module_path is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_path), name)
+        if name not in uncached:
+            # Cache on the package so later lookups skip __getattr__ entirely
+            setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,55 @@
+"""
+Rate limiting helpers for spreading out calls to upstream APIs.
+"""
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket that lets callers wait for permission to make a call.
+
+    Up to ``burst`` calls may happen back to back; after that, calls are spaced
+    so that no more than ``rate`` happen per ``period`` seconds on average.
+
+    Attributes:
+        rate: Number of calls allowed per period.
+        period: Length of the period in seconds.
+        burst: Maximum number of calls that may be made without waiting.
+    """
+
+    def __init__(self, rate: float, period: float = 1.0, burst: int = 1):
+        if rate <= 0 or period <= 0 or burst < 1:
+            raise ValueError("Rate, period and burst must be positive.")
+        self.rate = rate
+        self.period = period
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def interval(self) -> float:
+        """
+        Seconds between calls once the burst is used up.
+        """
+        return self.period / self.rate
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.burst, self._tokens + elapsed / self.interval)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """
+        Waits until a call may be made and consumes one token.
+        Callers are served in the order they arrive.
+        """
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) * self.interval)
+                self._refill()
+            self._tokens -= 1
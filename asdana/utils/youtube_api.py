@@ -0,0 +1,147 @@
+"""
+Minimal asynchronous client for the YouTube Data API.
+
+Requests go through the bot's shared aiohttp session, so they never block the
+event loop the way the synchronous ``googleapiclient`` requests do.
+"""
+
+import logging
+from typing import Iterable, Optional
+
+from aiohttp import ClientSession
+
+from asdana.utils.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://www.googleapis.com/youtube/v3"
+
+# The most IDs videos.list accepts in one call
+MAX_IDS_PER_REQUEST = 50
+
+
+class YouTubeApiError(RuntimeError):
+    """
+    Raised when the YouTube Data API answers with an error.
+
+    Attributes:
+        status: HTTP status code of the response.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"YouTube API error {status}: {message}")
+        self.status = status
+
+
+def is_playable(video: dict) -> bool:
+    """
+    Checks whether a videos.list item with the status part can be watched.
+    :param video: The video resource returned by the API.
+    :return: True if the video is public, processed and embeddable.
+    """
+    status = video.get("status", {})
+    return (
+        status.get("privacyStatus") == "public"
+        and status.get("uploadStatus") == "processed"
+        and status.get("embeddable", True)
+    )
+
+
+class YouTubeApiClient:
+    """
+    Calls YouTube Data API endpoints over an aiohttp session.
+
+    Attributes:
+        session: The aiohttp session used for requests.
+        api_key: The YouTube Data API key.
+        base_url: Root URL of the API, overridable to point at a local stand-in.
+        rate_limiter: Optional limiter awaited before every request.
+    """
+
+    def __init__(
+        self,
+        session: ClientSession,
+        api_key: Optional[str],
+        base_url: str = DEFAULT_BASE_URL,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.session = session
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.rate_limiter = rate_limiter
+
+    async def _get(self, endpoint: str, **params) -> dict:
+        """
+        Performs a GET request against an API endpoint.
+        :param endpoint: The endpoint name, e.g. "search".
+        :param params: Query string parameters.
+        :return: The decoded JSON response.
+        """
+        if not self.api_key:
+            raise YouTubeApiError(401, "No YouTube API key configured.")
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+
+        params["key"] = self.api_key
+        logger.debug("Calling YouTube API endpoint %s", endpoint)
+        async with self.session.get(
+            f"{self.base_url}/{endpoint}", params=params
+        ) as response:
+            payload = await response.json(content_type=None)
+            if response.status != 200:
+                message = (payload or {}).get("error", {}).get("message", "")
+                raise YouTubeApiError(response.status, message)
+        return payload
+
+    async def search_videos(self, query: str, max_results: int = 25) -> list[str]:
+        """
+        Searches for videos matching a query.
+        :param query: The search query.
+        :param max_results: Maximum number of results, at most 50.
+        :return: The IDs of the matching videos.
+        """
+        payload = await self._get(
+            "search", part="id", type="video", q=query, maxResults=max_results
+        )
+        return [item["id"]["videoId"] for item in payload.get("items", [])]
+
+    async def playlist_page(
+        self, playlist_id: str, page_token: Optional[str] = None
+    ) -> tuple[list[str], Optional[str]]:
+        """
+        Fetches one page of a playlist's videos.
+        :param playlist_id: The playlist ID.
+        :param page_token: Token of the page to fetch, or None for the first.
+        :return: The page's video IDs and the next page token, if any.
+        """
+        params = {"part": "contentDetails", "playlistId": playlist_id}
+        if page_token:
+            params["pageToken"] = page_token
+        payload = await self._get(
+            "playlistItems", maxResults=MAX_IDS_PER_REQUEST, **params
+        )
+        video_ids = [
+            item["contentDetails"]["videoId"] for item in payload.get("items", [])
+        ]
+        return video_ids, payload.get("nextPageToken")
+
+    async def list_videos(
+        self, video_ids: Iterable[str], part: str = "snippet,status"
+    ) -> list[dict]:
+        """
+        Fetches video resources by ID. Unknown or deleted videos are omitted.
+        :param video_ids: Up to 50 video IDs.
+        :param part: Comma separated resource parts to return.
+        :return: The video resources.
+        """
+        video_ids = list(video_ids)
+        if not video_ids:
+            return []
+        if len(video_ids) > MAX_IDS_PER_REQUEST:
+            raise ValueError(
+                f"videos.list accepts at most {MAX_IDS_PER_REQUEST} IDs per call."
+            )
+        payload = await self._get(
+            "videos", part=part, id=",".join(video_ids), maxResults=len(video_ids)
+        )
+        return payload.get("items", [])
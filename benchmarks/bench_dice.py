@@ -0,0 +1,83 @@
+"""
+Benchmarks rolling large dice pools.
+
+Compares a naive loop of ``randint`` calls against the aggregated face-count
+roller in ``asdana.cogs.random.dice``. The naive loop is only run up to
+``--naive-limit`` dice, beyond which it would take seconds to minutes.
+
+Usage:
+    python -m benchmarks.bench_dice
+    python -m benchmarks.bench_dice --pools 100000d1000 1000000000d6! --repeat 20
+"""
+
+import argparse
+import random
+import time
+
+from asdana.cogs.random import dice
+
+DEFAULT_POOLS = (
+    "100d6",
+    "10000d6",
+    "100000d1000",
+    "1000000d20kh100",
+    "100000000d6",
+    "1000000000d10000",
+    "1000000000d6!",
+)
+DEFAULT_NAIVE_LIMIT = 1_000_000
+
+
+def _naive_roll(rng: random.Random, count: int, sides: int) -> int:
+    return sum(rng.randint(1, sides) for _ in range(count))
+
+
+def _time_per_call(call, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(pools, repeat: int, naive_limit: int) -> None:
+    """
+    Runs the benchmark and prints one line per pool.
+    :param pools: Dice expressions to roll, one pool each.
+    :param repeat: Number of rolls per strategy and pool.
+    :param naive_limit: Largest pool rolled with the naive loop.
+    """
+    rng = random.Random(0)
+
+    print(f"{'pool':>18} {'naive loop':>14} {'aggregated':>12} {'speedup':>8}")
+    for pool in pools:
+        expression = dice.parse(pool)
+        term = expression.terms[0]
+        new_time = _time_per_call(lambda e=expression: e.roll(rng), repeat)
+
+        if term.count <= naive_limit and not (term.keep or term.explode):
+            old_time = _time_per_call(
+                lambda t=term: _naive_roll(rng, t.count, t.sides),
+                max(1, repeat // 10),
+            )
+            naive = f"{old_time * 1000:>11.3f} ms"
+            speedup = f"{old_time / new_time:>7.0f}x"
+        else:
+            naive, speedup = f"{'-':>14}", f"{'-':>8}"
+
+        print(f"{pool:>18} {naive} {new_time * 1000:>9.3f} ms {speedup}")
+
+
+def main() -> None:
+    """
+    Parses command line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pools", nargs="+", default=DEFAULT_POOLS)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--naive-limit", type=int, default=DEFAULT_NAIVE_LIMIT)
+    args = parser.parse_args()
+    run(args.pools, args.repeat, args.naive_limit)
+
+
+if __name__ == "__main__":
+    main()
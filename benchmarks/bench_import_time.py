@@ -0,0 +1,132 @@
+"""
+Benchmarks the cold import cost of the ``asdana`` package.
+
+Each run imports the targets in a fresh interpreter under
+``python -X importtime`` and parses the per-module timings it writes to
+stderr. The median cumulative import time of each target is printed, followed
+by the modules with the highest self time from the last run, so a dependency
+that starts loading eagerly again shows up by name. With ``--record`` the
+medians are appended to a JSON lines file and compared with the previous
+entry, which tracks import cost over time.
+
+Usage:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --runs 10 --target asdana.core.bot
+    python -m benchmarks.bench_import_time --record benchmarks/import_time.jsonl
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Optional
+
+DEFAULT_RUNS = 5
+DEFAULT_TARGETS = ("asdana", "asdana.core.bot", "asdana.cogs.youtube")
+DEFAULT_TOP = 10
+
+
+def _measure(target: str) -> dict[str, tuple[int, int]]:
+    """
+    Imports a module in a fresh interpreter.
+    :param target: The module to import.
+    :return: Self and cumulative microseconds for every module imported.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stderr
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def _record(path: str, medians: dict[str, float]) -> None:
+    """
+    Appends medians to a history file and prints the change since the last
+    entry.
+    :param path: The JSON lines history file.
+    :param medians: Median cumulative import time of each target, in ms.
+    """
+    previous = None
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as history:
+            lines = [line for line in history if line.strip()]
+        if lines:
+            previous = json.loads(lines[-1])["medians"]
+
+    with open(path, "a", encoding="utf-8") as history:
+        history.write(json.dumps({"time": time.time(), "medians": medians}) + "\n")
+
+    if previous:
+        print()
+        print(f"{'target':<24} {'before':>10} {'after':>10} {'change':>8}")
+        for target, after in medians.items():
+            before = previous.get(target)
+            if before is None:
+                continue
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"{target:<24} {before:>7.1f} ms {after:>7.1f} ms {change:>+7.1f}%")
+
+
+def run(runs: int, targets: list[str], top: int, record: Optional[str] = None) -> None:
+    """
+    Runs the benchmark and prints the results.
+    :param runs: Number of cold imports per target.
+    :param targets: Modules to import.
+    :param top: Number of heaviest modules to list per target.
+    :param record: Optional history file to append the medians to.
+    """
+    medians = {}
+    last = {}
+    print(f"{'target':<24} {'median':>10} {'min':>10} {'modules':>8}")
+    for target in targets:
+        results = [_measure(target) for _ in range(runs)]
+        totals = [result[target][1] / 1000 for result in results]
+        medians[target] = statistics.median(totals)
+        last[target] = results[-1]
+        print(
+            f"{target:<24} {medians[target]:>7.1f} ms {min(totals):>7.1f} ms "
+            f"{len(results[-1]):>8}"
+        )
+
+    for target, modules in last.items():
+        print()
+        print(f"Heaviest modules imported by {target} (self time):")
+        heaviest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (self_us, _) in heaviest[:top]:
+            print(f"  {self_us / 1000:>7.1f} ms  {name}")
+
+    if record:
+        _record(record, medians)
+
+
+def main() -> None:
+    """
+    Parses command line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument(
+        "--target",
+        action="append",
+        dest="targets",
+        help=f"Module to import; may be repeated (default: {', '.join(DEFAULT_TARGETS)})",
+    )
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument("--record", help="JSON lines file to append results to")
+    args = parser.parse_args()
+    run(args.runs, args.targets or list(DEFAULT_TARGETS), args.top, args.record)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Compares member cache policies on synthetic guilds.
+
+Builds GUILD_CREATE payloads for ``--guilds`` guilds of ``--members`` members
+each and feeds them to a discord.py connection state configured with each
+policy. As on the real gateway, a large guild's GUILD_CREATE only carries a
+few members; with chunking at startup the rest arrive as GUILD_MEMBERS_CHUNK
+payloads of 1000 members, which the bot waits for before it is ready. For
+each configuration the memory held by the cache (traced with tracemalloc),
+the CPU time to process the payloads and the number of chunks waited for are
+printed. Network time is not included; every chunk is another gateway
+message on a real connection.
+
+Usage:
+    python -m benchmarks.bench_member_cache
+    python -m benchmarks.bench_member_cache --guilds 20 --members 50000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Iterator
+
+import discord
+
+from asdana.core.member_cache import member_cache_flags
+
+DEFAULT_GUILDS = 10
+DEFAULT_MEMBERS = 20_000
+CHUNK_SIZE = 1000  # members per GUILD_MEMBERS_CHUNK, as Discord sends them
+LARGE_THRESHOLD = 250  # members in the GUILD_CREATE of a large guild
+BOT_USER_ID = 1
+
+# (label, member cache policy, chunk guilds at startup)
+CONFIGURATIONS = (
+    ("all + chunk at startup", "all", True),
+    ("all", "all", False),
+    ("voice", "voice", False),
+    ("none (default)", "none", False),
+)
+
+
+def _member(user_id: int) -> dict:
+    return {
+        "user": {
+            "id": str(user_id),
+            "username": f"user{user_id}",
+            "discriminator": "0",
+            "global_name": None,
+            "avatar": None,
+            "bot": user_id == BOT_USER_ID,
+        },
+        "roles": [],
+        "joined_at": "2024-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def _guild_create(guild_id: int, members: int) -> dict:
+    first_user = guild_id * 10_000_000
+    shown = min(members, LARGE_THRESHOLD)
+    return {
+        "id": str(guild_id),
+        "name": f"guild {guild_id}",
+        "owner_id": str(first_user),
+        "member_count": members + 1,
+        "large": members > LARGE_THRESHOLD,
+        "members": [_member(BOT_USER_ID)]
+        + [_member(first_user + index) for index in range(shown)],
+        "roles": [
+            {
+                "id": str(guild_id),
+                "name": "@everyone",
+                "permissions": "0",
+                "position": 0,
+                "color": 0,
+                "hoist": False,
+                "managed": False,
+                "mentionable": False,
+            }
+        ],
+        "channels": [],
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+        "voice_states": [],
+        "presences": [],
+        "threads": [],
+    }
+
+
+def _chunks(guild_id: int, members: int) -> Iterator[list[dict]]:
+    first_user = guild_id * 10_000_000
+    for start in range(0, members, CHUNK_SIZE):
+        yield [
+            _member(first_user + index)
+            for index in range(start, min(start + CHUNK_SIZE, members))
+        ]
+
+
+def _load(policy: str, chunk: bool, guilds: int, members: int) -> tuple:
+    """
+    Processes the synthetic payloads with one configuration.
+    :return: (connection state, chunks waited for).
+    """
+    intents = discord.Intents.default()
+    intents.members = True
+    client = discord.Client(
+        intents=intents,
+        member_cache_flags=member_cache_flags(policy),
+        chunk_guilds_at_startup=chunk,
+    )
+    state = client._connection  # pylint: disable=protected-access
+    state.user = discord.ClientUser(state=state, data=_member(BOT_USER_ID)["user"])
+
+    chunks = 0
+    for index in range(guilds):
+        guild_id = (index + 1) * 1000
+        guild = state._add_guild_from_data(  # pylint: disable=protected-access
+            _guild_create(guild_id, members)
+        )
+        if chunk:
+            # What discord.py does with each chunk it requested with caching
+            for payload in _chunks(guild_id, members):
+                chunks += 1
+                for data in payload:
+                    guild._add_member(  # pylint: disable=protected-access
+                        discord.Member(data=data, guild=guild, state=state)
+                    )
+    return state, chunks
+
+
+def _measure(policy: str, chunk: bool, guilds: int, members: int) -> tuple:
+    """
+    Loads one configuration twice: once timed, once under tracemalloc, which
+    would otherwise slow the timed run down several times over.
+    :return: (cached members, traced bytes, seconds, chunks waited for).
+    """
+    gc.collect()
+    started = time.perf_counter()
+    state, chunks = _load(policy, chunk, guilds, members)
+    elapsed = time.perf_counter() - started
+    cached = sum(len(guild.members) for guild in state.guilds)
+    del state
+
+    gc.collect()
+    tracemalloc.start()
+    state, _ = _load(policy, chunk, guilds, members)  # Kept alive while measured
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cached, traced, elapsed, chunks
+
+
+def run(guilds: int, members: int) -> None:
+    """
+    Runs the benchmark and prints one line per configuration.
+    :param guilds: Number of synthetic guilds.
+    :param members: Members per guild.
+    """
+    print(f"{guilds} guilds x {members:,} members")
+    print(
+        f"{'configuration':<24} {'cached':>10} {'memory':>10} {'cpu':>9} {'chunks':>7}"
+    )
+    for label, policy, chunk in CONFIGURATIONS:
+        cached, traced, elapsed, chunks = _measure(policy, chunk, guilds, members)
+        print(
+            f"{label:<24} {cached:>10,} {traced / 2**20:>7.1f} MB "
+            f"{elapsed * 1000:>6.0f} ms {chunks:>7}"
+        )
+
+
+def main() -> None:
+    """
+    Parses command line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--guilds", type=int, default=DEFAULT_GUILDS)
+    parser.add_argument("--members", type=int, default=DEFAULT_MEMBERS)
+    args = parser.parse_args()
+    run(args.guilds, args.members)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmarks random video selection across yt_videos table sizes.
+
+Compares the old ``ORDER BY random() LIMIT 1`` query against the key-seek
+statements used by ``RandomVideoSampler``. Runs against an in-memory SQLite
+database so it needs no server; point ``--url`` at PostgreSQL to measure the
+production planner instead.
+
+Usage:
+    python -m benchmarks.bench_random_video
+    python -m benchmarks.bench_random_video --sizes 1000 100000 --url postgresql://...
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import create_engine, func, insert, select
+
+from asdana.cogs.youtube.sampler import bounds_statement, pick_statement
+from asdana.database.models import YouTubeVideo
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+INSERT_BATCH = 10_000
+
+
+def _populate(conn, size: int) -> None:
+    YouTubeVideo.__table__.drop(conn, checkfirst=True)
+    YouTubeVideo.__table__.create(conn)
+    for start in range(0, size, INSERT_BATCH):
+        rows = [
+            {"video_id": f"v{i:010d}"}
+            for i in range(start, min(size, start + INSERT_BATCH))
+        ]
+        conn.execute(insert(YouTubeVideo), rows)
+
+
+def _time_per_call(conn, make_statement, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(make_statement()).scalar()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(url: str, sizes, repeat: int) -> None:
+    """
+    Runs the benchmark and prints one line per table size.
+    :param url: SQLAlchemy URL of a synchronous database to benchmark against.
+    :param sizes: Table sizes to measure.
+    :param repeat: Number of samples per strategy and size.
+    """
+    engine = create_engine(url)
+    order_by_random = (
+        select(YouTubeVideo.video_id)
+        .order_by(func.random())  # pylint: disable=not-callable
+        .limit(1)
+    )
+    rng = random.Random(0)
+
+    print(f"{'rows':>10} {'order by random()':>20} {'key seek':>12} {'speedup':>8}")
+    for size in sizes:
+        with engine.begin() as conn:
+            _populate(conn, size)
+
+        with engine.connect() as conn:
+            bounds = conn.execute(bounds_statement()).one()
+            old_time = _time_per_call(
+                conn, lambda: order_by_random, max(1, repeat // 10)
+            )
+            new_time = _time_per_call(
+                conn,
+                lambda bounds=bounds: pick_statement(rng.randint(*bounds)),
+                repeat,
+            )
+
+        print(
+            f"{size:>10} {old_time * 1000:>17.3f} ms {new_time * 1000:>9.3f} ms "
+            f"{old_time / new_time:>7.0f}x"
+        )
+
+    with engine.begin() as conn:
+        YouTubeVideo.__table__.drop(conn, checkfirst=True)
+
+
+def main() -> None:
+    """
+    Parses command line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="sqlite://", help="SQLAlchemy database URL")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.url, args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmarks cog loading from a cold interpreter.
+
+Each run starts a fresh Python process, builds an ``AsdanaBot`` without
+connecting it and loads every cog. The database setup and gateway login that
+precede cog loading in ``main`` are stood in for by a sleep of ``--io-delay``
+seconds. In ``serial`` mode cogs are imported after it, in ``preload`` mode
+on a worker thread during it. The median time from start to all cogs being
+registered is printed for both modes, followed by the per-cog startup report
+of the last run, so slow cogs and regressions show up without starting the
+bot for real. Cogs whose setup needs a logged-in bot report as failed here.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --io-delay 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+from unittest.mock import MagicMock
+
+DEFAULT_RUNS = 5
+DEFAULT_IO_DELAY = 0.3  # seconds
+
+
+async def _load(preload: bool, io_delay: float) -> dict:
+    # Imported here so the import cost is part of the measured child process
+    import discord  # pylint: disable=import-outside-toplevel
+
+    from asdana.core.bot import AsdanaBot  # pylint: disable=import-outside-toplevel
+
+    started = time.perf_counter()
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+    )
+    if preload:
+        bot.start_cog_preload()
+    await asyncio.sleep(io_delay)
+    await bot.load_cogs(preload=preload)
+    return {
+        "total": time.perf_counter() - started,
+        "cogs": [
+            [timing.module_path, timing.import_time, timing.setup_time, timing.error]
+            for timing in bot.cog_timings
+        ],
+    }
+
+
+def _measure(preload: bool, io_delay: float) -> dict:
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_startup",
+            "--child",
+            str(int(preload)),
+            "--io-delay",
+            str(io_delay),
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run(runs: int, io_delay: float) -> None:
+    """
+    Runs the benchmark and prints the medians and the last startup report.
+    :param runs: Number of cold starts per mode.
+    :param io_delay: Seconds of simulated network I/O before cogs are loaded.
+    """
+    # Imported here so the parent process does not warm the children's caches
+    from asdana.core.startup import (  # pylint: disable=import-outside-toplevel
+        CogTiming,
+        format_startup_report,
+    )
+
+    last = None
+    print(f"{'mode':>10} {'median':>10} {'min':>10}")
+    for preload in (False, True):
+        results = [_measure(preload, io_delay) for _ in range(runs)]
+        totals = [result["total"] for result in results]
+        print(
+            f"{'preload' if preload else 'serial':>10} "
+            f"{statistics.median(totals) * 1000:>7.0f} ms {min(totals) * 1000:>7.0f} ms"
+        )
+        last = results[-1]
+
+    timings = []
+    for module_path, import_time, setup_time, error in last["cogs"]:
+        timing = CogTiming(module_path)
+        timing.import_time, timing.setup_time, timing.error = (
+            import_time,
+            setup_time,
+            error,
+        )
+        timings.append(timing)
+    print()
+    print(format_startup_report(timings, last["total"]))
+
+
+def main() -> None:
+    """
+    Parses command line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument(
+        "--io-delay",
+        type=float,
+        default=DEFAULT_IO_DELAY,
+        help="Seconds of simulated database setup and login",
+    )
+    parser.add_argument("--child", choices=("0", "1"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        print(json.dumps(asyncio.run(_load(args.child == "1", args.io_delay))))
+        return
+    run(args.runs, args.io_delay)
+
+
+if __name__ == "__main__":
+    main()
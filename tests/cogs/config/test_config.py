@@ -2,15 +2,16 @@
 Tests for the Config cog.
 """
 
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
 
 import discord
 import pytest
+from discord.ext import commands
 
 from asdana.cogs.config import setup
 from asdana.cogs.config.config import Config
 from asdana.database.models import GuildSettings, CogSettings
-from tests.helpers import setup_bot_with_cog
+from tests.helpers import setup_bot_with_cog, slash_can_run
 
 # pylint: disable=too-few-public-methods,protected-access
 
@@ -131,3 +132,42 @@ class MockUser:
         self.roles = roles or []
         self.guild_permissions = Mock()
         self.guild_permissions.administrator = is_admin
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", ["config prefix", "config show", "config cog disable"])
+async def test_slash_subcommands_are_admin_only(name):
+    """
+    Test that slash subcommands are limited to admins in a server, as they do
+    not run the checks of their hybrid group.
+    """
+    bot = await setup_bot_with_cog(setup)
+    guild = MockGuild()
+    admin = MockUser(user_id=333333333, is_admin=True)
+    member = MockUser(user_id=444444444)
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+
+    with (
+        patch("asdana.cogs.config.config.get_session", return_value=session),
+        patch.object(
+            GuildSettings,
+            "get_or_create",
+            AsyncMock(return_value=Mock(admin_role_ids=[])),
+        ),
+    ):
+        assert await slash_can_run(bot, name, guild=guild, author=admin)
+        with pytest.raises(commands.MissingPermissions):
+            await slash_can_run(bot, name, guild=guild, author=member)
+        with pytest.raises(commands.NoPrivateMessage):
+            await slash_can_run(bot, name, guild=None, author=admin)
+
+
+@pytest.mark.asyncio
+async def test_config_slash_group_is_for_admins_in_servers():
+    """Test that Discord only offers /config to administrators in servers."""
+    bot = await setup_bot_with_cog(setup)
+    group = bot.get_command("config").app_command
+
+    assert group.guild_only
+    assert group.default_permissions.administrator
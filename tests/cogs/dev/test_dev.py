@@ -0,0 +1,51 @@
+"""
+Tests for the Dev cog.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+from discord.ext import commands
+
+from asdana.cogs.dev import setup
+from tests.helpers import setup_bot_with_cog, slash_can_run
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "profile start",
+        "profile stop",
+        "memory start",
+        "memory snapshot",
+        "memory baseline",
+        "memory stop",
+        "memory counts",
+    ],
+)
+async def test_subcommands_are_owner_only(name):
+    """
+    Test that slash subcommands check for the owner, as they do not run the
+    checks of their hybrid group.
+    """
+    bot = await setup_bot_with_cog(setup)
+    bot.owner_id = 1
+
+    with pytest.raises(commands.NotOwner):
+        await slash_can_run(bot, name, author=Mock(id=2))
+    assert await slash_can_run(bot, name, author=Mock(id=1))
+
+
+async def test_ginfo_fetches_an_uncached_owner():
+    """Test that the owner is fetched when members are not cached."""
+    bot = await setup_bot_with_cog(setup)
+    context = MagicMock()
+    context.send = AsyncMock()
+    context.guild.owner = None
+    context.guild.owner_id = 42
+    context.guild.fetch_member = AsyncMock(return_value="Owner#0001")
+
+    await bot.get_command("ginfo").callback(bot.get_cog("Dev"), context)
+
+    context.guild.fetch_member.assert_awaited_once_with(42)
+    assert "Owner: Owner#0001" in context.send.call_args.args[0]
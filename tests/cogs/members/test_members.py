@@ -2,6 +2,8 @@
 Tests for the Members cog.
 """
 
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 from asdana.cogs.members import setup, Members
 from tests.helpers import setup_bot_with_cog
@@ -28,3 +30,21 @@ async def test_does_not_add_duplicate_members_cog():
     if "Members" not in bot.cogs:
         await setup(bot)
     assert len(bot.cogs) == initial_cog_count
+
+
+@pytest.mark.asyncio
+async def test_member_count_chunks_guild_on_demand():
+    """
+    Test that membercount fetches the member list before counting.
+    """
+    bot = await setup_bot_with_cog(setup)
+    guild = MagicMock(chunked=False, chunk=AsyncMock())
+    guild.members = [MagicMock(bot=False), MagicMock(bot=True)]
+    context = AsyncMock(guild=guild, interaction=None)  # Invoked from a message
+    command = bot.get_command("membercount")
+
+    assert await command.can_run(context)
+    await command.callback(bot.get_cog("Members"), context)
+
+    guild.chunk.assert_awaited_once_with(cache=True)
+    context.send.assert_called_once_with("👥 **2** members (humans: 1, bots: 1)")
@@ -0,0 +1,44 @@
+"""
+Tests for the shard-aware startup of the ReactionMenu cog.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from discord.ext import commands
+
+from asdana.cogs.menus.reaction_menu import ReactionMenu
+
+
+def _sharded_bot(shard_ids):
+    bot = MagicMock(spec=commands.AutoShardedBot)
+    bot.shard_ids = shard_ids
+    bot.is_ready.return_value = False
+    bot.loop = MagicMock()
+    # Close the background coroutines instead of scheduling them
+    bot.loop.create_task.side_effect = lambda coro: coro.close() or MagicMock()
+    return bot
+
+
+def test_cleanup_runs_only_with_shard_zero():
+    """Test that only the process running shard 0 cleans up menus."""
+    assert ReactionMenu(_sharded_bot([2, 3])).menu_cleanup_task is None
+    assert ReactionMenu(_sharded_bot([0, 1])).menu_cleanup_task is not None
+
+
+@pytest.mark.asyncio
+async def test_menus_are_restored_once_per_ready_shard():
+    """Test that each shard restores its menus when it first becomes ready."""
+    bot = _sharded_bot([0, 1])
+    cog = ReactionMenu(bot)
+    cog.load_persistent_menus = AsyncMock()
+
+    await cog.on_shard_ready(1)
+    await cog.on_shard_ready(1)
+    await cog.on_shard_ready(0)
+
+    bot.loop.create_task.assert_called_once()  # Only the cleanup task
+    assert [call.args for call in cog.load_persistent_menus.await_args_list] == [
+        (1,),
+        (0,),
+    ]
@@ -0,0 +1,166 @@
+"""
+Tests for the dice notation parser and roller.
+"""
+
+import random
+import sys
+from unittest.mock import AsyncMock
+
+import pytest
+
+from asdana.cogs.random import dice, setup
+from tests.helpers import setup_bot_with_cog
+
+# pylint: disable=too-few-public-methods
+
+needs_binomial = pytest.mark.skipif(
+    sys.version_info < (3, 12), reason="random.binomialvariate needs Python 3.12"
+)
+
+
+class SequenceRng:
+    """
+    Stand-in generator that returns fixed die results in order.
+    """
+
+    def __init__(self, values):
+        self.values = iter(values)
+
+    def randint(self, _low, _high):
+        """Returns the next fixed value."""
+        return next(self.values)
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("20", "1d20"),
+        ("d%", "1d100"),
+        ("4d6k3", "4d6kh3"),
+        ("2D20KL1 + 5", "2d20kl1 + 5"),
+        ("12d6+3-1d4", "12d6 - 1d4 + 3"),
+        ("10d6!", "10d6!"),
+        ("-d6", "- 1d6"),
+    ],
+)
+def test_parse_normalizes_expressions(expression, expected):
+    """Test that valid expressions parse into their canonical form."""
+    assert str(dice.parse(expression)) == expected
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "",
+        "5+3",
+        "d6 d6",
+        "2x6",
+        "0d6",
+        "d0",
+        f"d{dice.MAX_SIDES + 1}",
+        f"{dice.MAX_DICE + 1}d6",
+        "4d6kh5",
+        "4d6!kh3",
+        "10d1!",
+        "+".join(["d6"] * (dice.MAX_TERMS + 1)),
+        "1" * (dice.MAX_EXPRESSION_LENGTH + 1),
+    ],
+)
+def test_parse_rejects_invalid_expressions(expression):
+    """Test that malformed or oversized expressions are rejected."""
+    with pytest.raises(dice.DiceError):
+        dice.parse(expression)
+
+
+@pytest.mark.parametrize(
+    "expression, total, shown",
+    [
+        ("4d6kh3", 14, "4d6kh3 [6, 5, ~~1~~, 3]"),
+        ("4d6kl1", 1, "4d6kl1 [~~6~~, ~~5~~, 1, ~~3~~]"),
+        ("4d6dh1", 9, "4d6dh1 [~~6~~, 5, 1, 3]"),
+        ("4d6dl1", 14, "4d6dl1 [6, 5, ~~1~~, 3]"),
+    ],
+)
+def test_keep_and_drop_small_pools(expression, total, shown):
+    """Test that keep and drop modifiers pick the right dice."""
+    result = dice.roll(expression, SequenceRng([6, 5, 1, 3]))
+
+    assert result.total == total
+    assert str(result) == shown
+
+
+def test_exploding_dice_add_rerolls():
+    """Test that a die showing its maximum is rolled again and added."""
+    result = dice.roll("2d6!+1", SequenceRng([6, 6, 2, 4]))
+
+    assert result.results[0].rolls == [14, 4]
+    assert result.total == 19
+
+
+def test_face_counts_rolls_small_pools_individually():
+    """Test that pools with fewer dice than sides are counted exactly."""
+    counts = dice.face_counts(SequenceRng([3, 3, 7]), 3, 10)
+
+    assert counts == {3: 2, 7: 1}
+
+
+@needs_binomial
+def test_face_counts_aggregates_large_pools():
+    """Test that large pools produce one count per face summing to the pool."""
+    counts = dice.face_counts(random.Random(1), 10_000_000, 6)
+
+    assert sum(counts.values()) == 10_000_000
+    assert set(counts) == set(range(1, 7))
+    for number in counts.values():
+        assert abs(number - 10_000_000 / 6) < 10_000
+
+
+@needs_binomial
+def test_large_pool_total_is_near_expectation():
+    """Test that a huge pool sums close to its mean without listing rolls."""
+    result = dice.roll("100000000d1000", random.Random(2))
+
+    assert result.results[0].rolls is None
+    assert abs(result.total - 100_000_000 * 500.5) < 100_000_000
+    assert str(result).startswith("100000000d1000 (")
+
+
+@needs_binomial
+def test_large_pool_keep_highest_uses_top_faces():
+    """Test that keeping a few dice of a huge pool keeps maximum faces."""
+    result = dice.roll("1000000d20kh100", random.Random(3))
+
+    assert result.total == 100 * 20
+
+
+@needs_binomial
+def test_large_exploding_pool_exceeds_plain_maximum_share():
+    """Test that exploding a large pool adds the expected extra rolls."""
+    result = dice.roll("1000000d2!", random.Random(4))
+
+    # Each exploding d2 averages 3 instead of 1.5
+    assert abs(result.total - 3_000_000) < 20_000
+
+
+@pytest.mark.asyncio
+async def test_roll_command_reports_invalid_expression():
+    """Test that the roll command explains malformed expressions."""
+    bot = await setup_bot_with_cog(setup)
+    context = AsyncMock()
+
+    await bot.get_cog("Random").roll(context, expression="2x6")
+
+    assert context.send.call_args[0][0].startswith("❌")
+
+
+@pytest.mark.asyncio
+async def test_roll_command_shows_terms_and_total(monkeypatch):
+    """Test that multi-die rolls list the dice and the total."""
+    bot = await setup_bot_with_cog(setup)
+    context = AsyncMock()
+    values = iter([4, 2])
+    monkeypatch.setattr(random, "randint", lambda _low, _high: next(values))
+
+    await bot.get_cog("Random").roll(context, expression="2d6+3")
+
+    context.send.assert_called_once_with("🎲 2d6 [4, 2] + 3 = **9**")
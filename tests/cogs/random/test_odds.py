@@ -0,0 +1,191 @@
+"""
+Tests for the exact dice probability calculator.
+"""
+
+import itertools
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+from fractions import Fraction
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from asdana.cogs.random import dice, odds, setup
+from tests.helpers import setup_bot_with_cog
+
+
+def _brute_force(expression: str) -> dict[int, int]:
+    """Counts the outcomes of a small expression by enumerating every roll."""
+    parsed = dice.parse(expression)
+    pools = [
+        itertools.product(range(1, term.sides + 1), repeat=term.count)
+        for term in parsed.terms
+    ]
+    totals = Counter()
+    for rolls in itertools.product(*pools):
+        total = parsed.modifier
+        for term, pool in zip(parsed.terms, rolls):
+            kept = sorted(pool, reverse=term.keeps_highest)[: term.kept_dice]
+            total += term.sign * sum(kept)
+        totals[total] += 1
+    return dict(totals)
+
+
+def _as_dict(distribution: odds.Distribution) -> dict[int, int]:
+    return {
+        distribution.offset + index: count
+        for index, count in enumerate(distribution.counts)
+        if count
+    }
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["2d6", "7d4+2", "4d6kh3", "5d6kl2", "4d6dh1", "4d6dl1", "3d20kh1", "2d8-1d6+1"],
+)
+def test_distribution_matches_brute_force(expression):
+    """Test that computed distributions count every outcome exactly."""
+    distribution = odds.expression_distribution(
+        dice.parse(expression), odds.DistributionCache()
+    )
+
+    assert _as_dict(distribution) == _brute_force(expression)
+
+
+def test_probability_is_exact():
+    """Test comparisons against a known exact probability."""
+    distribution = odds.expression_distribution(dice.parse("2d6"))
+
+    assert distribution.probability(">=", 7) == Fraction(7, 12)
+    assert distribution.probability("=", 7) == Fraction(1, 6)
+    assert distribution.probability("<", 2) == 0
+    assert distribution.mean() == 7
+
+
+def test_large_counts_use_repeated_squaring():
+    """Test that only logarithmically many powers are built and cached."""
+    cache = odds.DistributionCache()
+
+    distribution = odds.expression_distribution(dice.parse("100d6"), cache)
+
+    for count in (1, 3, 6, 12, 25, 50, 100):
+        assert (count, 6, None, 0) in cache
+    # The powers above plus the whole expression
+    assert len(cache) == 8
+    assert distribution.total == 6**100
+    assert distribution.mean() == 350
+
+
+def test_popular_expressions_come_from_cache():
+    """Test that repeating a query is answered by a single cache hit."""
+    cache = odds.DistributionCache()
+    expression = dice.parse("8d6")
+    first = odds.expression_distribution(expression, cache)
+    hits = cache.hits
+
+    assert odds.expression_distribution(expression, cache) is first
+    assert cache.hits == hits + 1
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the cache stays within its entry bound in LRU order."""
+    cache = odds.DistributionCache(max_entries=2)
+    cache.put("a", odds.Distribution(1, [1]))
+    cache.put("b", odds.Distribution(1, [1]))
+    cache.get("a")
+    cache.put("c", odds.Distribution(1, [1]))
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+
+
+def test_cache_respects_memory_bound():
+    """Test that the cache evicts entries to stay under its byte budget."""
+    large = odds.Distribution(0, [10**100] * 100)
+    cache = odds.DistributionCache(max_bytes=large.size_bytes * 2)
+
+    for key in range(5):
+        cache.put(key, odds.Distribution(0, [10**100] * 100))
+
+    assert len(cache) == 2
+    assert cache.size_bytes <= cache.max_bytes
+    cache.put("huge", odds.Distribution(0, [10**100] * 1000))
+    assert "huge" not in cache
+
+
+@pytest.mark.parametrize("expression", ["10d6!", "10000d100", "100d20kh50"])
+def test_rejects_expressions_over_limits(expression):
+    """Test that unbounded or oversized distributions are refused."""
+    with pytest.raises(dice.DiceError):
+        odds.expression_distribution(dice.parse(expression))
+
+
+def test_parse_query_splits_comparison():
+    """Test that odds queries separate the expression and comparison."""
+    expression, op, value = odds.parse_query("8d6 >= 30")
+
+    assert (str(expression), op, value) == ("8d6", ">=", 30)
+    assert odds.parse_query("3d20kh1")[1:] == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_odds_command_reports_probability():
+    """Test that the odds command answers comparison queries exactly."""
+    bot = await setup_bot_with_cog(setup)
+    context = AsyncMock()
+
+    await bot.get_cog("Random").dice_odds(context, query="2d6 >= 7")
+
+    context.send.assert_called_once_with("🎲 P(2d6 >= 7) = **58.3333%** (7/12)")
+
+
+@pytest.mark.asyncio
+async def test_odds_command_shows_distribution():
+    """Test that the odds command summarizes a distribution."""
+    bot = await setup_bot_with_cog(setup)
+    context = AsyncMock()
+
+    await bot.get_cog("Random").dice_odds(context, query="3d20kh1")
+
+    message = context.send.call_args[0][0]
+    assert message.startswith("🎲 **3d20kh1**: 1 to 20")
+    assert "```" in message
+
+
+@pytest.mark.asyncio
+async def test_odds_command_serves_repeats_from_the_cache():
+    """Test that only the first query for an expression is offloaded."""
+    odds.default_cache().clear()
+    bot = await setup_bot_with_cog(setup)
+    bot.executor = MagicMock()
+    bot.executor.run = AsyncMock(return_value=odds.Distribution(2, [1, 2, 1]))
+    context = AsyncMock()
+    cog = bot.get_cog("Random")
+    hits = odds.default_cache().hits
+
+    await cog.dice_odds(context, query="2d2 >= 3")
+    await cog.dice_odds(context, query="2d2 >= 3")
+
+    bot.executor.run.assert_awaited_once()
+    assert context.send.call_args[0][0].startswith("🎲 P(2d2 >= 3) = **75.0000%**")
+    assert odds.default_cache().hits == hits + 1
+    lookups = next(
+        family
+        for family in cog.collect_metrics()
+        if family.name == "asdana_cache_lookups_total"
+    )
+    assert f'result="hit"}} {hits + 1}' in lookups.render()
+    odds.default_cache().clear()
+
+
+@pytest.mark.asyncio
+async def test_odds_command_reports_a_broken_process_pool():
+    """Test that a crashed worker is answered instead of raised."""
+    odds.default_cache().clear()
+    bot = await setup_bot_with_cog(setup)
+    bot.executor = MagicMock()
+    bot.executor.run = AsyncMock(side_effect=BrokenProcessPool())
+    context = AsyncMock()
+
+    await bot.get_cog("Random").dice_odds(context, query="9d9")
+
+    assert context.send.call_args[0][0].startswith("❌")
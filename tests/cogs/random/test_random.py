@@ -8,6 +8,7 @@ import pytest
 
 from asdana.cogs.random import setup
 from asdana.cogs.random.random import Random
+from asdana.core.config import get_config
 from tests.helpers import setup_bot_with_cog
 
 # pylint: disable=too-few-public-methods
@@ -65,7 +66,7 @@ async def test_roll_command_sends_dice_result():
     cog = bot.get_cog("Random")
 
     with patch("asdana.cogs.random.random.random.randint", return_value=15):
-        await cog.roll(context, sides=20)
+        await cog.roll(context, expression="20")
 
     context.send.assert_called_once()
     call_args = context.send.call_args[0][0]
@@ -112,3 +113,49 @@ async def test_roll_command_uses_default_sides():
     # Check that randint was called with default sides (1, 20)
     mock_randint.assert_called_once_with(1, 20)
     context.send.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_vroulette_sends_video_from_pool():
+    """
+    Test that the vroulette command sends a video taken from the pool.
+    """
+    bot = await setup_bot_with_cog(setup)
+    context = AsyncMock()
+    cog = bot.get_cog("Random")
+    cog.video_pool.get = AsyncMock(return_value="dQw4w9WgXcQ")
+
+    with patch.object(get_config(), "youtube_api_key", "key"):
+        await cog.random_yt_video(context)
+
+    context.send.assert_called_once()
+    assert "watch?v=dQw4w9WgXcQ" in context.send.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_vroulette_reports_empty_pool():
+    """
+    Test that the vroulette command reports when no video is available.
+    """
+    bot = await setup_bot_with_cog(setup)
+    context = AsyncMock()
+    cog = bot.get_cog("Random")
+    cog.video_pool.get = AsyncMock(return_value=None)
+
+    with patch.object(get_config(), "youtube_api_key", "key"):
+        await cog.random_yt_video(context)
+
+    context.send.assert_called_once()
+    assert "❌" in context.send.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_random_commands_are_slash_commands():
+    """
+    Test that the Random cog's commands are also registered as slash commands.
+    """
+    bot = await setup_bot_with_cog(setup)
+
+    assert {"random", "roll", "odds", "vroulette"} <= {
+        command.name for command in bot.tree.get_commands()
+    }
@@ -0,0 +1,97 @@
+"""
+Tests for the prefetched video pool.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from asdana.cogs.random.video_pool import VideoPool
+from asdana.utils.rate_limit import RateLimiter
+
+
+def _unlimited():
+    return RateLimiter(1000, 1, burst=1000)
+
+
+@pytest.mark.asyncio
+async def test_get_waits_for_first_refill():
+    """Test that an empty pool fetches before answering."""
+    fetch = AsyncMock(return_value=["a", "b", "c"])
+    pool = VideoPool(fetch, capacity=3, low_water=1, rate_limiter=_unlimited())
+
+    try:
+        assert await pool.get(timeout=1) == "a"
+    finally:
+        await pool.stop()
+
+    fetch.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_get_is_served_from_pool_after_refill():
+    """Test that later commands are answered without fetching again."""
+    fetch = AsyncMock(return_value=["a", "b", "c", "d"])
+    pool = VideoPool(fetch, capacity=4, low_water=1, rate_limiter=_unlimited())
+
+    try:
+        first = await pool.get(timeout=1)
+        await asyncio.sleep(0)
+        calls = fetch.call_count
+        rest = [await pool.get(timeout=1) for _ in range(2)]
+    finally:
+        await pool.stop()
+
+    assert [first, *rest] == ["a", "b", "c"]
+    assert fetch.call_count == calls
+
+
+@pytest.mark.asyncio
+async def test_refill_stops_at_capacity():
+    """Test that the pool never holds more than its capacity."""
+    fetch = AsyncMock(side_effect=lambda: [str(i) for i in range(10)])
+    pool = VideoPool(fetch, capacity=5, low_water=2, rate_limiter=_unlimited())
+
+    pool.start()
+    await asyncio.sleep(0.05)
+    await pool.stop()
+
+    assert len(pool) == 5
+    assert fetch.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_refill_tops_up_below_low_water():
+    """Test that dropping below the low-water mark triggers a refill."""
+    batches = iter([["a", "b", "c"], ["d", "e"]])
+    fetch = AsyncMock(side_effect=lambda: next(batches))
+    pool = VideoPool(fetch, capacity=3, low_water=2, rate_limiter=_unlimited())
+
+    try:
+        await pool.get(timeout=1)  # Leaves two, at the low-water mark
+        await pool.get(timeout=1)  # Leaves one, below the mark
+        await asyncio.sleep(0.05)
+    finally:
+        await pool.stop()
+
+    assert fetch.call_count == 2
+    assert len(pool) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_returns_none_on_timeout():
+    """Test that get gives up when no videos arrive in time."""
+    fetch = AsyncMock(return_value=[])
+    pool = VideoPool(fetch, capacity=2, low_water=1, rate_limiter=RateLimiter(1, 10))
+
+    try:
+        assert await pool.get(timeout=0.05) is None
+    finally:
+        await pool.stop()
+
+
+def test_rejects_low_water_at_or_above_capacity():
+    """Test that the low-water mark must be below the capacity."""
+    with pytest.raises(ValueError):
+        VideoPool(AsyncMock(), capacity=5, low_water=5)
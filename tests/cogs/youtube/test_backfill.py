@@ -0,0 +1,142 @@
+"""
+Tests for the YouTube title backfill, run against a local HTTP stand-in.
+"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+from sqlalchemy import create_engine, insert, select
+
+from asdana.cogs.youtube.backfill import UNAVAILABLE_TITLE, TitleBackfill
+from asdana.database.models import YouTubeVideo
+from asdana.utils.youtube_api import YouTubeApiClient
+
+
+class SyncSession:
+    """
+    Async facade over a synchronous SQLite connection.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def execute(self, statement):
+        """Run the statement on the wrapped connection."""
+        return self.connection.execute(statement)
+
+    async def commit(self):
+        """Commit the wrapped connection."""
+        self.connection.commit()
+
+
+@pytest.fixture(name="database")
+def fixture_database():
+    """An in-memory yt_videos table with untitled and titled rows."""
+    engine = create_engine("sqlite://")
+    YouTubeVideo.__table__.create(engine)
+    with engine.connect() as connection:
+        rows = [{"video_id": f"vid{i:08d}"} for i in range(120)]
+        rows.append({"video_id": "gone0000000"})
+        connection.execute(insert(YouTubeVideo), rows)
+        connection.execute(
+            insert(YouTubeVideo).values(video_id="titled00000", title="Already here")
+        )
+        connection.commit()
+        yield connection
+
+
+@pytest.fixture(name="api")
+async def fixture_api():
+    """A YouTube API client backed by a local stand-in for videos.list."""
+
+    async def videos(request):
+        ids = request.query["id"].split(",")
+        items = [
+            {"id": video_id, "snippet": {"title": f"Title of {video_id}"}}
+            for video_id in ids
+            if not video_id.startswith("gone")
+        ]
+        return web.json_response({"items": items})
+
+    app = web.Application()
+    app.router.add_get("/videos", videos)
+    server = TestServer(app)
+    await server.start_server()
+    async with ClientSession() as session:
+        yield YouTubeApiClient(session, "key", base_url=str(server.make_url("/")))
+    await server.close()
+
+
+def _backfill(api, database, batch_size):
+    @asynccontextmanager
+    async def session_factory():
+        yield SyncSession(database)
+
+    return TitleBackfill(api, session_factory=session_factory, batch_size=batch_size)
+
+
+@pytest.mark.asyncio
+async def test_backfill_fills_every_untitled_row(api, database):
+    """Test that all untitled rows get a title and titled rows are untouched."""
+    updated = await _backfill(api, database, batch_size=100).run()
+
+    assert updated == 121
+    titles = dict(
+        database.execute(select(YouTubeVideo.video_id, YouTubeVideo.title)).all()
+    )
+    assert titles["vid00000007"] == "Title of vid00000007"
+    assert titles["gone0000000"] == UNAVAILABLE_TITLE
+    assert titles["titled00000"] == "Already here"
+    assert None not in titles.values()
+
+
+@pytest.mark.asyncio
+async def test_backfill_uses_at_most_fifty_ids_per_call(api, database):
+    """Test that batches are split into 50-ID videos.list calls."""
+    requests = []
+    original = api.list_videos
+
+    async def recording_list_videos(video_ids, part):
+        video_ids = list(video_ids)
+        requests.append(video_ids)
+        return await original(video_ids, part=part)
+
+    api.list_videos = recording_list_videos
+    await _backfill(api, database, batch_size=100).run()
+
+    assert [len(ids) for ids in requests] == [50, 50, 21]
+
+
+@pytest.mark.asyncio
+async def test_backfill_resumes_after_interruption(api, database):
+    """Test that a new job picks up where an interrupted one stopped."""
+    assert await _backfill(api, database, batch_size=50).run(max_batches=1) == 50
+
+    assert await _backfill(api, database, batch_size=50).run() == 71
+    assert await _backfill(api, database, batch_size=50).run() == 0
+
+
+@pytest.mark.asyncio
+async def test_backfill_holds_no_session_during_api_calls(api, database):
+    """Test that the connection is released while titles are looked up."""
+    open_sessions = []
+    original = api.list_videos
+
+    @asynccontextmanager
+    async def session_factory():
+        open_sessions.append(True)
+        try:
+            yield SyncSession(database)
+        finally:
+            open_sessions.pop()
+
+    async def checking_list_videos(video_ids, part):
+        assert not open_sessions
+        return await original(video_ids, part=part)
+
+    api.list_videos = checking_list_videos
+    backfill = TitleBackfill(api, session_factory=session_factory, batch_size=100)
+
+    assert await backfill.run() == 121
@@ -0,0 +1,151 @@
+"""
+Tests for bulk YouTube video ingestion.
+"""
+
+import io
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+import pytest
+
+from asdana.cogs.youtube.ingest import (
+    VideoIngestor,
+    chain,
+    iter_playlist,
+    iter_stream,
+    parse_video_id,
+)
+
+
+class FakeDatabase:
+    """
+    Records inserted batches and serves existing rows for priming and
+    lookups.
+    """
+
+    def __init__(self, existing):
+        self.rows = dict(enumerate(existing, start=1))
+        self.inserted_batches = []
+
+    async def execute(self, statement):
+        """Answer bounds, priming, lookup and insert statements."""
+        result = MagicMock()
+        params = statement.compile().params
+        if statement.is_insert:
+            batch = list(params.values())
+            self.inserted_batches.append(batch)
+            new = [video_id for video_id in batch if video_id not in self.stored]
+            for video_id in new:
+                self.rows[len(self.rows) + 1] = video_id
+            result.rowcount = len(new)
+        elif "video_id_1" in params:
+            result.scalars.return_value.all.return_value = [
+                video_id for video_id in params["video_id_1"] if video_id in self.stored
+            ]
+        elif "id_1" in params:
+            last_id = params["id_1"]
+            result.all.return_value = [
+                (key, value) for key, value in self.rows.items() if key > last_id
+            ]
+        else:
+            keys = list(self.rows) or [None]
+            result.one.return_value = (min(keys), max(keys))
+        return result
+
+    @property
+    def stored(self):
+        """The stored video IDs."""
+        return set(self.rows.values())
+
+    async def commit(self):
+        """Nothing to commit."""
+
+    @asynccontextmanager
+    async def session(self):
+        """Mimic get_session()."""
+        yield self
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("  dQw4w9WgXcQ\n", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=1", "dQw4w9WgXcQ"),
+        ("https://youtu.be/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/shorts/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("not a video", None),
+        ("dQw4w9WgXcQQ", None),
+    ],
+)
+def test_parse_video_id(text, expected):
+    """Test that IDs are extracted from bare IDs and URLs."""
+    assert parse_video_id(text) == expected
+
+
+@pytest.mark.asyncio
+async def test_iter_stream_yields_lines():
+    """Test that streams are read line by line."""
+    lines = [line async for line in iter_stream(io.StringIO("a\nb\nc\n"))]
+    assert lines == ["a\n", "b\n", "c\n"]
+
+
+@pytest.mark.asyncio
+async def test_iter_playlist_follows_pages():
+    """Test that playlist pages are followed until the last one."""
+    client = MagicMock()
+    pages = {None: (["a", "b"], "next"), "next": (["c"], None)}
+
+    async def playlist_page(_playlist_id, page_token):
+        return pages[page_token]
+
+    client.playlist_page = playlist_page
+
+    assert [video async for video in iter_playlist(client, "PL")] == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_ingest_batches_and_deduplicates():
+    """Test that known and repeated IDs are skipped and the rest batched."""
+    database = FakeDatabase(["aaaaaaaaaaa"])
+    ingestor = VideoIngestor(database.session, batch_size=2, expected_new=100)
+    lines = ["aaaaaaaaaaa", "bbbbbbbbbbb", "garbage", "ccccccccccc", "bbbbbbbbbbb"]
+    lines.append("ddddddddddd")
+
+    stats = await ingestor.ingest(chain([_aiter(lines[:3]), _aiter(lines[3:])]))
+
+    assert database.inserted_batches == [
+        ["bbbbbbbbbbb"],
+        ["ccccccccccc"],
+        ["ddddddddddd"],
+    ]
+    assert stats.read == 6
+    assert stats.inserted == 3
+    assert stats.duplicates == 2
+    assert stats.invalid == 1
+
+
+@pytest.mark.asyncio
+async def test_ingest_keeps_new_ids_the_filter_reports_as_seen():
+    """Test that a Bloom filter false positive does not drop a new video."""
+    database = FakeDatabase(["aaaaaaaaaaa"])
+    ingestor = VideoIngestor(database.session, batch_size=10)
+    ingestor.seen = MagicMock()
+    ingestor.seen.__contains__.return_value = True  # Every ID is a hit
+
+    stats = await ingestor.ingest(_aiter(["aaaaaaaaaaa", "bbbbbbbbbbb"]))
+
+    assert database.inserted_batches == [["bbbbbbbbbbb"]]
+    assert stats.inserted == 1
+    assert stats.duplicates == 1
+
+
+def test_rejects_oversized_batches():
+    """Test that batches beyond the bind parameter limit are refused."""
+    with pytest.raises(ValueError):
+        VideoIngestor(batch_size=100_000)
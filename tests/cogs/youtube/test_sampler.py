@@ -0,0 +1,95 @@
+"""
+Tests for the random YouTube video sampler.
+"""
+
+import random
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from asdana.cogs.youtube.sampler import RandomVideoSampler, pick_statement
+
+
+def _result(one=None, scalar=None):
+    result = MagicMock()
+    result.one.return_value = one
+    result.scalar.return_value = scalar
+    return result
+
+
+@pytest.mark.asyncio
+async def test_sample_returns_none_for_empty_table():
+    """Test that sampling an empty table returns None without picking."""
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_result(one=(None, None)))
+
+    sampler = RandomVideoSampler()
+
+    assert await sampler.sample(session) is None
+    session.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_sample_reuses_cached_bounds():
+    """Test that key bounds are only read once while they are fresh."""
+    session = AsyncMock()
+    session.execute = AsyncMock(
+        side_effect=[
+            _result(one=(1, 100)),
+            _result(scalar="abc"),
+            _result(scalar="def"),
+        ]
+    )
+
+    sampler = RandomVideoSampler(rng=random.Random(0))
+
+    assert await sampler.sample(session) == "abc"
+    assert await sampler.sample(session) == "def"
+    assert session.execute.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_sample_refreshes_bounds_when_top_rows_deleted():
+    """Test that a miss past the end of the table re-reads the bounds."""
+    session = AsyncMock()
+    session.execute = AsyncMock(
+        side_effect=[
+            _result(one=(1, 100)),
+            _result(scalar=None),  # Drawn key is past the last row
+            _result(one=(1, 50)),
+            _result(scalar="xyz"),
+        ]
+    )
+
+    sampler = RandomVideoSampler(rng=random.Random(0))
+
+    assert await sampler.sample(session) == "xyz"
+    assert session.execute.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_sample_stays_within_key_bounds():
+    """Test that drawn keys always fall inside the cached bounds."""
+    sampler = RandomVideoSampler(rng=random.Random(1))
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_result(one=(10, 20)))
+    await sampler.refresh(session)
+
+    seen = []
+    session.execute = AsyncMock(
+        side_effect=lambda stmt: seen.append(stmt.compile().params["id_1"])
+        or _result(scalar="v")
+    )
+    for _ in range(50):
+        await sampler.sample(session)
+
+    assert all(10 <= key <= 20 for key in seen)
+
+
+def test_pick_statement_seeks_on_primary_key():
+    """Test that the pick query seeks on the key instead of sorting randomly."""
+    sql = str(pick_statement(5).compile())
+
+    assert "random" not in sql.lower()
+    assert "yt_videos.id >=" in sql
+    assert "LIMIT" in sql
@@ -0,0 +1,144 @@
+"""
+Tests for the per-guild YouTube shuffle bags.
+"""
+
+import random
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from asdana.cogs.youtube.shuffle import FeistelPermutation, ShuffleBagSampler
+from asdana.database.models import GuildVideoShuffle
+
+
+class FakeSession:
+    """
+    Minimal stand-in for an AsyncSession over a dict of video rows.
+    """
+
+    def __init__(self, videos):
+        self.videos = videos
+        self.bags = {}
+        self.commit = AsyncMock()
+
+    async def get(self, _model, guild_id, with_for_update=False):
+        """Return the stored bag for a guild."""
+        assert with_for_update
+        return self.bags.get(guild_id)
+
+    async def execute(self, statement):
+        """Answer bag inserts, bounds queries and primary key lookups."""
+        result = MagicMock()
+        params = statement.compile().params
+        if statement.is_insert:
+            # ON CONFLICT DO NOTHING keeps a bag stored in the meantime
+            self.bags.setdefault(params["guild_id"], GuildVideoShuffle(**params))
+        elif "id_1" in params:
+            result.scalar.return_value = self.videos.get(params["id_1"])
+        elif self.videos:
+            result.one.return_value = (min(self.videos), max(self.videos))
+        else:
+            result.one.return_value = (None, None)
+        return result
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 100, 1000, 4097])
+def test_feistel_permutation_is_a_bijection(size):
+    """Test that every index maps to a distinct element of the range."""
+    permutation = FeistelPermutation(size, seed=12345)
+    assert sorted(permutation(i) for i in range(size)) == list(range(size))
+
+
+def test_feistel_permutation_depends_on_seed():
+    """Test that different seeds give different orders."""
+    first = [FeistelPermutation(50, seed=1)(i) for i in range(50)]
+    second = [FeistelPermutation(50, seed=2)(i) for i in range(50)]
+    assert first != second
+
+
+def test_feistel_permutation_rejects_out_of_range_index():
+    """Test that indices outside the range raise IndexError."""
+    with pytest.raises(IndexError):
+        FeistelPermutation(10, seed=0)(10)
+
+
+@pytest.mark.asyncio
+async def test_draw_does_not_repeat_until_exhausted():
+    """Test that a guild sees every video once before any repeats."""
+    videos = {key: f"video{key}" for key in range(5, 25)}
+    session = FakeSession(videos)
+    sampler = ShuffleBagSampler(rng=random.Random(0))
+
+    first_pass = [await sampler.draw(session, 1) for _ in range(len(videos))]
+    assert sorted(first_pass) == sorted(videos.values())
+
+    bag = session.bags[1]
+    assert isinstance(bag, GuildVideoShuffle)
+    assert bag.cursor == bag.pool_size
+
+    # The next draw starts a fresh pass
+    assert await sampler.draw(session, 1) in videos.values()
+    assert bag.cursor == 1
+
+
+@pytest.mark.asyncio
+async def test_draw_skips_deleted_videos():
+    """Test that holes in the key range are skipped without repeats."""
+    videos = {key: f"video{key}" for key in range(1, 31) if key % 3}
+    session = FakeSession(videos)
+    sampler = ShuffleBagSampler(rng=random.Random(0))
+
+    drawn = [await sampler.draw(session, 1) for _ in range(len(videos))]
+    assert sorted(drawn) == sorted(videos.values())
+
+
+@pytest.mark.asyncio
+async def test_draw_tracks_guilds_independently():
+    """Test that each guild has its own bag."""
+    session = FakeSession({key: f"video{key}" for key in range(1, 11)})
+    sampler = ShuffleBagSampler(rng=random.Random(0))
+
+    await sampler.draw(session, 1)
+    await sampler.draw(session, 2)
+    await sampler.draw(session, 2)
+
+    assert session.bags[1].cursor == 1
+    assert session.bags[2].cursor == 2
+
+
+@pytest.mark.asyncio
+async def test_draw_returns_none_without_videos():
+    """Test that drawing from an empty catalogue returns None."""
+    sampler = ShuffleBagSampler()
+    assert await sampler.draw(FakeSession({}), 1) is None
+
+
+class RacingSession(FakeSession):
+    """
+    A session whose first lookup misses a bag another draw has just stored.
+    """
+
+    def __init__(self, videos, bag):
+        super().__init__(videos)
+        self.bags[bag.guild_id] = bag
+        self.raced = False
+
+    async def get(self, _model, guild_id, with_for_update=False):
+        """Miss the bag once, as if it were inserted right after."""
+        if not self.raced:
+            self.raced = True
+            return None
+        return await super().get(_model, guild_id, with_for_update)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_draw_uses_the_existing_bag():
+    """Test that losing the race to create a bag continues the stored one."""
+    videos = {key: f"video{key}" for key in range(1, 11)}
+    bag = GuildVideoShuffle(guild_id=1, seed=7, base_id=1, pool_size=10, cursor=3)
+    session = RacingSession(videos, bag)
+    sampler = ShuffleBagSampler(rng=random.Random(0))
+
+    assert await sampler.draw(session, 1) in videos.values()
+    assert session.bags[1] is bag
+    assert bag.cursor == 4
@@ -2,13 +2,19 @@
 Tests for the core bot module.
 """
 
-from unittest.mock import AsyncMock, MagicMock, patch
+import threading
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
 
 import discord
 import pytest
 from discord.ext import commands
 
 from asdana.core.bot import AsdanaBot, get_prefix
+from asdana.core.config import Config, set_config
+from asdana.core.executor import OffloadExecutor
+from asdana.core.member_cache import member_cache_flags
+from asdana.core.queries import COMMAND, EVENT, record_statement
+from asdana.core.tracing import Tracer, set_tracer
 
 
 @pytest.mark.asyncio
@@ -186,3 +192,374 @@ async def test_asdana_bot_setup_hook_loads_cogs():
     await bot.setup_hook()
 
     bot.load_cogs.assert_called_once()
+    assert bot.monitor.running
+    await bot.monitor.stop()
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_offloads_work_and_shuts_down_executor():
+    """Test that AsdanaBot runs offloaded work and stops its pools on close."""
+    executor = OffloadExecutor(thread_workers=1, process_workers=0)
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        executor=executor,
+        command_prefix="!",
+        intents=discord.Intents.default(),
+    )
+
+    # Entering the bot sets up the shard queue that closing it needs
+    async with bot:
+        assert await bot.offload(sum, [1, 2, 3]) == 6
+
+    with pytest.raises(RuntimeError):
+        await bot.offload(sum, [1])
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_registers_cogs_in_sorted_order_with_timings():
+    """Test that cogs are registered in a fixed order and timed."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+    )
+    bot.load_extension = AsyncMock()
+
+    with patch("os.walk") as mock_walk:
+        mock_walk.return_value = [
+            ("/fake/path/cogs/zeta", [], ["__init__.py"]),
+            ("/fake/path/cogs/alpha", [], ["__init__.py"]),
+        ]
+        await bot.load_cogs()
+
+    assert [call.args[0] for call in bot.load_extension.call_args_list] == [
+        "asdana.cogs.alpha",
+        "asdana.cogs.zeta",
+    ]
+    assert [timing.module_path for timing in bot.cog_timings] == [
+        "asdana.cogs.alpha",
+        "asdana.cogs.zeta",
+    ]
+    assert bot.cogs_load_time is not None
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_preloads_cogs_on_worker_thread():
+    """Test that cog imports started early finish before registration."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+    )
+    bot.load_extension = AsyncMock()
+    threads = []
+
+    def fake_preimport(timings):
+        threads.append(threading.current_thread())
+        for timing in timings:
+            timing.import_time = 0.5
+
+    with (
+        patch.object(bot, "discover_cogs", return_value=["asdana.cogs.alpha"]),
+        patch("asdana.core.bot.preimport", side_effect=fake_preimport),
+    ):
+        bot.start_cog_preload()
+        await bot.load_cogs()
+
+    assert threads and threads[0] is not threading.main_thread()
+    assert bot.cog_timings[0].import_time == 0.5
+    bot.load_extension.assert_called_once_with("asdana.cogs.alpha")
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_records_time_to_ready_once():
+    """Test that only the first ready event sets the time-to-ready."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+    )
+
+    with patch("asdana.core.bot.process_uptime", side_effect=[2.5, 9.0]):
+        await bot.on_ready()
+        await bot.on_ready()
+
+    assert bot.ready_time == 2.5
+
+
+def test_asdana_bot_counts_dispatched_events_per_shard():
+    """Test that AsdanaBot attributes dispatched events to shards."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+        shard_count=2,
+        shard_ids=[1],
+    )
+    bot.shard_metrics.shard_count = bot.shard_count
+    payload = MagicMock(guild_id=1 << 22)  # Routed to shard 1 of 2
+
+    bot.dispatch("raw_reaction_add", payload)
+    bot.dispatch("socket_event_type", "MESSAGE_CREATE")
+
+    assert bot.shard_metrics.shard(1).events == 1
+    assert 0 not in bot.shard_metrics.stats
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_skips_disabled_cogs():
+    """Test that disabled cog packages are not discovered."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+        disabled_cogs=["YouTube"],
+    )
+
+    cogs = bot.discover_cogs()
+
+    assert "asdana.cogs.youtube" not in cogs
+    assert "asdana.cogs.random" in cogs
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_narrows_intents_to_loaded_cogs():
+    """Test that setup_hook requests only the intents the cogs need."""
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.message_content = True
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=intents,
+        derive_intents=True,
+        member_cache_flags=discord.MemberCacheFlags.none(),
+    )
+
+    async def load_cogs():
+        class Reactions(commands.Cog):
+            """Listens to reactions only."""
+
+            @commands.Cog.listener()
+            async def on_raw_reaction_add(self, payload):
+                """Handles a reaction."""
+
+        await bot.add_cog(Reactions())
+
+    bot.load_cogs = load_cogs
+    await bot.setup_hook()
+
+    assert bot.intents.guilds and bot.intents.reactions
+    # Still needed by the default help command
+    assert bot.intents.message_content
+    assert not bot.intents.members
+    assert not bot.intents.typing
+    assert not bot.intents.presences
+    await bot.monitor.stop()
+
+
+async def test_asdana_bot_keeps_voice_states_for_voice_member_cache():
+    """Test that caching members in voice keeps the voice states intent."""
+    intents = discord.Intents.default()
+    intents.members = True
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=intents,
+        derive_intents=True,
+        member_cache_flags=member_cache_flags("voice"),
+    )
+
+    async def load_cogs():
+        pass
+
+    bot.load_cogs = load_cogs
+    await bot.setup_hook()
+
+    assert bot.intents.voice_states
+    assert not bot.intents.members
+    await bot.monitor.stop()
+
+
+def test_asdana_bot_rejects_unknown_command_mode():
+    """Test that AsdanaBot refuses an unknown command mode."""
+    with pytest.raises(ValueError):
+        AsdanaBot(
+            web_client=MagicMock(),
+            command_prefix="!",
+            intents=discord.Intents.default(),
+            command_mode="voice",
+        )
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_slash_mode_ignores_messages():
+    """Test that slash mode never processes message commands."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+        command_mode="slash",
+    )
+    bot._process_message = AsyncMock()  # pylint: disable=protected-access
+
+    await bot.on_message(MagicMock())
+
+    bot._process_message.assert_not_called()  # pylint: disable=protected-access
+    assert not bot.message_commands
+
+    bot.command_mode = "hybrid"
+    await bot.on_message(MagicMock())
+
+    bot._process_message.assert_awaited_once()  # pylint: disable=protected-access
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_syncs_slash_commands_to_testing_guild():
+    """Test that setup_hook syncs slash commands, only in slash modes."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        testing_guild_id=42,
+        command_prefix="!",
+        intents=discord.Intents.default(),
+        command_mode="hybrid",
+    )
+    bot.load_cogs = AsyncMock()
+    bot.tree.sync = AsyncMock(return_value=[])
+
+    with (
+        patch("asdana.core.command_sync.load_hash", AsyncMock(return_value=None)),
+        patch("asdana.core.command_sync.store_hash", AsyncMock()) as store_hash,
+    ):
+        await bot.setup_hook()
+
+        bot.tree.sync.assert_awaited_once()
+        assert bot.tree.sync.call_args.kwargs["guild"].id == 42
+        assert store_hash.call_args.args[0] == "guild:42"
+
+        bot.command_mode = "prefix"
+        await bot.setup_hook()
+
+        bot.tree.sync.assert_awaited_once()
+    await bot.monitor.stop()
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_times_commands():
+    """Test that the invoke hooks record latency by command and outcome."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+    )
+    command = MagicMock(qualified_name="roll", cog_name="Random")
+    context = MagicMock(
+        spec=["command", "command_failed", "guild", "interaction"],
+        command=command,
+        guild=None,
+        interaction=None,
+    )
+    context.command_failed = False
+
+    tracer = Tracer(slow_threshold=0.0)
+    previous = set_tracer(tracer)
+    try:
+        # pylint: disable=protected-access
+        await bot._before_invoke(context)
+        await bot._after_invoke(context)
+    finally:
+        set_tracer(previous)
+
+    assert bot.command_metrics.latencies["roll", "Random", "ok"].count == 1
+    assert tracer.traces()[0].root.name == "command roll"
+
+    refused = MagicMock(spec=["command"], command=command)
+    await bot.on_command_error(refused, commands.CheckFailure())
+
+    assert bot.command_metrics.rejections == {("roll", "Random", "CheckFailure"): 1}
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_runs_stall_watchdog_when_configured(tmp_path):
+    """Test that the watchdog runs with the bot and dumps its report on close."""
+    config = Config()
+    config.watchdog_threshold_ms = 50.0
+    config.watchdog_report = str(tmp_path / "stalls.txt")
+    previous = set_config(config)
+    try:
+        bot = AsdanaBot(
+            web_client=MagicMock(),
+            command_prefix="!",
+            intents=discord.Intents.default(),
+        )
+        bot.load_cogs = AsyncMock()
+
+        async with bot:
+            await bot.setup_hook()
+            assert bot.watchdog.threshold == 0.05
+            assert bot.watchdog.running
+
+        assert not bot.watchdog.running
+        assert (
+            (tmp_path / "stalls.txt").read_text(encoding="utf-8").startswith("0 stalls")
+        )
+    finally:
+        set_config(previous)
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_counts_queries_per_command_and_event():
+    """Test that statements are counted per command and per listener event."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+    )
+
+    async def cog_enabled(_context):
+        record_statement("SELECT enabled")
+        return True
+
+    @commands.command()
+    @commands.check(cog_enabled)
+    async def roll(_context):
+        record_statement("SELECT 1")
+
+    bot.add_command(roll)
+    message = MagicMock(content="!roll", guild=None)
+    message.author.bot = False
+
+    with patch.object(AsdanaBot, "user", new_callable=PropertyMock):
+        await bot.on_message(message)
+
+    async def on_reaction_add():
+        record_statement("SELECT 2")
+        record_statement("SELECT 3")
+
+    # pylint: disable-next=protected-access
+    await bot._run_event(on_reaction_add, "on_reaction_add")
+
+    # The check's query counts towards the command, not just the command's own
+    assert bot.query_metrics.statements[COMMAND, "roll"].total == 2
+    assert bot.query_metrics.statements[EVENT, "on_reaction_add"].total == 2
+
+
+@pytest.mark.asyncio
+async def test_asdana_bot_counts_slash_command_queries_from_the_checks_on():
+    """Test that the command tree counts everything a slash command runs."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+    )
+    interaction = MagicMock(type=discord.InteractionType.application_command)
+    interaction.command.qualified_name = "odds"
+
+    async def call(_tree, _interaction):
+        record_statement("SELECT enabled")
+        record_statement("SELECT 1")
+
+    with patch.object(discord.app_commands.CommandTree, "_call", call):
+        await bot.tree._call(interaction)  # pylint: disable=protected-access
+
+    assert bot.query_metrics.statements[COMMAND, "odds"].total == 2
@@ -0,0 +1,101 @@
+"""
+Tests for hash-based application command sync.
+"""
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import discord
+import pytest
+from discord import app_commands
+
+from asdana.core.command_sync import (
+    payload_hash,
+    scope_name,
+    sync_changed_scopes,
+    tree_payload,
+)
+
+
+class FakeSession:
+    """An in-memory stand-in for a session holding CommandSyncState rows."""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def get(self, _model, key):
+        """Look up a row by primary key."""
+        return self.rows.get(key)
+
+    def add(self, row):
+        """Store a new row."""
+        self.rows[row.scope] = row
+
+    async def commit(self):
+        """Nothing to commit."""
+
+    @asynccontextmanager
+    async def session(self):
+        """Mimic get_session()."""
+        yield self
+
+
+def _command(name: str) -> app_commands.Command:
+    async def callback(_interaction: discord.Interaction):
+        pass
+
+    return app_commands.Command(name=name, description=name, callback=callback)
+
+
+def _tree(*names: str) -> app_commands.CommandTree:
+    client = discord.Client(intents=discord.Intents(guilds=True))
+    tree = app_commands.CommandTree(client)
+    for name in names:
+        tree.add_command(_command(name))
+    tree.sync = AsyncMock(return_value=[])
+    return tree
+
+
+def test_scope_name():
+    """Test that global and guild scopes get distinct names."""
+    assert scope_name(None) == "global"
+    assert scope_name(42) == "guild:42"
+
+
+def test_payload_hash_ignores_registration_order():
+    """Test that the hash depends on the commands, not their order."""
+    first = payload_hash(tree_payload(_tree("roll", "odds"), None))
+
+    assert first == payload_hash(tree_payload(_tree("odds", "roll"), None))
+    assert first != payload_hash(tree_payload(_tree("roll"), None))
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_unchanged_scopes():
+    """Test that a scope is synced once, then only after it changes."""
+    store = FakeSession()
+    with patch("asdana.core.command_sync.get_session", store.session):
+        tree = _tree("roll")
+        assert await sync_changed_scopes(tree, [None]) == ["global"]
+        assert await sync_changed_scopes(tree, [None]) == []
+        tree.sync.assert_awaited_once_with(guild=None)
+
+        changed = _tree("roll", "odds")
+        assert await sync_changed_scopes(changed, [None]) == ["global"]
+        assert await sync_changed_scopes(changed, [None], force=True) == ["global"]
+
+
+@pytest.mark.asyncio
+async def test_sync_tracks_guild_scopes_separately():
+    """Test that each guild scope keeps its own hash."""
+    store = FakeSession()
+    tree = _tree()
+    for guild_id in (1, 2):
+        tree.copy_global_to(guild=discord.Object(guild_id))
+    tree.add_command(_command("ping"), guild=discord.Object(1))
+
+    with patch("asdana.core.command_sync.get_session", store.session):
+        synced = await sync_changed_scopes(tree, [1, 2])
+
+    assert synced == ["guild:1", "guild:2"]
+    assert store.rows["guild:1"].payload_hash != store.rows["guild:2"].payload_hash
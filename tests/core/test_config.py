@@ -2,10 +2,17 @@
 Tests for the core configuration module.
 """
 
+import importlib
 import os
 from unittest.mock import patch
 
-from asdana.core.config import Config
+import pytest
+
+import asdana
+import asdana.core
+from asdana.core.config import Config, get_config, set_config
+
+config_module = importlib.import_module("asdana.core.config")
 
 
 def test_config_loads_environment_variables():
@@ -77,3 +84,201 @@ def test_config_handles_missing_optional_values():
 
         # Required with defaults
         assert config.log_level == "INFO"
+
+
+def test_get_config_loads_once_on_first_use():
+    """Test that the global configuration is created lazily and reused."""
+    previous = set_config(None)
+    try:
+        with (
+            patch("asdana.core.config.load_dotenv") as mock_load_dotenv,
+            patch.dict(os.environ, {"LOG_LEVEL": "WARNING"}),
+        ):
+            config = get_config()
+
+            assert get_config() is config
+            assert config.log_level == "WARNING"
+            mock_load_dotenv.assert_called_once()
+    finally:
+        set_config(previous)
+
+
+def test_set_config_swaps_global_config():
+    """Test that a configuration can be installed in place of the global one."""
+    with patch.dict(os.environ, {}, clear=True):
+        replacement = Config()
+    previous = set_config(replacement)
+    try:
+        assert get_config() is replacement
+        assert config_module.config is replacement
+    finally:
+        set_config(previous)
+
+
+def test_package_config_name_is_the_global_config():
+    """Test that ``from asdana.core import config`` still gives the instance."""
+    with patch.dict(os.environ, {}, clear=True):
+        replacement = Config()
+    previous = set_config(replacement)
+    try:
+        from asdana.core import config  # pylint: disable=import-outside-toplevel
+
+        assert config is replacement
+        assert asdana.core.config is replacement
+        assert asdana.config is replacement
+    finally:
+        set_config(previous)
+
+
+def test_config_reads_shard_settings():
+    """Test that shard count and shard ID lists and ranges are parsed."""
+    with patch.dict(os.environ, {"SHARD_COUNT": "8", "SHARD_IDS": "0, 2-4"}):
+        config = Config()
+
+    assert config.shard_count == 8
+    assert config.shard_ids == [0, 2, 3, 4]
+
+    with patch.dict(os.environ, {}, clear=True):
+        config = Config()
+
+    assert config.shard_count is None
+    assert config.shard_ids is None
+
+
+def test_config_skips_empty_shard_ids():
+    """Test that stray commas in SHARD_IDS are ignored."""
+    with patch.dict(os.environ, {"SHARD_IDS": "0,,1,"}):
+        assert Config().shard_ids == [0, 1]
+
+    with patch.dict(os.environ, {"SHARD_IDS": " , "}):
+        assert Config().shard_ids is None
+
+
+def test_config_names_shard_ids_when_invalid():
+    """Test that an invalid SHARD_IDS entry fails with the variable's name."""
+    with (
+        patch.dict(os.environ, {"SHARD_IDS": "0,one"}),
+        pytest.raises(ValueError, match="'one' in SHARD_IDS"),
+    ):
+        Config()
+
+
+def test_config_reads_member_cache_settings():
+    """Test that the member cache policy defaults to caching no members."""
+    with patch.dict(os.environ, {}, clear=True):
+        config = Config()
+
+    assert config.member_cache == "none"
+    assert config.chunk_guilds_at_startup is False
+
+    with patch.dict(
+        os.environ, {"MEMBER_CACHE": "all", "CHUNK_GUILDS_AT_STARTUP": "true"}
+    ):
+        config = Config()
+
+    assert config.member_cache == "all"
+    assert config.chunk_guilds_at_startup is True
+
+
+def test_config_reads_disabled_cogs():
+    """Test that disabled cogs are parsed from a comma-separated list."""
+    with patch.dict(os.environ, {"DISABLED_COGS": " YouTube, random ,"}):
+        config = Config()
+
+    assert config.disabled_cogs == ["youtube", "random"]
+
+    with patch.dict(os.environ, {}, clear=True):
+        config = Config()
+
+    assert config.disabled_cogs == []
+
+
+def test_config_reads_command_mode():
+    """Test that the command mode defaults to prefix commands."""
+    with patch.dict(os.environ, {}, clear=True):
+        config = Config()
+
+    assert config.command_mode == "prefix"
+
+    with patch.dict(os.environ, {"COMMAND_MODE": "Slash"}):
+        config = Config()
+
+    assert config.command_mode == "slash"
+
+
+def test_config_reads_metrics_endpoint_settings():
+    """Test that the metrics endpoint is disabled without a port."""
+    with patch.dict(os.environ, {}, clear=True):
+        config = Config()
+
+    assert config.metrics_port is None
+    assert config.metrics_host == "127.0.0.1"
+
+    with patch.dict(os.environ, {"METRICS_PORT": "9100"}):
+        config = Config()
+
+    assert config.metrics_port == 9100
+
+
+def test_config_reads_loop_lag_threshold():
+    """Test the loop lag warning threshold defaults to 250 ms."""
+    with patch.dict(os.environ, {}, clear=True):
+        config = Config()
+
+    assert config.loop_lag_threshold == 0.25
+
+    with patch.dict(os.environ, {"LOOP_LAG_THRESHOLD": "0.1"}):
+        config = Config()
+
+    assert config.loop_lag_threshold == 0.1
+
+
+def test_config_reads_watchdog_settings():
+    """Test that the stall watchdog is off unless a threshold is set."""
+    with patch.dict(os.environ, {}, clear=True):
+        config = Config()
+
+    assert config.watchdog_threshold_ms is None
+    assert config.watchdog_report is None
+
+    with patch.dict(
+        os.environ,
+        {"WATCHDOG_THRESHOLD_MS": "100", "WATCHDOG_REPORT": "/tmp/stalls.txt"},
+    ):
+        config = Config()
+
+    assert config.watchdog_threshold_ms == 100.0
+    assert config.watchdog_report == "/tmp/stalls.txt"
+
+
+def test_config_reads_tracing_settings():
+    """Test the tail sampling defaults and overrides."""
+    with patch.dict(os.environ, {}, clear=True):
+        config = Config()
+
+    assert config.trace_slow_threshold == 1.0
+    assert config.trace_sample_rate == 0.01
+    assert config.traces_token is None
+
+    with patch.dict(
+        os.environ,
+        {"TRACE_SLOW_THRESHOLD": "0.5", "TRACE_SAMPLE_RATE": "0", "TRACES_TOKEN": "s"},
+    ):
+        config = Config()
+
+    assert config.trace_slow_threshold == 0.5
+    assert config.trace_sample_rate == 0.0
+    assert config.traces_token == "s"
+
+
+def test_config_reads_query_budget():
+    """Test the query budget defaults to five statements."""
+    with patch.dict(os.environ, {}, clear=True):
+        config = Config()
+
+    assert config.query_budget == 5
+
+    with patch.dict(os.environ, {"QUERY_BUDGET": "2"}):
+        config = Config()
+
+    assert config.query_budget == 2
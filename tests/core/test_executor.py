@@ -0,0 +1,127 @@
+"""
+Tests for the offload executor.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from asdana.core.executor import PROCESS, THREAD, OffloadExecutor, offload
+
+
+@pytest.fixture(name="executor")
+async def fixture_executor():
+    """An executor with a single thread worker."""
+    executor = OffloadExecutor(thread_workers=1, process_workers=1)
+    yield executor
+    await executor.shutdown()
+
+
+async def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_and_records_runtime(executor):
+    """Test that thread tasks return their result and are counted."""
+    assert await executor.run(sum, [1, 2, 3]) == 6
+
+    await _wait_until(lambda: executor.stats[THREAD].completed == 1)
+    stats = executor.stats[THREAD]
+    assert stats.pending == 0
+    assert stats.max_runtime >= 0
+
+
+@pytest.mark.asyncio
+async def test_run_in_process_pool(executor):
+    """Test that picklable work runs in the process pool."""
+    assert await executor.run(math.factorial, 20, kind=PROCESS) == math.factorial(20)
+
+    await _wait_until(lambda: executor.stats[PROCESS].completed == 1)
+
+
+@pytest.mark.asyncio
+async def test_process_work_falls_back_to_threads_without_workers():
+    """Test that process tasks use threads when no process workers are set."""
+    executor = OffloadExecutor(thread_workers=1, process_workers=0)
+    try:
+        assert await executor.run(lambda: "inline", kind=PROCESS) == "inline"
+    finally:
+        await executor.shutdown()
+    assert executor.stats[THREAD].pending == 0
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_exceptions(executor):
+    """Test that exceptions raised by the work reach the caller."""
+    with pytest.raises(ValueError):
+        await executor.run(int, "not a number")
+
+    await _wait_until(lambda: executor.stats[THREAD].failed == 1)
+
+
+@pytest.mark.asyncio
+async def test_broken_process_pool_is_replaced(executor):
+    """Test that a worker dying fails its task but not the ones after it."""
+    with pytest.raises(BrokenProcessPool):
+        await executor.run(os._exit, 1, kind=PROCESS)
+
+    assert await executor.run(math.factorial, 5, kind=PROCESS) == 120
+
+
+@pytest.mark.asyncio
+async def test_timeout_stops_waiting_and_is_counted(executor):
+    """Test that slow tasks raise a timeout and are still tracked."""
+    release = threading.Event()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.run(release.wait, 5, timeout=0.05)
+
+    stats = executor.stats[THREAD]
+    assert stats.timed_out == 1
+    assert stats.pending == 1
+    release.set()
+    await _wait_until(lambda: stats.pending == 0)
+
+
+@pytest.mark.asyncio
+async def test_queued_tasks_are_cancelled_with_their_caller(executor):
+    """Test that cancelling a queued task keeps it from running."""
+    release = threading.Event()
+    ran = threading.Event()
+    blocker = asyncio.create_task(executor.run(release.wait, 5))
+    queued = asyncio.create_task(executor.run(ran.set))
+    await _wait_until(lambda: executor.stats[THREAD].queue_depth == 1)
+
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    release.set()
+    await blocker
+
+    await _wait_until(lambda: executor.stats[THREAD].pending == 0)
+    assert executor.stats[THREAD].cancelled == 1
+    assert not ran.is_set()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_rejects_new_work(executor):
+    """Test that a shut down executor refuses further tasks."""
+    await executor.shutdown()
+
+    with pytest.raises(RuntimeError):
+        await executor.run(sum, [1])
+
+
+@pytest.mark.asyncio
+async def test_offload_runs_inline_without_executor():
+    """Test that bots without an executor run the work inline."""
+    assert await offload(object(), sum, [1, 2]) == 3
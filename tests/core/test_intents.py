@@ -0,0 +1,121 @@
+"""
+Tests for deriving gateway intents from cogs.
+"""
+
+import discord
+from discord.ext import commands
+
+from asdana.core.intents import (
+    BASE_INTENTS,
+    bot_intents,
+    cog_intents,
+    combine,
+    describe,
+    event_intents,
+)
+
+
+class ReactionCog(commands.Cog):
+    """A cog that listens to reactions and declares the members intent."""
+
+    required_intents = discord.Intents(members=True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        """Listener that needs the reactions intent."""
+
+
+class CommandCog(commands.Cog):
+    """A cog with a prefix command and an intent-free listener."""
+
+    @commands.command()
+    async def ping(self, context):
+        """A prefix command."""
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Listener that needs no intent."""
+
+
+def _bot(intents: discord.Intents = discord.Intents.all()) -> commands.Bot:
+    # Without the default help command, which is a prefix command itself
+    return commands.Bot(command_prefix="!", intents=intents, help_command=None)
+
+
+def test_combine_unions_intents():
+    """Test that combine enables every intent enabled in any input."""
+    combined = combine(
+        [discord.Intents(guilds=True), discord.Intents(members=True, guilds=True)]
+    )
+
+    assert combined == discord.Intents(guilds=True, members=True)
+    assert combine([]) == discord.Intents.none()
+
+
+def test_event_intents_maps_listener_names():
+    """Test that events map to their intents, with or without ``on_``."""
+    intents = event_intents(["on_reaction_add", "member_join", "on_ready"])
+
+    assert intents == discord.Intents(
+        guild_reactions=True, dm_reactions=True, members=True
+    )
+
+
+def test_cog_intents_combines_declared_and_listener_intents():
+    """Test that a cog's declared intents are added to its listeners'."""
+    assert cog_intents(ReactionCog()) == discord.Intents(
+        members=True, guild_reactions=True, dm_reactions=True
+    )
+    assert cog_intents(CommandCog()) == discord.Intents.none()
+
+
+async def test_bot_intents_covers_loaded_cogs_only():
+    """Test that a bot only needs the intents of the cogs it loaded."""
+    bot = _bot()
+    assert bot_intents(bot) == BASE_INTENTS
+
+    await bot.add_cog(ReactionCog())
+    intents = bot_intents(bot)
+    assert intents.reactions and intents.members
+    assert not intents.message_content
+
+    await bot.remove_cog("ReactionCog")
+    assert bot_intents(bot) == BASE_INTENTS
+
+
+async def test_bot_intents_adds_message_intents_for_prefix_commands():
+    """Test that prefix commands need message content, unless disabled."""
+    bot = _bot()
+    await bot.add_cog(CommandCog())
+
+    assert bot_intents(bot).message_content
+    assert not bot_intents(bot, message_commands=False).message_content
+
+
+def test_bot_intents_adds_members_for_member_cache():
+    """Test that caching joined members or chunking needs the members intent."""
+    bot = _bot()
+
+    assert not bot_intents(
+        bot, member_cache_flags=discord.MemberCacheFlags.none()
+    ).members
+    assert bot_intents(bot, member_cache_flags=discord.MemberCacheFlags.all()).members
+    assert bot_intents(bot, chunk_guilds=True).members
+
+
+def test_describe_lists_enabled_intents():
+    """Test that describe names the enabled intents."""
+    assert describe(discord.Intents(guilds=True, members=True)) == "guilds, members"
+    assert describe(discord.Intents.none()) == "none"
+
+
+def test_bot_intents_includes_bot_listeners():
+    """Test that listeners added to the bot itself count too."""
+
+    async def on_typing(*_):
+        pass
+
+    bot = _bot()
+    bot.add_listener(on_typing)
+
+    assert bot_intents(bot).typing
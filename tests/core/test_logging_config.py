@@ -4,7 +4,7 @@ Tests for the core logging configuration module.
 
 from unittest.mock import MagicMock, patch
 
-from asdana.core.logging_config import setup_logging
+from asdana.core.logging_config import setup_logging, worker_log_file
 
 
 def test_setup_logging_configures_discord_logger():
@@ -86,3 +86,15 @@ def test_setup_logging_formats_log_messages_correctly():
 
         # Verify formatter was set on handler
         mock_handler.setFormatter.assert_called_once()
+
+
+def test_setup_logging_writes_to_the_given_file():
+    """Test that a process can be given its own log file."""
+    with (
+        patch("logging.getLogger"),
+        patch("logging.handlers.RotatingFileHandler") as mock_handler,
+        patch("discord.utils.setup_logging"),
+    ):
+        setup_logging("INFO", worker_log_file(2))
+
+        assert mock_handler.call_args.kwargs["filename"] == "discord.worker-2.log"
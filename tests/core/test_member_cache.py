@@ -0,0 +1,83 @@
+"""
+Tests for the member cache policy.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from asdana.core.member_cache import (
+    ensure_chunked,
+    member_cache_flags,
+    members_required,
+)
+
+
+@pytest.mark.parametrize(
+    "policy, joined, voice",
+    [
+        ("all", True, True),
+        ("joined", True, False),
+        ("Voice", False, True),
+        ("none", False, False),
+    ],
+)
+def test_member_cache_flags_for_policy(policy, joined, voice):
+    """Test that each policy maps to the expected cache flags."""
+    flags = member_cache_flags(policy)
+
+    assert (flags.joined, flags.voice) == (joined, voice)
+
+
+def test_unknown_policy_is_rejected():
+    """Test that a typo in the policy fails loudly."""
+    with pytest.raises(ValueError, match="everyone"):
+        member_cache_flags("everyone")
+
+
+@pytest.mark.asyncio
+async def test_ensure_chunked_only_chunks_once():
+    """Test that guilds are only chunked when their members are not cached."""
+    guild = MagicMock(chunked=True, chunk=AsyncMock())
+
+    await ensure_chunked(guild)
+    guild.chunk.assert_not_awaited()
+
+    guild.chunked = False
+    await ensure_chunked(guild)
+    guild.chunk.assert_awaited_once_with(cache=True)
+
+
+def _predicate():
+    """Returns the predicate a members_required() check runs."""
+
+    @members_required()
+    async def command(_context):
+        """A command that needs the member list."""
+
+    return command.__commands_checks__[0]
+
+
+@pytest.mark.asyncio
+async def test_members_required_defers_slash_commands_before_chunking():
+    """Test that slash commands are deferred before a slow chunk."""
+    calls = []
+    guild = MagicMock(chunked=False)
+    guild.chunk = AsyncMock(side_effect=lambda cache: calls.append("chunk"))
+    context = AsyncMock(guild=guild)
+    context.interaction.response.is_done = MagicMock(return_value=False)
+    context.defer.side_effect = lambda: calls.append("defer")
+
+    assert await _predicate()(context)
+    assert calls == ["defer", "chunk"]
+
+
+@pytest.mark.asyncio
+async def test_members_required_reports_a_chunk_timeout():
+    """Test that a member list that never arrives is reported, not awaited."""
+    guild = MagicMock(chunked=False, chunk=AsyncMock(side_effect=asyncio.TimeoutError))
+    context = AsyncMock(guild=guild, interaction=None)
+
+    assert not await _predicate()(context)
+    assert context.send.call_args[0][0].startswith("❌")
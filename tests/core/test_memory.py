@@ -0,0 +1,103 @@
+"""
+Tests for memory attribution.
+"""
+
+import os
+import threading
+from unittest.mock import MagicMock, patch
+
+import discord
+from discord.ext import commands
+from sqlalchemy.orm import Session
+
+from asdana.core.bot import AsdanaBot
+from asdana.core.memory import (
+    PACKAGE_DIR,
+    MemoryTracer,
+    cog_name,
+    library_name,
+    module_name,
+    object_counts,
+    session_counts,
+)
+from asdana.core.metrics import Histogram
+
+
+class CountingCog(commands.Cog):
+    """A cog that reports the size of a structure of its own."""
+
+    def object_counts(self):
+        """Report a single count."""
+        return {"things": 7}
+
+
+def test_module_and_cog_names():
+    """Test that source files map to modules, cogs and libraries."""
+    menu = os.path.join(PACKAGE_DIR, "cogs", "menus", "reaction_menu.py")
+    assert module_name(menu) == "asdana.cogs.menus.reaction_menu"
+    assert cog_name("asdana.cogs.menus.reaction_menu") == "menus"
+    assert cog_name("asdana.core.bot") == "core"
+    assert module_name("/usr/lib/python3/site-packages/discord/state.py") is None
+    assert library_name("/usr/lib/python3/site-packages/discord/state.py") == (
+        "discord"
+    )
+    assert library_name(os.__file__) == "stdlib"
+
+
+def test_memory_tracer_attributes_growth_to_modules():
+    """Test that allocations since the baseline are grouped by module."""
+    tracer = MemoryTracer(frames=5)
+    tracer.start()
+    try:
+        assert tracer.running
+        kept = [Histogram() for _ in range(2000)]
+        report = tracer.format_report()
+    finally:
+        tracer.stop()
+
+    assert not tracer.running
+    assert len(kept) == 2000
+    modules, rest = report.split("by cog:")
+    cogs, lines = rest.split("by line:")
+    assert "asdana.core.metrics" in modules
+    assert "core" in cogs
+    assert "metrics.py" in lines
+
+
+async def test_object_counts_include_caches_and_cogs():
+    """Test that caches, sessions and cog structures are counted."""
+    bot = AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+    )
+    await bot.add_cog(CountingCog())
+    walked_on = []
+
+    def fake_session_counts():
+        walked_on.append(threading.current_thread())
+        return 1, 3
+
+    with patch("asdana.core.memory.session_counts", fake_session_counts):
+        counts = await object_counts(bot)
+    await bot.executor.shutdown()
+
+    assert counts["guilds"] == 0
+    assert counts["members"] == 0
+    assert (counts["db sessions"], counts["db identity map"]) == (1, 3)
+    assert counts["things"] == 7
+    # The heap walk stays off the event loop
+    assert walked_on != [threading.current_thread()]
+
+
+def test_session_counts_finds_live_sessions():
+    """Test that sessions are found by walking the heap in chunks."""
+    session = Session()
+    with patch("asdana.core.memory.time") as mock_time:
+        sessions, identities = session_counts()
+
+    assert sessions >= 1
+    assert identities >= 0
+    # The GIL is given up between chunks
+    assert mock_time.sleep.call_count > 1
+    session.close()
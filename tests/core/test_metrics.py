@@ -0,0 +1,129 @@
+"""
+Tests for command latency metrics.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from yarl import URL
+
+from asdana.core.metrics import (
+    DB,
+    DISCORD,
+    ERROR,
+    OK,
+    OTHER,
+    CommandMetrics,
+    MetricFamily,
+    Histogram,
+    record_phase,
+    render,
+    start_timer,
+    stop_timer,
+    trace_config,
+)
+
+
+def test_histogram_buckets_and_percentiles():
+    """Test that observations are bucketed and percentiles interpolated."""
+    histogram = Histogram(bounds=(1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.count == 4
+    assert histogram.mean() == pytest.approx(1.625)
+    assert histogram.percentile(0.5) == pytest.approx(1.5)
+    assert histogram.percentile(1.0) == pytest.approx(3.0)
+    assert list(histogram.cumulative()) == [
+        (1.0, 1),
+        (2.0, 3),
+        (4.0, 4),
+        (float("inf"), 4),
+    ]
+
+
+def test_histogram_percentile_of_empty_histogram():
+    """Test that an empty histogram reports zero."""
+    assert Histogram().percentile(0.99) == 0.0
+
+
+def test_phases_are_charged_to_the_running_timer():
+    """Test that record_phase only charges a running timer."""
+    record_phase(DB, 1.0)  # No command running; ignored
+
+    timer = start_timer()
+    record_phase(DB, 0.25)
+    record_phase(DB, 0.25)
+    assert stop_timer() is timer
+    record_phase(DB, 1.0)
+
+    assert timer.phases[DB] == 0.5
+
+
+def test_other_phase_is_the_remainder():
+    """Test that finishing a timer charges the rest of the time to "other"."""
+    with patch("asdana.core.metrics.time.perf_counter", side_effect=[10.0, 13.0]):
+        timer = start_timer()
+        record_phase(DISCORD, 1.0)
+        total, phases = timer.finish()
+    stop_timer()
+
+    assert total == 3.0
+    assert phases[OTHER] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_trace_config_charges_request_time():
+    """Test that the aiohttp trace hooks charge request time to a phase."""
+    config = trace_config(DISCORD)
+    context = SimpleNamespace()
+    params = SimpleNamespace(
+        method="GET",
+        url=URL("https://discord.com/api/v10/users/@me"),
+        response=SimpleNamespace(status=200),
+    )
+    timer = start_timer()
+    try:
+        with patch("asdana.core.metrics.time.perf_counter", side_effect=[1.0, 1.5]):
+            await config.on_request_start[0](None, context, params)
+            await config.on_request_end[0](None, context, params)
+    finally:
+        stop_timer()
+
+    assert timer.phases[DISCORD] == 0.5
+
+
+def test_command_metrics_report():
+    """Test that the report lists each command, outcome and refusal."""
+    metrics = CommandMetrics()
+    metrics.record("roll", "Random", OK, start_timer())
+    metrics.record("roll", "Random", ERROR, start_timer())
+    metrics.record("show", "Config", OK, start_timer())
+    metrics.record_rejection("show", "Config", "MissingPermissions")
+    stop_timer()
+
+    assert metrics.latencies["roll", "Random", OK].count == 1
+    assert metrics.phases["roll", DB].count == 2
+
+    report = metrics.format_report("show")
+    assert "roll" not in report
+    assert "MissingPermissions" in report
+
+
+def test_metric_family_renders_text_format():
+    """Test that metric families render in the Prometheus text format."""
+    histogram = Histogram(bounds=(1.0,))
+    histogram.observe(0.5)
+    family = MetricFamily("latency_seconds", "histogram", "Latency.")
+    family.add_histogram(histogram, command='say "hi"')
+
+    assert render([family]) == (
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{command="say \\"hi\\"",le="1.0"} 1\n'
+        'latency_seconds_bucket{command="say \\"hi\\"",le="+Inf"} 1\n'
+        'latency_seconds_sum{command="say \\"hi\\""} 0.5\n'
+        'latency_seconds_count{command="say \\"hi\\""} 1\n'
+    )
@@ -0,0 +1,112 @@
+"""
+Tests for the metrics and health endpoints.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import discord
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from discord.ext import commands
+
+from asdana.core.bot import AsdanaBot
+from asdana.core.metrics import OK, MetricFamily, start_timer, stop_timer
+from asdana.core.metrics_server import MetricsServer, collect
+from asdana.core.tracing import Tracer, set_tracer
+
+
+class CountingCog(commands.Cog):
+    """A cog that reports a metric of its own."""
+
+    def collect_metrics(self):
+        """Report a single gauge."""
+        return [MetricFamily("asdana_test_items", "gauge", "Test items.").add(3)]
+
+
+@pytest.fixture(name="bot")
+def bot_fixture():
+    """A bot that is not connected."""
+    return AsdanaBot(
+        web_client=MagicMock(),
+        command_prefix="!",
+        intents=discord.Intents.default(),
+    )
+
+
+@pytest.fixture(name="client")
+async def client_fixture(bot):
+    """A test client for the bot's metrics server."""
+    server = MetricsServer(bot, port=0, traces_token="secret")
+    client = TestClient(TestServer(server.build_app()))
+    await client.start_server()
+    yield client
+    await client.close()
+
+
+async def test_collect_includes_bot_and_cog_metrics(bot):
+    """Test that collected metrics cover commands, shards and cogs."""
+    bot.command_metrics.record("roll", "Random", OK, start_timer())
+    stop_timer()
+    bot.shard_metrics.record_connect(0)
+    await bot.add_cog(CountingCog())
+
+    names = {family.name: family for family in collect(bot)}
+
+    assert names["asdana_gateway_connects_total"].samples == [
+        ("asdana_gateway_connects_total", {"shard": 0}, 1)
+    ]
+    assert names["asdana_command_duration_seconds"].samples[-1] == (
+        "asdana_command_duration_seconds_count",
+        {"command": "roll", "cog": "Random", "outcome": "ok"},
+        1,
+    )
+    assert names["asdana_test_items"].samples[0][2] == 3
+    assert names["process_resident_memory_bytes"].samples[0][2] > 0
+
+
+async def test_metrics_endpoint_serves_text_format(client):
+    """Test that /metrics answers in the Prometheus text format."""
+    response = await client.get("/metrics")
+    body = await response.text()
+
+    assert response.status == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE process_resident_memory_bytes gauge" in body
+
+
+async def test_health_and_readiness_probes(bot, client):
+    """Test that the bot is healthy before it is ready."""
+    assert (await client.get("/healthz")).status == 200
+    assert (await client.get("/readyz")).status == 503
+
+    with patch.object(bot, "is_ready", return_value=True):
+        assert (await client.get("/readyz")).status == 200
+
+
+async def test_traces_endpoint_exports_kept_traces(client):
+    """Test that /traces serves the kept traces in both shapes."""
+    tracer = Tracer(slow_threshold=0.0)
+    previous = set_tracer(tracer)
+    try:
+        with tracer.span("command roll"):
+            pass
+        headers = {"Authorization": "Bearer secret"}
+        plain = await (await client.get("/traces", headers=headers)).json()
+        otlp = await (await client.get("/traces?format=otlp", headers=headers)).json()
+    finally:
+        set_tracer(previous)
+
+    assert plain[0]["name"] == "command roll"
+    assert otlp["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == (
+        "command roll"
+    )
+
+
+async def test_traces_endpoint_needs_the_token(bot, client):
+    """Test that traces are only served with the token, and not without one."""
+    assert (await client.get("/traces")).status == 401
+    wrong = {"Authorization": "Bearer guess"}
+    assert (await client.get("/traces", headers=wrong)).status == 401
+
+    app = MetricsServer(bot, port=0).build_app()
+    assert "/traces" not in {resource.canonical for resource in app.router.resources()}
@@ -0,0 +1,95 @@
+"""
+Tests for the event loop and process resource monitor.
+"""
+
+import asyncio
+import gc
+import logging
+
+from asdana.core.monitor import ResourceMonitor
+
+
+def test_record_lag_below_threshold_does_not_warn(caplog):
+    """Test that lag under the threshold is only recorded."""
+    monitor = ResourceMonitor(lag_threshold=0.25)
+
+    with caplog.at_level(logging.WARNING, logger="asdana.core.monitor"):
+        monitor.record_lag(0.01)
+
+    assert monitor.lag.count == 1
+    assert list(monitor.recent_lag) == [0.01]
+    assert monitor.warnings == 0
+    assert not caplog.records
+
+
+async def test_record_lag_above_threshold_warns_with_context(caplog):
+    """Test that a lag spike is logged with resource and GC context."""
+    monitor = ResourceMonitor(lag_threshold=0.1)
+    monitor.sample_resources()
+    monitor._gc_pause_since_tick = 0.05  # pylint: disable=protected-access
+
+    with caplog.at_level(logging.WARNING, logger="asdana.core.monitor"):
+        monitor.record_lag(0.3)
+
+    assert monitor.warnings == 1
+    message = caplog.records[0].getMessage()
+    assert "lagged 300 ms" in message
+    assert "50 ms in GC" in message
+    assert "RSS" in message
+    # The GC pause is only reported for the tick it happened in
+    assert monitor._gc_pause_since_tick == 0.0  # pylint: disable=protected-access
+
+
+def test_gc_callback_times_collections():
+    """Test that collections are timed per generation while started."""
+    monitor = ResourceMonitor()
+    gc.callbacks.append(monitor._on_gc)  # pylint: disable=protected-access
+    try:
+        gc.collect(1)
+    finally:
+        gc.callbacks.remove(monitor._on_gc)  # pylint: disable=protected-access
+
+    assert monitor.gc_pauses[1].count == 1
+    assert monitor.gc_pauses[0].count == 0
+
+
+def test_recent_lag_percentile():
+    """Test percentiles over the recent window."""
+    monitor = ResourceMonitor(lag_threshold=10.0, history=100)
+    assert monitor.recent_lag_percentile(0.5) == 0.0
+
+    for value in range(100):
+        monitor.record_lag(value / 1000)
+
+    assert monitor.recent_lag_percentile(0.5) == 0.05
+    assert monitor.recent_lag_percentile(0.99) == 0.099
+
+
+def test_format_report():
+    """Test that the report covers lag, resources and every GC generation."""
+    monitor = ResourceMonitor()
+    monitor.sample_resources()
+    monitor.record_lag(0.002)
+
+    report = monitor.format_report()
+
+    assert "loop lag" in report
+    assert "MB RSS" in report
+    for generation in range(3):
+        assert f"gc gen {generation}" in report
+
+
+async def test_start_samples_lag_and_stop_cleans_up():
+    """Test that the task samples lag and stopping removes the GC hook."""
+    monitor = ResourceMonitor(interval=0.01, resource_interval=0.01)
+
+    monitor.start()
+    assert monitor.running
+    assert monitor._on_gc in gc.callbacks  # pylint: disable=protected-access
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert not monitor.running
+    assert monitor.lag.count > 0
+    assert len(monitor.resources) > 1
+    assert monitor._on_gc not in gc.callbacks  # pylint: disable=protected-access
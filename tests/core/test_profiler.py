@@ -0,0 +1,69 @@
+"""
+Tests for on-demand profiling.
+"""
+
+import pstats
+import time
+
+import pytest
+
+from asdana.core.profiler import (
+    CPROFILE,
+    SAMPLING,
+    CProfileProfiler,
+    SamplingProfiler,
+    create_profiler,
+)
+
+
+def _busy(seconds):
+    """Keeps the CPU busy for a while."""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def test_sampling_profiler_writes_collapsed_stacks():
+    """Test that sampled stacks end in the busy function."""
+    profiler = SamplingProfiler(interval=0.002)
+    profiler.start()
+    assert profiler.running
+    _busy(0.1)
+    profiler.stop()
+
+    assert not profiler.running
+    filename, data = profiler.result()
+    assert filename == "profile.collapsed.txt"
+    lines = data.decode().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.split(";")[-1].startswith("_busy (")
+    assert "_busy" in profiler.summary()
+
+
+def test_cprofile_profiler_writes_pstats(tmp_path):
+    """Test that the cProfile result is a file pstats can load."""
+    profiler = CProfileProfiler()
+    profiler.start()
+    _busy(0.01)
+    profiler.stop()
+
+    filename, data = profiler.result()
+    path = tmp_path / filename
+    path.write_bytes(data)
+    stats = pstats.Stats(str(path))
+
+    assert any(function == "_busy" for _, _, function in stats.stats)
+    assert "_busy" in profiler.summary()
+
+
+def test_create_profiler():
+    """Test that profilers are created by mode name."""
+    assert isinstance(create_profiler(SAMPLING), SamplingProfiler)
+    assert isinstance(create_profiler(CPROFILE), CProfileProfiler)
+
+    with pytest.raises(ValueError):
+        create_profiler("perf")
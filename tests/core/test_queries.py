@@ -0,0 +1,105 @@
+"""
+Tests for query counting.
+"""
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from asdana.core.queries import (
+    COMMAND,
+    QueryCounter,
+    QueryMetrics,
+    assert_query_budget,
+    count_queries,
+    record_round_trip,
+    record_statement,
+)
+from asdana.database import database
+
+
+def _run_query(statement="SELECT 1"):
+    """Runs the engine hooks for one statement in its own transaction."""
+    conn = SimpleNamespace(info={})
+    # pylint: disable=protected-access
+    database._transaction_control(conn)
+    database._query_started(conn, None, statement, {}, None, False)
+    database._query_finished(conn, None, statement, {}, None, False)
+    database._transaction_control(conn)
+
+
+def test_engine_hooks_count_statements_and_round_trips():
+    """Test that statements and transaction control are counted."""
+    with count_queries() as counter:
+        _run_query()
+        _run_query("SELECT\n    2")
+
+    assert counter.statements == 2
+    assert counter.round_trips == 6
+    assert counter.recorded == ["SELECT 1", "SELECT 2"]
+
+
+def test_counters_nest():
+    """Test that an outer counter also counts an inner one's statements."""
+    with count_queries() as outer:
+        record_statement("SELECT 1")
+        with count_queries() as inner:
+            record_statement("SELECT 2")
+        record_round_trip()
+
+    assert (outer.statements, outer.round_trips) == (2, 3)
+    assert (inner.statements, inner.round_trips) == (1, 1)
+
+    record_statement("SELECT 3")  # Not counted anywhere
+    assert outer.statements == 2
+
+
+async def test_counting_follows_tasks():
+    """Test that statements run by tasks created while counting are counted."""
+
+    async def query():
+        record_statement("SELECT 1")
+
+    with count_queries() as counter:
+        await asyncio.create_task(query())
+    record_statement("SELECT 2")
+
+    assert counter.statements == 1
+
+
+def test_assert_query_budget():
+    """Test that going over the budget fails with the statements run."""
+    with assert_query_budget(1, round_trips=3):
+        _run_query()
+
+    with pytest.raises(AssertionError, match="2 statements, over the budget of 1"):
+        with assert_query_budget(1):
+            _run_query("SELECT guild")
+            _run_query("SELECT cog")
+
+    with pytest.raises(AssertionError, match="round trips"):
+        with assert_query_budget(5, round_trips=2):
+            _run_query()
+
+
+def test_query_metrics_flag_invocations_over_budget(caplog):
+    """Test that counts are recorded and invocations over budget logged."""
+    metrics = QueryMetrics(budget=1)
+    cheap = QueryCounter()
+    cheap.statements = cheap.round_trips = 1
+    costly = QueryCounter()
+    costly.statements, costly.round_trips = 3, 5
+    costly.recorded = ["SELECT a", "SELECT b", "SELECT c"]
+
+    with caplog.at_level(logging.WARNING, logger="asdana.core.queries"):
+        metrics.record(COMMAND, "roll", cheap)
+        metrics.record(COMMAND, "roll", costly)
+
+    assert metrics.statements[COMMAND, "roll"].count == 2
+    assert metrics.round_trips[COMMAND, "roll"].maximum == 5
+    assert metrics.over_budget == {(COMMAND, "roll"): 1}
+    assert len(caplog.records) == 1
+    assert "SELECT c" in caplog.records[0].getMessage()
+    assert "roll" in metrics.format_report()
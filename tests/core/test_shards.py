@@ -0,0 +1,92 @@
+"""
+Tests for shard bookkeeping.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from asdana.core.shards import (
+    ShardMetrics,
+    event_guild_id,
+    owns_shard_zero,
+    shard_for_guild,
+)
+
+# Guild IDs from Discord's sharding documentation example
+GUILD_ID = 197038439483310086
+
+
+def test_shard_for_guild_follows_discord_routing():
+    """Test that guilds map to shards the way Discord routes them."""
+    assert shard_for_guild(GUILD_ID, 1) == 0
+    assert shard_for_guild(GUILD_ID, 4) == (GUILD_ID >> 22) % 4
+
+
+def test_event_guild_id_reads_common_event_arguments():
+    """Test that the guild is found on messages and raw payload events."""
+    message = SimpleNamespace(guild=SimpleNamespace(id=5))
+    payload = SimpleNamespace(guild_id=7)
+
+    assert event_guild_id((message,)) == 5
+    assert event_guild_id((payload,)) == 7
+    assert event_guild_id((SimpleNamespace(guild=None),)) is None
+    assert event_guild_id(()) is None
+
+
+def test_events_are_attributed_to_shards():
+    """Test that guild events go to their shard and the rest to shard 0."""
+    metrics = ShardMetrics()
+    metrics.shard_count = 4
+    message = SimpleNamespace(guild=SimpleNamespace(id=1 << 22))
+
+    metrics.record_event("message", (message,))
+    metrics.record_event("message", (SimpleNamespace(guild=None),))
+    metrics.record_event("shard_ready", (3,))
+
+    assert {shard_id: stats.events for shard_id, stats in metrics.stats.items()} == {
+        0: 1,
+        1: 1,
+        3: 1,
+    }
+
+
+def test_event_rate_uses_last_full_window():
+    """Test that the event rate is taken from the last completed window."""
+    metrics = ShardMetrics(window=10.0)
+    with patch("asdana.core.shards.time.monotonic") as mock_monotonic:
+        mock_monotonic.return_value = 0.0
+        stats = metrics.shard(0)
+        for _ in range(20):
+            metrics.record_event("message", ())
+        mock_monotonic.return_value = 10.0
+        metrics.record_event("message", ())
+
+        assert stats.event_rate() == 2.0
+        assert stats.events == 21
+
+
+def test_connection_counters_and_report():
+    """Test that connection events are counted and reported per shard."""
+    metrics = ShardMetrics()
+    metrics.record_connect(1)
+    metrics.record_ready(1)
+    metrics.record_disconnect(1)
+    metrics.record_resume(1)
+
+    stats = metrics.shard(1)
+    assert (stats.connects, stats.disconnects, stats.resumes) == (1, 1, 1)
+    assert stats.ready
+
+    report = metrics.format_report([(0, float("inf")), (1, 0.042)])
+    lines = report.splitlines()
+    assert len(lines) == 3
+    assert "42 ms" in lines[2] and "ready" in lines[2]
+    assert "not ready" in lines[1]
+
+
+def test_owns_shard_zero():
+    """Test that only processes running shard 0 own global work."""
+    assert owns_shard_zero(SimpleNamespace(shard_ids=None))
+    assert owns_shard_zero(SimpleNamespace(shard_ids=[0, 1]))
+    assert not owns_shard_zero(SimpleNamespace(shard_ids=[2, 3]))
+    assert owns_shard_zero(SimpleNamespace())
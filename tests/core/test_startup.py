@@ -0,0 +1,40 @@
+"""
+Tests for the startup timing module.
+"""
+
+from asdana.core.startup import (
+    SLOW_COG_THRESHOLD,
+    CogTiming,
+    format_startup_report,
+    preimport,
+)
+
+
+def test_preimport_records_times_and_tolerates_failures():
+    """Test that pre-imports are timed and missing modules are not fatal."""
+    timings = [CogTiming("asdana.cogs.dev"), CogTiming("asdana.cogs.missing")]
+
+    preimport(timings)
+
+    assert all(timing.import_time > 0 for timing in timings)
+    assert all(timing.error is None for timing in timings)
+
+
+def test_startup_report_lists_slowest_cogs_first():
+    """Test that the report is sorted by total time and flags problems."""
+    fast = CogTiming("asdana.cogs.fast")
+    slow = CogTiming("asdana.cogs.slow")
+    slow.import_time = SLOW_COG_THRESHOLD + 0.5
+    broken = CogTiming("asdana.cogs.broken")
+    broken.setup_time = 0.1
+    broken.error = "ExtensionFailed"
+
+    report = format_startup_report([fast, slow, broken], 2.0, ready_time=3.25)
+    lines = report.splitlines()
+
+    assert lines[1].startswith("asdana.cogs.slow") and lines[1].endswith("slow")
+    assert lines[2].startswith("asdana.cogs.broken")
+    assert lines[2].endswith("failed: ExtensionFailed")
+    assert lines[3].endswith("ok")
+    assert lines[-2] == "Loaded 3 cogs in 2000 ms."
+    assert lines[-1] == "Ready 3.25 s after process start."
@@ -0,0 +1,137 @@
+"""
+Tests for in-process tracing.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from asdana.core.tracing import Tracer, set_tracer
+from asdana.database import database
+
+
+@pytest.fixture(name="tracer")
+def tracer_fixture():
+    """A global tracer that keeps every trace."""
+    tracer = Tracer(slow_threshold=10.0, sample_rate=1.0)
+    previous = set_tracer(tracer)
+    yield tracer
+    set_tracer(previous)
+
+
+def test_spans_nest_within_a_trace(tracer):
+    """Test that spans opened inside a span become its children."""
+    with tracer.span("command roll") as root:
+        with tracer.span("db.session") as session:
+            leaf = tracer.start_span("db.query", activate=False, statement="SELECT 1")
+            tracer.end_span(leaf)
+
+    assert session.parent_id == root.span_id
+    assert leaf.parent_id == session.span_id
+    assert root.trace is leaf.trace
+    assert [span.name for span in root.trace.spans] == [
+        "db.query",
+        "db.session",
+        "command roll",
+    ]
+    assert tracer.finished == 1
+    assert tracer.traces() == [root.trace]
+
+
+def test_child_only_spans_need_a_trace(tracer):
+    """Test that instrumented layers do not start traces of their own."""
+    assert tracer.start_span("db.query", child_only=True) is None
+    with tracer.span("db.session", child_only=True) as span:
+        assert span is None
+    assert tracer.finished == 0
+
+
+def test_traces_are_tail_sampled():
+    """Test that slow and failed traces are kept and fast ones sampled."""
+    tracer = Tracer(slow_threshold=0.0, sample_rate=0.0)
+    with tracer.span("slow"):
+        pass
+    with pytest.raises(RuntimeError):
+        with tracer.span("failed"):
+            raise RuntimeError("boom")
+
+    tracer.slow_threshold = 10.0
+    with tracer.span("fast"):
+        pass
+
+    assert tracer.finished == 3
+    assert {trace.root.name for trace in tracer.traces()} == {"slow", "failed"}
+    failed = next(trace for trace in tracer.slow if trace.root.name == "failed")
+    assert failed.root.error == "RuntimeError: boom"
+    assert not tracer.sampled
+
+
+def test_spans_per_trace_are_bounded():
+    """Test that spans past the limit are counted instead of kept."""
+    tracer = Tracer(slow_threshold=0.0, max_spans=3)
+    with tracer.span("command"):
+        for _ in range(5):
+            tracer.end_span(tracer.start_span("db.query", activate=False))
+
+    trace = tracer.traces()[0]
+    assert len(trace.spans) == 4
+    assert trace.dropped == 2
+    assert trace.root.name == "command"
+
+
+async def test_spans_follow_the_command_into_tasks(tracer):
+    """Test that tasks created inside a span continue its trace."""
+
+    async def fetch():
+        with tracer.span("http GET"):
+            await asyncio.sleep(0)
+
+    with tracer.span("command") as root:
+        await asyncio.gather(fetch(), asyncio.create_task(fetch()))
+
+    children = [span for span in root.trace.spans if span is not root]
+    assert len(children) == 2
+    assert all(span.parent_id == root.span_id for span in children)
+
+
+def test_export_plain_and_otlp(tracer):
+    """Test both JSON export shapes."""
+    with tracer.span("command roll", guild_id=5) as root:
+        with tracer.span("db.session"):
+            pass
+
+    plain = json.loads(tracer.export())
+    assert plain[0]["trace_id"] == root.trace.trace_id
+    assert plain[0]["name"] == "command roll"
+    assert [span["name"] for span in plain[0]["spans"]] == [
+        "db.session",
+        "command roll",
+    ]
+
+    otlp = json.loads(tracer.export(otlp=True))
+    spans = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(root.trace.trace_id) == 32
+    assert spans[0]["parentSpanId"] == root.span_id
+    assert "parentSpanId" not in spans[1]
+    assert spans[1]["attributes"] == [{"key": "guild_id", "value": {"intValue": "5"}}]
+    assert spans[1]["status"] == {"code": 1}
+
+
+def test_sql_statements_are_traced(tracer):
+    """Test that the engine hooks open a span per statement in a trace."""
+    conn = SimpleNamespace(info={})
+    # pylint: disable=protected-access
+    with tracer.span("command roll") as root:
+        database._query_started(conn, None, "SELECT 1", {}, None, False)
+        database._query_finished(conn, None, "SELECT 1", {}, None, False)
+        database._query_started(conn, None, "SELECT 2", {}, None, False)
+        database._query_failed(
+            SimpleNamespace(connection=conn, original_exception=OSError("gone"))
+        )
+
+    ok, failed = root.trace.spans[:2]
+    assert ok.attributes == {"statement": "SELECT 1"}
+    assert ok.parent_id == root.span_id
+    assert failed.error == "OSError('gone')"
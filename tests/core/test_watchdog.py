@@ -0,0 +1,82 @@
+"""
+Tests for the stall watchdog.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+from asdana.core.watchdog import StallWatchdog
+
+
+def _block(seconds):
+    """Blocks the calling thread, as a synchronous call on the loop would."""
+    time.sleep(seconds)
+
+
+async def test_watchdog_samples_blocking_call_site():
+    """Test that a blocking call on the loop is attributed to its line."""
+    watchdog = StallWatchdog(threshold=0.02, sample_interval=0.005)
+    watchdog.start()
+    await asyncio.sleep(0.03)  # Lets the ticker run once
+
+    _block(0.2)
+    await asyncio.sleep(0)
+    await watchdog.stop()
+
+    assert not watchdog.running
+    assert watchdog.stalls == 1
+    assert watchdog.samples > 0
+    (filename, _line, function), _count = watchdog.offenders.most_common(1)[0]
+    assert function == "_block"
+    assert filename.endswith("test_watchdog.py")
+
+    report = watchdog.format_report()
+    assert "1 stalls over 20 ms" in report
+    assert "in _block" in report
+
+
+async def test_watchdog_ignores_a_responsive_loop():
+    """Test that nothing is sampled while the loop keeps ticking."""
+    watchdog = StallWatchdog(threshold=0.05, sample_interval=0.005)
+    watchdog.start()
+    for _ in range(10):
+        await asyncio.sleep(0.005)
+    await watchdog.stop()
+
+    assert watchdog.stalls == 0
+    assert watchdog.samples == 0
+    assert watchdog.format_report().startswith("0 stalls")
+
+
+async def test_watchdog_reset_and_dump(tmp_path):
+    """Test that the report can be written to a file and reset."""
+    watchdog = StallWatchdog(threshold=0.01)
+    watchdog.start()
+    watchdog.sample()  # Samples this test's stack, as if it were blocking
+    await watchdog.stop()
+
+    path = tmp_path / "stalls.txt"
+    watchdog.dump(str(path))
+    assert "test_watchdog_reset_and_dump" in path.read_text(encoding="utf-8")
+
+    watchdog.reset()
+    assert watchdog.samples == 0
+    assert not watchdog.offenders
+
+
+def test_watchdog_keeps_only_the_most_common_stacks():
+    """Test that the stack counter is trimmed instead of growing forever."""
+    watchdog = StallWatchdog(threshold=0.01, max_stacks=10)
+    common = (("asdana/core/bot.py", 1, "common"),)
+    stacks = [common] * 5 + [
+        (("asdana/core/bot.py", line, "rare"),) for line in range(2, 50)
+    ]
+
+    with patch("asdana.core.watchdog.thread_stack", side_effect=stacks):
+        for _ in stacks:
+            watchdog.sample()
+
+    assert len(watchdog.stacks) <= 10
+    assert watchdog.stacks[common] == 5
+    assert watchdog.samples == len(stacks)
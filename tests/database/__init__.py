@@ -0,0 +1,3 @@
+"""
+Tests for the database module.
+"""
@@ -2,6 +2,8 @@
 Contains helper functions for tests.
 """
 
+from unittest.mock import MagicMock
+
 import discord
 from discord.ext import commands
 
@@ -22,3 +24,28 @@ async def setup_bot_with_cog(setup_func):
     bot = commands.Bot(command_prefix="!", intents=intents)
     await setup_func(bot)
     return bot
+
+
+async def slash_can_run(bot, name, **context_attributes):
+    """
+    Helper function to run a hybrid command's checks the way its slash
+    command does.
+
+    Args:
+        bot (commands.Bot): The bot the command belongs to.
+        name (str): The command's qualified name.
+        **context_attributes: Attributes of the invocation context, such as
+            ``author`` and ``guild``.
+
+    Returns:
+        bool: Whether the checks passed.
+    """
+    context = MagicMock(spec=commands.Context)
+    context.bot = bot
+    for attribute, value in context_attributes.items():
+        setattr(context, attribute, value)
+    interaction = MagicMock()
+    interaction.client = bot
+    interaction._baton = context  # pylint: disable=protected-access
+    # pylint: disable-next=protected-access
+    return await bot.get_command(name).app_command._check_can_run(interaction)
@@ -0,0 +1,161 @@
+"""
+Tests for the multi-process cluster launcher.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from asdana import cluster
+from asdana.cluster import ClusterLauncher, split_shards
+
+
+class FakeProcess:
+    """A stand-in for a worker process that can be made to exit."""
+
+    next_pid = 1000
+
+    def __init__(self, worker, ready=True):
+        FakeProcess.next_pid += 1
+        self.pid = FakeProcess.next_pid
+        self.alive = False
+        self.exitcode = None
+        self.worker = worker
+        self.ready = ready
+
+    def start(self):
+        """Starts the process and optionally reports it ready."""
+        self.alive = True
+        if self.ready:
+            self.worker.ready.set()
+
+    def is_alive(self):
+        """Whether the process is running."""
+        return self.alive
+
+    def exit(self, code=1):
+        """Makes the process exit."""
+        self.alive = False
+        self.exitcode = code
+
+    def join(self, timeout=None):  # pylint: disable=unused-argument
+        """Waits for the process to exit."""
+
+    def terminate(self):
+        """Terminates the process."""
+        self.exit(-15)
+
+    kill = terminate
+
+
+@pytest.mark.parametrize(
+    "shard_count, workers, expected",
+    [
+        (8, 4, [[0, 1], [2, 3], [4, 5], [6, 7]]),
+        (5, 2, [[0, 1, 2], [3, 4]]),
+        (2, 4, [[0], [1]]),
+        (3, 0, [[0, 1, 2]]),
+    ],
+)
+def test_split_shards_makes_contiguous_ranges(shard_count, workers, expected):
+    """Test that shards are split into contiguous, balanced ranges."""
+    assert split_shards(shard_count, workers) == expected
+
+
+def _launcher(started, ready=True):
+    def factory(worker):
+        process = FakeProcess(worker, ready)
+        started.append((worker.index, process))
+        return process
+
+    return ClusterLauncher(4, 2, process_factory=factory, ready_timeout=0.05)
+
+
+def test_start_all_starts_workers_in_order():
+    """Test that every worker is started with its own shard range."""
+    started = []
+    launcher = _launcher(started)
+
+    launcher.start_all()
+
+    assert [index for index, _ in started] == [0, 1]
+    assert [worker.shard_ids for worker in launcher.workers] == [[0, 1], [2, 3]]
+
+
+def test_exited_worker_is_restarted_with_backoff():
+    """Test that restarts are delayed exponentially after repeated failures."""
+    started = []
+    launcher = _launcher(started)
+    launcher.start_all()
+    worker = launcher.workers[0]
+    now = worker.started_at
+
+    worker.process.exit()
+    launcher.check_workers(now)
+    assert worker.restart_at == now + cluster.MIN_RESTART_DELAY
+    launcher.check_workers(now + 0.5)
+    assert len(started) == 2
+
+    launcher.check_workers(now + cluster.MIN_RESTART_DELAY)
+    assert len(started) == 3 and worker.restarts == 1
+
+    worker.process.exit()
+    launcher.check_workers(worker.started_at)
+    assert worker.restart_at == worker.started_at + cluster.MIN_RESTART_DELAY * 2
+
+
+def test_backoff_resets_after_stable_uptime():
+    """Test that a worker that ran for a while restarts without delay growth."""
+    launcher = _launcher([])
+    launcher.start_all()
+    worker = launcher.workers[1]
+    worker.failures = 5
+
+    worker.process.exit()
+    launcher.check_workers(worker.started_at + cluster.STABLE_UPTIME)
+
+    assert worker.failures == 1
+    assert worker.restart_at == (
+        worker.started_at + cluster.STABLE_UPTIME + cluster.MIN_RESTART_DELAY
+    )
+
+
+def test_rolling_restart_replaces_workers_one_at_a_time():
+    """Test that a rolling restart stops and restarts each worker in turn."""
+    started = []
+    launcher = _launcher(started)
+    launcher.start_all()
+    old = [process for _, process in started]
+
+    with patch("asdana.cluster.os.kill") as mock_kill:
+        mock_kill.side_effect = lambda pid, _: next(
+            process for process in old if process.pid == pid
+        ).exit(0)
+        launcher.rolling_restart()
+
+    assert [index for index, _ in started] == [0, 1, 0, 1]
+    assert not any(process.is_alive() for process in old)
+    assert mock_kill.call_count == 2
+
+
+def test_rolling_restart_stops_when_worker_is_not_ready():
+    """Test that a worker failing to come back halts the rolling restart."""
+    started = []
+    launcher = _launcher(started, ready=False)
+    for worker in launcher.workers:
+        launcher.start_worker(worker)
+
+    with patch("asdana.cluster.os.kill"):
+        launcher.rolling_restart()
+
+    assert [index for index, _ in started] == [0, 1, 0]
+
+
+def test_workers_log_to_their_own_files():
+    """Test that no two processes share a rotating log file."""
+    launcher = ClusterLauncher(4, 2)
+    # pylint: disable=protected-access
+    processes = [launcher._spawn(worker) for worker in launcher.workers]
+
+    log_files = [process._args[-1] for process in processes]
+    assert log_files == ["discord.worker-0.log", "discord.worker-1.log"]
@@ -0,0 +1,47 @@
+"""
+Tests for the Bloom filter.
+"""
+
+import pytest
+
+from asdana.utils.bloom import BloomFilter
+
+
+def test_added_items_are_always_found():
+    """Test that the filter has no false negatives."""
+    bloom = BloomFilter(1000)
+    items = [f"item{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    assert len(bloom) == 1000
+
+
+def test_false_positive_rate_stays_near_target():
+    """Test that unseen items are rarely reported as present."""
+    bloom = BloomFilter(10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"seen{i}")
+
+    false_positives = sum(f"unseen{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_size_is_fixed_by_capacity():
+    """Test that memory is allocated up front and does not grow."""
+    bloom = BloomFilter(100_000, error_rate=1e-4)
+    before = bloom.size_bytes
+    for i in range(1000):
+        bloom.add(str(i))
+
+    assert bloom.size_bytes == before
+    assert before < 100_000 * 3  # About 2.4 bytes per item at 1e-4
+
+
+def test_rejects_invalid_parameters():
+    """Test that impossible sizes and rates raise ValueError."""
+    with pytest.raises(ValueError):
+        BloomFilter(0)
+    with pytest.raises(ValueError):
+        BloomFilter(10, error_rate=1.5)
@@ -0,0 +1,41 @@
+"""
+Tests for the cog status check.
+"""
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from asdana.utils.cog_utils import cog_enabled
+
+
+@asynccontextmanager
+async def _session():
+    """A database session that is never used directly."""
+    yield MagicMock()
+
+
+@pytest.mark.asyncio
+async def test_disabled_cog_names_the_invoking_prefix_without_a_lookup():
+    """Test that the reply reuses the prefix the command was invoked with."""
+    context = MagicMock()
+    context.command.cog_name = "Random"
+    context.interaction = None
+    context.prefix = "<@1> "
+    context.clean_prefix = "@Asdana "
+    context.bot.command_prefix = AsyncMock()
+    context.send = AsyncMock()
+
+    with (
+        patch("asdana.utils.cog_utils.get_session", _session),
+        patch(
+            "asdana.utils.cog_utils.CogSettings.get_cog_enabled",
+            AsyncMock(return_value=False),
+        ),
+    ):
+        allowed = await cog_enabled().predicate(context)
+
+    assert not allowed
+    context.bot.command_prefix.assert_not_awaited()
+    assert "`@Asdana config cog enable random`" in context.send.call_args.args[0]
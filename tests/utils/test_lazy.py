@@ -0,0 +1,40 @@
+"""
+Tests for lazy package re-exports.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+import asdana.utils
+from asdana.utils.lazy import lazy_exports
+from asdana.utils.rate_limit import RateLimiter
+
+
+def test_lazy_export_resolves_and_caches():
+    """Test that a re-exported name resolves to the real object on first use."""
+    assert asdana.utils.RateLimiter is RateLimiter
+    assert vars(asdana.utils)["RateLimiter"] is RateLimiter
+    assert "YouTubeApiClient" in dir(asdana.utils)
+
+
+def test_unknown_name_raises_attribute_error():
+    """Test that names that are not re-exported raise AttributeError."""
+    getattr_, _ = lazy_exports("asdana.utils", {})
+
+    with pytest.raises(AttributeError):
+        getattr_("Missing")
+
+
+def test_importing_package_skips_heavy_dependencies():
+    """Test that importing the package does not load heavy dependencies."""
+    code = (
+        "import sys, asdana, asdana.core, asdana.database, asdana.utils; "
+        "print(sorted({'discord', 'sqlalchemy', 'googleapiclient'} & set(sys.modules)))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    ).stdout
+
+    assert output.strip() == "[]"
@@ -0,0 +1,39 @@
+"""
+Tests for the rate limiter.
+"""
+
+import time
+
+import pytest
+
+from asdana.utils.rate_limit import RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_burst_calls_do_not_wait():
+    """Test that calls within the burst are not delayed."""
+    limiter = RateLimiter(1, 10, burst=3)
+
+    start = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert time.monotonic() - start < 0.05
+
+
+@pytest.mark.asyncio
+async def test_calls_beyond_burst_are_spaced():
+    """Test that calls past the burst wait for the interval."""
+    limiter = RateLimiter(20, 1, burst=1)
+
+    start = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert time.monotonic() - start >= 0.09
+
+
+def test_rejects_non_positive_rate():
+    """Test that invalid limiter settings raise ValueError."""
+    with pytest.raises(ValueError):
+        RateLimiter(0)
@@ -0,0 +1,86 @@
+"""
+Tests for the YouTube Data API client, run against a local HTTP stand-in.
+"""
+
+import pytest
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from asdana.utils.youtube_api import (
+    YouTubeApiClient,
+    YouTubeApiError,
+    is_playable,
+)
+
+
+def _status(privacy="public", upload="processed", embeddable=True):
+    return {
+        "privacyStatus": privacy,
+        "uploadStatus": upload,
+        "embeddable": embeddable,
+    }
+
+
+async def _search(request):
+    if request.query["key"] != "good":
+        return web.json_response({"error": {"message": "bad key"}}, status=403)
+    return web.json_response(
+        {"items": [{"id": {"videoId": "abc"}}, {"id": {"videoId": "def"}}]}
+    )
+
+
+async def _videos(request):
+    ids = request.query["id"].split(",")
+    return web.json_response(
+        {"items": [{"id": video_id, "status": _status()} for video_id in ids]}
+    )
+
+
+@pytest.fixture(name="client")
+async def fixture_client():
+    """A client pointed at a local stand-in of the API."""
+    app = web.Application()
+    app.router.add_get("/search", _search)
+    app.router.add_get("/videos", _videos)
+    server = TestServer(app)
+    await server.start_server()
+    async with ClientSession() as session:
+        yield YouTubeApiClient(session, "good", base_url=str(server.make_url("/")))
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_search_videos_returns_ids(client):
+    """Test that search results are reduced to video IDs."""
+    assert await client.search_videos("cats") == ["abc", "def"]
+
+
+@pytest.mark.asyncio
+async def test_list_videos_returns_items(client):
+    """Test that videos.list returns one item per known ID."""
+    videos = await client.list_videos(["abc", "def"])
+    assert [video["id"] for video in videos] == ["abc", "def"]
+
+
+@pytest.mark.asyncio
+async def test_list_videos_rejects_more_than_fifty_ids(client):
+    """Test that oversized videos.list calls are refused locally."""
+    with pytest.raises(ValueError):
+        await client.list_videos([str(i) for i in range(51)])
+
+
+@pytest.mark.asyncio
+async def test_error_responses_raise(client):
+    """Test that API errors surface as YouTubeApiError."""
+    client.api_key = "bad"
+    with pytest.raises(YouTubeApiError) as error:
+        await client.search_videos("cats")
+    assert error.value.status == 403
+
+
+def test_is_playable_checks_status():
+    """Test that only public, processed, embeddable videos are playable."""
+    assert is_playable({"status": _status()})
+    assert not is_playable({"status": _status(privacy="private")})
+    assert not is_playable({"status": _status(upload="uploaded")})
+    assert not is_playable({"status": _status(embeddable=False)})